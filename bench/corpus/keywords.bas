@@ -0,0 +1,53 @@
+10 REM KEYWORD-DENSE: SORTING AND SEARCHING IN CRUNCHED STYLE
+20 DEFINTI-N:DEFSNGA-H
+30 DIMA(100),B(100),K(20)
+40 N=100:M=20
+50 FORI=1TO N:A(I)=INT(RND(1)*1000):NEXTI
+60 GOSUB1000
+70 FORI=1TO N-1:IFA(I)>A(I+1)THEN PRINT"SORT FAILED AT";I:STOP
+80 NEXTI
+90 FORI=1TOM:READK(I):NEXTI
+100 FORI=1TOM:L=1:H=N:F=0
+110 WHILEL<=HANDF=0
+120 J=(L+H)\2
+130 IFA(J)=K(I)THENF=J ELSEIFA(J)<K(I)THENL=J+1 ELSEH=J-1
+140 WEND
+150 IF F THEN PRINTK(I);"FOUND AT";F ELSE PRINTK(I);"NOT FOUND"
+160 NEXTI
+170 ON N GOTO180,190,200
+180 GOTO210
+190 GOSUB2000:GOTO210
+200 GOSUB3000
+210 FORI=1TO N STEP2:B(I)=A(I)XORA(I+1):B(I+1)=A(I)ANDNOTA(I+1):NEXTI
+220 FORI=1TO N:IFB(I)MOD2=0ANDB(I)>0ORB(I)<-1THENC=C+1
+230 NEXTI
+240 IFC>N\2THEN PRINT"MOSTLY EVEN"ELSE PRINT"MOSTLY ODD"
+250 TRON:GOSUB4000:TROFF
+260 END
+1000 REM SHELL SORT
+1010 G=N\2
+1020 WHILEG>0
+1030 FORI=G+1TO N:T=A(I):J=I
+1040 WHILEJ>GANDA(J-G)>T:A(J)=A(J-G):J=J-G:WEND
+1050 A(J)=T:NEXTI
+1060 G=G\2
+1070 WEND
+1080 RETURN
+2000 FORI=1TO N:FORJ=1TOM:IFA(I)=K(J)THENB(I)=J
+2010 NEXTJ,I:RETURN
+3000 FORI=NTO1STEP-1:IFA(I)<0THENA(I)=-A(I)
+3010 NEXTI:RETURN
+4000 FORI=1TO10:FORJ=1TO10:FORL=1TO10:C=C+IMOD3+JMOD5+LMOD7:NEXTL,J,I
+4010 IFC>1000ANDC<2000THEN RETURN
+4020 C=CEQVN:C=CIMPM:RETURN
+5000 DATA 10,20,30,40,50,60,70,80,90,100
+5010 DATA 110,120,130,140,150,160,170,180,190,200
+5020 FORI=1TO N:ONA(I)MOD4+1GOSUB5100,5200,5300,5400:NEXTI:RETURN
+5100 C=C+1:RETURN
+5200 C=C-1:RETURN
+5300 C=C*2:RETURN
+5400 C=C\2:RETURN
+5500 SWAPA(1),A(N):SWAPB(1),B(N):RETURN
+5600 IFA(1)>A(2)THEN SWAPA(1),A(2):GOTO5600
+5610 FORI=2TO N:IFA(I-1)<=A(I)THEN NEXTI:RETURN
+5620 SWAPA(I-1),A(I):GOTO5600
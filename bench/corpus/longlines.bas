@@ -0,0 +1,62 @@
+10 REM VERY LONG LINES: GENERATED STATE MACHINE UPDATES
+20 A(0)=A(1)+A*1.5-0:B$=D$+"0-1"+MID$(Z$,2,2):C=C+(G*2-2)/5:G=G AND &H2:PRINT D;L;"DL";D*L:E(4)=E(5)+P*5.5-0:F$=S$+"0-5"+MID$(Z$,6,2):G=G+(V*2-6)/9:V=V AND &H6:PRINT H;Y;"HY";H*Y:K(8)=K(9)+B*9.5-0:L$=E$+"0-9"+MID$(Z$,3,2):M=M+(H*2-10)/13:H=H AND &HA:IF A>F THEN A=A-F ELSE F=F-A
+30 B$=H$+"1-0"+MID$(Z$,1,2):C=C+(M*3-1)/4:M=M AND &H11:PRINT D;Q;"DQ";D*Q:E(3)=E(4)+T*4.5-1:F$=W$+"1-4"+MID$(Z$,5,2):G=G+(Z*3-5)/8:Z=Z AND &H15:PRINT H;C;"HC";H*C:K(7)=K(8)+F*8.5-1:L$=K$+"1-8"+MID$(Z$,2,2):M=M+(N*3-9)/12:N=N AND &H19:IF B>G THEN B=B-G ELSE G=G-B
+40 C=C+(R*4-0)/3:R=R AND &H20:PRINT D;U;"DU";D*U:E(2)=E(3)+X*3.5-2:F$=A$+"2-3"+MID$(Z$,4,2):G=G+(D*4-4)/7:D=D AND &H24:PRINT H;G;"HG";H*G:K(6)=K(7)+L*7.5-2:L$=P$+"2-7"+MID$(Z$,1,2):M=M+(S*4-8)/11:S=S AND &H28:PRINT N;V;"NV";N*V:IF C>H THEN C=C-H ELSE H=H-C
+50 PRINT D;Y;"DY";D*Y:E(1)=E(2)+B*2.5-3:F$=E$+"3-2"+MID$(Z$,3,2):G=G+(H*5-3)/6:H=H AND &H33:PRINT H;M;"HM";H*M:K(5)=K(6)+Q*6.5-3:L$=T$+"3-6"+MID$(Z$,7,2):M=M+(W*5-7)/10:W=W AND &H37:PRINT N;Z;"NZ";N*Z:P(9)=P(0)+C*10.5-3:Q$=F$+"3-10"+MID$(Z$,4,2):IF D>K THEN D=D-K ELSE K=K-D
+60 E(0)=E(1)+F*1.5-4:F$=K$+"4-1"+MID$(Z$,2,2):G=G+(N*6-2)/5:N=N AND &H42:PRINT H;R;"HR";H*R:K(4)=K(5)+U*5.5-4:L$=X$+"4-5"+MID$(Z$,6,2):M=M+(A*6-6)/9:A=A AND &H46:PRINT N;D;"ND";N*D:P(8)=P(9)+G*9.5-4:Q$=L$+"4-9"+MID$(Z$,3,2):IF E>L THEN E=E-L ELSE L=L-E
+70 F$=P$+"5-0"+MID$(Z$,1,2):G=G+(S*7-1)/4:S=S AND &H51:PRINT H;V;"HV";H*V:K(3)=K(4)+Y*4.5-5:L$=B$+"5-4"+MID$(Z$,5,2):M=M+(E*7-5)/8:E=E AND &H55:PRINT N;H;"NH";N*H:P(7)=P(8)+M*8.5-5:Q$=Q$+"5-8"+MID$(Z$,2,2):R=R+(T*7-9)/12:T=T AND &H59:IF F>M THEN F=F-M ELSE M=M-F
+80 G=G+(W*8-0)/3:W=W AND &H60:PRINT H;Z;"HZ";H*Z:K(2)=K(3)+C*3.5-6:L$=F$+"6-3"+MID$(Z$,4,2):M=M+(K*8-4)/7:K=K AND &H64:PRINT N;N;"NN";N*N:P(6)=P(7)+R*7.5-6:Q$=U$+"6-7"+MID$(Z$,1,2):R=R+(X*8-8)/11:X=X AND &H68:PRINT S;A;"SA";S*A:IF G>N THEN G=G-N ELSE N=N-G
+90 PRINT H;D;"HD";H*D:K(1)=K(2)+G*2.5-7:L$=L$+"7-2"+MID$(Z$,3,2):M=M+(P*9-3)/6:P=P AND &H73:PRINT N;S;"NS";N*S:P(5)=P(6)+V*6.5-7:Q$=Y$+"7-6"+MID$(Z$,7,2):R=R+(B*9-7)/10:B=B AND &H77:PRINT S;E;"SE";S*E:T(9)=T(0)+H*10.5-7:U$=M$+"7-10"+MID$(Z$,4,2):IF H>P THEN H=H-P ELSE P=P-H
+100 K(0)=K(1)+M*1.5-8:L$=Q$+"8-1"+MID$(Z$,2,2):M=M+(T*10-2)/5:T=T AND &H82:PRINT N;W;"NW";N*W:P(4)=P(5)+Z*5.5-8:Q$=C$+"8-5"+MID$(Z$,6,2):R=R+(F*10-6)/9:F=F AND &H86:PRINT S;K;"SK";S*K:T(8)=T(9)+N*9.5-8:U$=R$+"8-9"+MID$(Z$,3,2):IF K>Q THEN K=K-Q ELSE Q=Q-K
+110 L$=U$+"9-0"+MID$(Z$,1,2):M=M+(X*11-1)/4:X=X AND &H91:PRINT N;A;"NA";N*A:P(3)=P(4)+D*4.5-0:Q$=G$+"9-4"+MID$(Z$,5,2):R=R+(L*11-5)/8:L=L AND &H95:PRINT S;P;"SP";S*P:T(7)=T(8)+S*8.5-0:U$=V$+"9-8"+MID$(Z$,2,2):V=V+(Y*11-9)/12:Y=Y AND &H99:IF L>R THEN L=L-R ELSE R=R-L
+120 M=M+(B*12-0)/3:B=B AND &HA0:PRINT N;E;"NE";N*E:P(2)=P(3)+H*3.5-1:Q$=M$+"10-3"+MID$(Z$,4,2):R=R+(Q*12-4)/7:Q=Q AND &HA4:PRINT S;T;"ST";S*T:T(6)=T(7)+W*7.5-1:U$=Z$+"10-7"+MID$(Z$,1,2):V=V+(C*12-8)/11:C=C AND &HA8:PRINT W;F;"WF";W*F:IF M>S THEN M=M-S ELSE S=S-M
+130 PRINT N;K;"NK";N*K:P(1)=P(2)+N*2.5-2:Q$=R$+"11-2"+MID$(Z$,3,2):R=R+(U*13-3)/6:U=U AND &HB3:PRINT S;X;"SX";S*X:T(5)=T(6)+A*6.5-2:U$=D$+"11-6"+MID$(Z$,7,2):V=V+(G*13-7)/10:G=G AND &HB7:PRINT W;L;"WL";W*L:X(9)=X(0)+P*10.5-2:IF N>T THEN N=N-T ELSE T=T-N
+140 P(0)=P(1)+S*1.5-3:Q$=V$+"12-1"+MID$(Z$,2,2):R=R+(Y*14-2)/5:Y=Y AND &HC2:PRINT S;B;"SB";S*B:T(4)=T(5)+E*5.5-3:U$=H$+"12-5"+MID$(Z$,6,2):V=V+(M*14-6)/9:M=M AND &HC6:PRINT W;Q;"WQ";W*Q:X(8)=X(9)+T*9.5-3:Y$=W$+"12-9"+MID$(Z$,3,2):IF P>U THEN P=P-U ELSE U=U-P
+150 Q$=Z$+"13-0"+MID$(Z$,1,2):R=R+(C*15-1)/4:C=C AND &HD1:PRINT S;F;"SF";S*F:T(3)=T(4)+K*4.5-4:U$=N$+"13-4"+MID$(Z$,5,2):V=V+(R*15-5)/8:R=R AND &HD5:PRINT W;U;"WU";W*U:X(7)=X(8)+X*8.5-4:Y$=A$+"13-8"+MID$(Z$,2,2):Z=Z+(D*15-9)/12:D=D AND &HD9:IF Q>V THEN Q=Q-V ELSE V=V-Q
+160 R=R+(G*16-0)/3:G=G AND &HE0:PRINT S;L;"SL";S*L:T(2)=T(3)+P*3.5-5:U$=S$+"14-3"+MID$(Z$,4,2):V=V+(V*16-4)/7:V=V AND &HE4:PRINT W;Y;"WY";W*Y:X(6)=X(7)+B*7.5-5:Y$=E$+"14-7"+MID$(Z$,1,2):Z=Z+(H*16-8)/11:H=H AND &HE8:PRINT A;M;"AM";A*M:IF R>W THEN R=R-W ELSE W=W-R
+170 PRINT S;Q;"SQ";S*Q:T(1)=T(2)+T*2.5-6:U$=W$+"15-2"+MID$(Z$,3,2):V=V+(Z*17-3)/6:Z=Z AND &HF3:PRINT W;C;"WC";W*C:X(5)=X(6)+F*6.5-6:Y$=K$+"15-6"+MID$(Z$,7,2):Z=Z+(N*17-7)/10:N=N AND &HF7:PRINT A;R;"AR";A*R:B(9)=B(0)+U*10.5-6:IF S>X THEN S=S-X ELSE X=X-S
+180 T(0)=T(1)+X*1.5-7:U$=A$+"16-1"+MID$(Z$,2,2):V=V+(D*18-2)/5:D=D AND &H102:PRINT W;G;"WG";W*G:X(4)=X(5)+L*5.5-7:Y$=P$+"16-5"+MID$(Z$,6,2):Z=Z+(S*18-6)/9:S=S AND &H106:PRINT A;V;"AV";A*V:B(8)=B(9)+Y*9.5-7:C$=B$+"16-9"+MID$(Z$,3,2):IF T>Y THEN T=T-Y ELSE Y=Y-T
+190 U$=E$+"17-0"+MID$(Z$,1,2):V=V+(H*19-1)/4:H=H AND &H111:PRINT W;M;"WM";W*M:X(3)=X(4)+Q*4.5-8:Y$=T$+"17-4"+MID$(Z$,5,2):Z=Z+(W*19-5)/8:W=W AND &H115:PRINT A;Z;"AZ";A*Z:B(7)=B(8)+C*8.5-8:C$=F$+"17-8"+MID$(Z$,2,2):D=D+(K*19-9)/12:K=K AND &H119:IF U>Z THEN U=U-Z ELSE Z=Z-U
+200 V=V+(N*20-0)/3:N=N AND &H120:PRINT W;R;"WR";W*R:X(2)=X(3)+U*3.5-0:Y$=X$+"18-3"+MID$(Z$,4,2):Z=Z+(A*20-4)/7:A=A AND &H124:PRINT A;D;"AD";A*D:B(6)=B(7)+G*7.5-0:C$=L$+"18-7"+MID$(Z$,1,2):D=D+(P*20-8)/11:P=P AND &H128:PRINT E;S;"ES";E*S:IF V>A THEN V=V-A ELSE A=A-V
+210 PRINT W;V;"WV";W*V:X(1)=X(2)+Y*2.5-1:Y$=B$+"19-2"+MID$(Z$,3,2):Z=Z+(E*21-3)/6:E=E AND &H133:PRINT A;H;"AH";A*H:B(5)=B(6)+M*6.5-1:C$=Q$+"19-6"+MID$(Z$,7,2):D=D+(T*21-7)/10:T=T AND &H137:PRINT E;W;"EW";E*W:F(9)=F(0)+Z*10.5-1:IF W>B THEN W=W-B ELSE B=B-W
+220 X(0)=X(1)+C*1.5-2:Y$=F$+"20-1"+MID$(Z$,2,2):Z=Z+(K*22-2)/5:K=K AND &H142:PRINT A;N;"AN";A*N:B(4)=B(5)+R*5.5-2:C$=U$+"20-5"+MID$(Z$,6,2):D=D+(X*22-6)/9:X=X AND &H146:PRINT E;A;"EA";E*A:F(8)=F(9)+D*9.5-2:G$=G$+"20-9"+MID$(Z$,3,2):IF X>C THEN X=X-C ELSE C=C-X
+230 Y$=L$+"21-0"+MID$(Z$,1,2):Z=Z+(P*23-1)/4:P=P AND &H151:PRINT A;S;"AS";A*S:B(3)=B(4)+V*4.5-3:C$=Y$+"21-4"+MID$(Z$,5,2):D=D+(B*23-5)/8:B=B AND &H155:PRINT E;E;"EE";E*E:F(7)=F(8)+H*8.5-3:G$=M$+"21-8"+MID$(Z$,2,2):H=H+(Q*23-9)/12:Q=Q AND &H159:IF Y>D THEN Y=Y-D ELSE D=D-Y
+240 Z=Z+(T*24-0)/3:T=T AND &H160:PRINT A;W;"AW";A*W:B(2)=B(3)+Z*3.5-4:C$=C$+"22-3"+MID$(Z$,4,2):D=D+(F*24-4)/7:F=F AND &H164:PRINT E;K;"EK";E*K:F(6)=F(7)+N*7.5-4:G$=R$+"22-7"+MID$(Z$,1,2):H=H+(U*24-8)/11:U=U AND &H168:PRINT K;X;"KX";K*X:IF Z>E THEN Z=Z-E ELSE E=E-Z
+250 PRINT A;A;"AA";A*A:B(1)=B(2)+D*2.5-5:C$=G$+"23-2"+MID$(Z$,3,2):D=D+(L*25-3)/6:L=L AND &H173:PRINT E;P;"EP";E*P:F(5)=F(6)+S*6.5-5:G$=V$+"23-6"+MID$(Z$,7,2):H=H+(Y*25-7)/10:Y=Y AND &H177:PRINT K;B;"KB";K*B:L(9)=L(0)+E*10.5-5:IF A>F THEN A=A-F ELSE F=F-A
+260 B(0)=B(1)+H*1.5-6:C$=M$+"24-1"+MID$(Z$,2,2):D=D+(Q*26-2)/5:Q=Q AND &H182:PRINT E;T;"ET";E*T:F(4)=F(5)+W*5.5-6:G$=Z$+"24-5"+MID$(Z$,6,2):H=H+(C*26-6)/9:C=C AND &H186:PRINT K;F;"KF";K*F:L(8)=L(9)+K*9.5-6:M$=N$+"24-9"+MID$(Z$,3,2):IF B>G THEN B=B-G ELSE G=G-B
+270 C$=R$+"25-0"+MID$(Z$,1,2):D=D+(U*27-1)/4:U=U AND &H191:PRINT E;X;"EX";E*X:F(3)=F(4)+A*4.5-7:G$=D$+"25-4"+MID$(Z$,5,2):H=H+(G*27-5)/8:G=G AND &H195:PRINT K;L;"KL";K*L:L(7)=L(8)+P*8.5-7:M$=S$+"25-8"+MID$(Z$,2,2):N=N+(V*27-9)/12:V=V AND &H199:IF C>H THEN C=C-H ELSE H=H-C
+280 D=D+(Y*28-0)/3:Y=Y AND &H1A0:PRINT E;B;"EB";E*B:F(2)=F(3)+E*3.5-8:G$=H$+"26-3"+MID$(Z$,4,2):H=H+(M*28-4)/7:M=M AND &H1A4:PRINT K;Q;"KQ";K*Q:L(6)=L(7)+T*7.5-8:M$=W$+"26-7"+MID$(Z$,1,2):N=N+(Z*28-8)/11:Z=Z AND &H1A8:PRINT P;C;"PC";P*C:IF D>K THEN D=D-K ELSE K=K-D
+290 PRINT E;F;"EF";E*F:F(1)=F(2)+K*2.5-0:G$=N$+"27-2"+MID$(Z$,3,2):H=H+(R*29-3)/6:R=R AND &H1B3:PRINT K;U;"KU";K*U:L(5)=L(6)+X*6.5-0:M$=A$+"27-6"+MID$(Z$,7,2):N=N+(D*29-7)/10:D=D AND &H1B7:PRINT P;G;"PG";P*G:Q(9)=Q(0)+L*10.5-0:IF E>L THEN E=E-L ELSE L=L-E
+300 F(0)=F(1)+P*1.5-1:G$=S$+"28-1"+MID$(Z$,2,2):H=H+(V*30-2)/5:V=V AND &H1C2:PRINT K;Y;"KY";K*Y:L(4)=L(5)+B*5.5-1:M$=E$+"28-5"+MID$(Z$,6,2):N=N+(H*30-6)/9:H=H AND &H1C6:PRINT P;M;"PM";P*M:Q(8)=Q(9)+Q*9.5-1:R$=T$+"28-9"+MID$(Z$,3,2):IF F>M THEN F=F-M ELSE M=M-F
+310 G$=W$+"29-0"+MID$(Z$,1,2):H=H+(Z*31-1)/4:Z=Z AND &H1D1:PRINT K;C;"KC";K*C:L(3)=L(4)+F*4.5-2:M$=K$+"29-4"+MID$(Z$,5,2):N=N+(N*31-5)/8:N=N AND &H1D5:PRINT P;R;"PR";P*R:Q(7)=Q(8)+U*8.5-2:R$=X$+"29-8"+MID$(Z$,2,2):S=S+(A*31-9)/12:A=A AND &H1D9:IF G>N THEN G=G-N ELSE N=N-G
+320 H=H+(D*32-0)/3:D=D AND &H1E0:PRINT K;G;"KG";K*G:L(2)=L(3)+L*3.5-3:M$=P$+"30-3"+MID$(Z$,4,2):N=N+(S*32-4)/7:S=S AND &H1E4:PRINT P;V;"PV";P*V:Q(6)=Q(7)+Y*7.5-3:R$=B$+"30-7"+MID$(Z$,1,2):S=S+(E*32-8)/11:E=E AND &H1E8:PRINT T;H;"TH";T*H:IF H>P THEN H=H-P ELSE P=P-H
+330 PRINT K;M;"KM";K*M:L(1)=L(2)+Q*2.5-4:M$=T$+"31-2"+MID$(Z$,3,2):N=N+(W*33-3)/6:W=W AND &H1F3:PRINT P;Z;"PZ";P*Z:Q(5)=Q(6)+C*6.5-4:R$=F$+"31-6"+MID$(Z$,7,2):S=S+(K*33-7)/10:K=K AND &H1F7:PRINT T;N;"TN";T*N:U(9)=U(0)+R*10.5-4:IF K>Q THEN K=K-Q ELSE Q=Q-K
+340 L(0)=L(1)+U*1.5-5:M$=X$+"32-1"+MID$(Z$,2,2):N=N+(A*34-2)/5:A=A AND &H202:PRINT P;D;"PD";P*D:Q(4)=Q(5)+G*5.5-5:R$=L$+"32-5"+MID$(Z$,6,2):S=S+(P*34-6)/9:P=P AND &H206:PRINT T;S;"TS";T*S:U(8)=U(9)+V*9.5-5:V$=Y$+"32-9"+MID$(Z$,3,2):IF L>R THEN L=L-R ELSE R=R-L
+350 M$=B$+"33-0"+MID$(Z$,1,2):N=N+(E*35-1)/4:E=E AND &H211:PRINT P;H;"PH";P*H:Q(3)=Q(4)+M*4.5-6:R$=Q$+"33-4"+MID$(Z$,5,2):S=S+(T*35-5)/8:T=T AND &H215:PRINT T;W;"TW";T*W:U(7)=U(8)+Z*8.5-6:V$=C$+"33-8"+MID$(Z$,2,2):W=W+(F*35-9)/12:F=F AND &H219:IF M>S THEN M=M-S ELSE S=S-M
+360 N=N+(K*36-0)/3:K=K AND &H220:PRINT P;N;"PN";P*N:Q(2)=Q(3)+R*3.5-7:R$=U$+"34-3"+MID$(Z$,4,2):S=S+(X*36-4)/7:X=X AND &H224:PRINT T;A;"TA";T*A:U(6)=U(7)+D*7.5-7:V$=G$+"34-7"+MID$(Z$,1,2):W=W+(L*36-8)/11:L=L AND &H228:PRINT X;P;"XP";X*P:IF N>T THEN N=N-T ELSE T=T-N
+370 PRINT P;S;"PS";P*S:Q(1)=Q(2)+V*2.5-8:R$=Y$+"35-2"+MID$(Z$,3,2):S=S+(B*37-3)/6:B=B AND &H233:PRINT T;E;"TE";T*E:U(5)=U(6)+H*6.5-8:V$=M$+"35-6"+MID$(Z$,7,2):W=W+(Q*37-7)/10:Q=Q AND &H237:PRINT X;T;"XT";X*T:Y(9)=Y(0)+W*10.5-8:IF P>U THEN P=P-U ELSE U=U-P
+380 Q(0)=Q(1)+Z*1.5-0:R$=C$+"36-1"+MID$(Z$,2,2):S=S+(F*38-2)/5:F=F AND &H242:PRINT T;K;"TK";T*K:U(4)=U(5)+N*5.5-0:V$=R$+"36-5"+MID$(Z$,6,2):W=W+(U*38-6)/9:U=U AND &H246:PRINT X;X;"XX";X*X:Y(8)=Y(9)+A*9.5-0:Z$=D$+"36-9"+MID$(Z$,3,2):IF Q>V THEN Q=Q-V ELSE V=V-Q
+390 R$=G$+"37-0"+MID$(Z$,1,2):S=S+(L*39-1)/4:L=L AND &H251:PRINT T;P;"TP";T*P:U(3)=U(4)+S*4.5-1:V$=V$+"37-4"+MID$(Z$,5,2):W=W+(Y*39-5)/8:Y=Y AND &H255:PRINT X;B;"XB";X*B:Y(7)=Y(8)+E*8.5-1:Z$=H$+"37-8"+MID$(Z$,2,2):A=A+(M*39-9)/12:M=M AND &H259:IF R>W THEN R=R-W ELSE W=W-R
+400 S=S+(Q*40-0)/3:Q=Q AND &H260:PRINT T;T;"TT";T*T:U(2)=U(3)+W*3.5-2:V$=Z$+"38-3"+MID$(Z$,4,2):W=W+(C*40-4)/7:C=C AND &H264:PRINT X;F;"XF";X*F:Y(6)=Y(7)+K*7.5-2:Z$=N$+"38-7"+MID$(Z$,1,2):A=A+(R*40-8)/11:R=R AND &H268:PRINT B;U;"BU";B*U:IF S>X THEN S=S-X ELSE X=X-S
+410 PRINT T;X;"TX";T*X:U(1)=U(2)+A*2.5-3:V$=D$+"39-2"+MID$(Z$,3,2):W=W+(G*41-3)/6:G=G AND &H273:PRINT X;L;"XL";X*L:Y(5)=Y(6)+P*6.5-3:Z$=S$+"39-6"+MID$(Z$,7,2):A=A+(V*41-7)/10:V=V AND &H277:PRINT B;Y;"BY";B*Y:C(9)=C(0)+B*10.5-3:IF T>Y THEN T=T-Y ELSE Y=Y-T
+420 U(0)=U(1)+E*1.5-4:V$=H$+"40-1"+MID$(Z$,2,2):W=W+(M*42-2)/5:M=M AND &H282:PRINT X;Q;"XQ";X*Q:Y(4)=Y(5)+T*5.5-4:Z$=W$+"40-5"+MID$(Z$,6,2):A=A+(Z*42-6)/9:Z=Z AND &H286:PRINT B;C;"BC";B*C:C(8)=C(9)+F*9.5-4:D$=K$+"40-9"+MID$(Z$,3,2):IF U>Z THEN U=U-Z ELSE Z=Z-U
+430 V$=N$+"41-0"+MID$(Z$,1,2):W=W+(R*43-1)/4:R=R AND &H291:PRINT X;U;"XU";X*U:Y(3)=Y(4)+X*4.5-5:Z$=A$+"41-4"+MID$(Z$,5,2):A=A+(D*43-5)/8:D=D AND &H295:PRINT B;G;"BG";B*G:C(7)=C(8)+L*8.5-5:D$=P$+"41-8"+MID$(Z$,2,2):E=E+(S*43-9)/12:S=S AND &H299:IF V>A THEN V=V-A ELSE A=A-V
+440 W=W+(V*44-0)/3:V=V AND &H2A0:PRINT X;Y;"XY";X*Y:Y(2)=Y(3)+B*3.5-6:Z$=E$+"42-3"+MID$(Z$,4,2):A=A+(H*44-4)/7:H=H AND &H2A4:PRINT B;M;"BM";B*M:C(6)=C(7)+Q*7.5-6:D$=T$+"42-7"+MID$(Z$,1,2):E=E+(W*44-8)/11:W=W AND &H2A8:PRINT F;Z;"FZ";F*Z:IF W>B THEN W=W-B ELSE B=B-W
+450 PRINT X;C;"XC";X*C:Y(1)=Y(2)+F*2.5-7:Z$=K$+"43-2"+MID$(Z$,3,2):A=A+(N*45-3)/6:N=N AND &H2B3:PRINT B;R;"BR";B*R:C(5)=C(6)+U*6.5-7:D$=X$+"43-6"+MID$(Z$,7,2):E=E+(A*45-7)/10:A=A AND &H2B7:PRINT F;D;"FD";F*D:G(9)=G(0)+G*10.5-7:IF X>C THEN X=X-C ELSE C=C-X
+460 Y(0)=Y(1)+L*1.5-8:Z$=P$+"44-1"+MID$(Z$,2,2):A=A+(S*46-2)/5:S=S AND &H2C2:PRINT B;V;"BV";B*V:C(4)=C(5)+Y*5.5-8:D$=B$+"44-5"+MID$(Z$,6,2):E=E+(E*46-6)/9:E=E AND &H2C6:PRINT F;H;"FH";F*H:G(8)=G(9)+M*9.5-8:H$=Q$+"44-9"+MID$(Z$,3,2):IF Y>D THEN Y=Y-D ELSE D=D-Y
+470 Z$=T$+"45-0"+MID$(Z$,1,2):A=A+(W*47-1)/4:W=W AND &H2D1:PRINT B;Z;"BZ";B*Z:C(3)=C(4)+C*4.5-0:D$=F$+"45-4"+MID$(Z$,5,2):E=E+(K*47-5)/8:K=K AND &H2D5:PRINT F;N;"FN";F*N:G(7)=G(8)+R*8.5-0:H$=U$+"45-8"+MID$(Z$,2,2):K=K+(X*47-9)/12:X=X AND &H2D9:IF Z>E THEN Z=Z-E ELSE E=E-Z
+480 A=A+(A*48-0)/3:A=A AND &H2E0:PRINT B;D;"BD";B*D:C(2)=C(3)+G*3.5-1:D$=L$+"46-3"+MID$(Z$,4,2):E=E+(P*48-4)/7:P=P AND &H2E4:PRINT F;S;"FS";F*S:G(6)=G(7)+V*7.5-1:H$=Y$+"46-7"+MID$(Z$,1,2):K=K+(B*48-8)/11:B=B AND &H2E8:PRINT L;E;"LE";L*E:IF A>F THEN A=A-F ELSE F=F-A
+490 PRINT B;H;"BH";B*H:C(1)=C(2)+M*2.5-2:D$=Q$+"47-2"+MID$(Z$,3,2):E=E+(T*49-3)/6:T=T AND &H2F3:PRINT F;W;"FW";F*W:G(5)=G(6)+Z*6.5-2:H$=C$+"47-6"+MID$(Z$,7,2):K=K+(F*49-7)/10:F=F AND &H2F7:PRINT L;K;"LK";L*K:M(9)=M(0)+N*10.5-2:IF B>G THEN B=B-G ELSE G=G-B
+500 C(0)=C(1)+R*1.5-3:D$=U$+"48-1"+MID$(Z$,2,2):E=E+(X*50-2)/5:X=X AND &H302:PRINT F;A;"FA";F*A:G(4)=G(5)+D*5.5-3:H$=G$+"48-5"+MID$(Z$,6,2):K=K+(L*50-6)/9:L=L AND &H306:PRINT L;P;"LP";L*P:M(8)=M(9)+S*9.5-3:N$=V$+"48-9"+MID$(Z$,3,2):IF C>H THEN C=C-H ELSE H=H-C
+510 D$=Y$+"49-0"+MID$(Z$,1,2):E=E+(B*51-1)/4:B=B AND &H311:PRINT F;E;"FE";F*E:G(3)=G(4)+H*4.5-4:H$=M$+"49-4"+MID$(Z$,5,2):K=K+(Q*51-5)/8:Q=Q AND &H315:PRINT L;T;"LT";L*T:M(7)=M(8)+W*8.5-4:N$=Z$+"49-8"+MID$(Z$,2,2):P=P+(C*51-9)/12:C=C AND &H319:IF D>K THEN D=D-K ELSE K=K-D
+520 E=E+(F*52-0)/3:F=F AND &H320:PRINT F;K;"FK";F*K:G(2)=G(3)+N*3.5-5:H$=R$+"50-3"+MID$(Z$,4,2):K=K+(U*52-4)/7:U=U AND &H324:PRINT L;X;"LX";L*X:M(6)=M(7)+A*7.5-5:N$=D$+"50-7"+MID$(Z$,1,2):P=P+(G*52-8)/11:G=G AND &H328:PRINT Q;L;"QL";Q*L:IF E>L THEN E=E-L ELSE L=L-E
+530 PRINT F;P;"FP";F*P:G(1)=G(2)+S*2.5-6:H$=V$+"51-2"+MID$(Z$,3,2):K=K+(Y*53-3)/6:Y=Y AND &H333:PRINT L;B;"LB";L*B:M(5)=M(6)+E*6.5-6:N$=H$+"51-6"+MID$(Z$,7,2):P=P+(M*53-7)/10:M=M AND &H337:PRINT Q;Q;"QQ";Q*Q:R(9)=R(0)+T*10.5-6:IF F>M THEN F=F-M ELSE M=M-F
+540 G(0)=G(1)+W*1.5-7:H$=Z$+"52-1"+MID$(Z$,2,2):K=K+(C*54-2)/5:C=C AND &H342:PRINT L;F;"LF";L*F:M(4)=M(5)+K*5.5-7:N$=N$+"52-5"+MID$(Z$,6,2):P=P+(R*54-6)/9:R=R AND &H346:PRINT Q;U;"QU";Q*U:R(8)=R(9)+X*9.5-7:S$=A$+"52-9"+MID$(Z$,3,2):IF G>N THEN G=G-N ELSE N=N-G
+550 H$=D$+"53-0"+MID$(Z$,1,2):K=K+(G*55-1)/4:G=G AND &H351:PRINT L;L;"LL";L*L:M(3)=M(4)+P*4.5-8:N$=S$+"53-4"+MID$(Z$,5,2):P=P+(V*55-5)/8:V=V AND &H355:PRINT Q;Y;"QY";Q*Y:R(7)=R(8)+B*8.5-8:S$=E$+"53-8"+MID$(Z$,2,2):T=T+(H*55-9)/12:H=H AND &H359:IF H>P THEN H=H-P ELSE P=P-H
+560 K=K+(M*56-0)/3:M=M AND &H360:PRINT L;Q;"LQ";L*Q:M(2)=M(3)+T*3.5-0:N$=W$+"54-3"+MID$(Z$,4,2):P=P+(Z*56-4)/7:Z=Z AND &H364:PRINT Q;C;"QC";Q*C:R(6)=R(7)+F*7.5-0:S$=K$+"54-7"+MID$(Z$,1,2):T=T+(N*56-8)/11:N=N AND &H368:PRINT U;R;"UR";U*R:IF K>Q THEN K=K-Q ELSE Q=Q-K
+570 PRINT L;U;"LU";L*U:M(1)=M(2)+X*2.5-1:N$=A$+"55-2"+MID$(Z$,3,2):P=P+(D*57-3)/6:D=D AND &H373:PRINT Q;G;"QG";Q*G:R(5)=R(6)+L*6.5-1:S$=P$+"55-6"+MID$(Z$,7,2):T=T+(S*57-7)/10:S=S AND &H377:PRINT U;V;"UV";U*V:V(9)=V(0)+Y*10.5-1:IF L>R THEN L=L-R ELSE R=R-L
+580 M(0)=M(1)+B*1.5-2:N$=E$+"56-1"+MID$(Z$,2,2):P=P+(H*58-2)/5:H=H AND &H382:PRINT Q;M;"QM";Q*M:R(4)=R(5)+Q*5.5-2:S$=T$+"56-5"+MID$(Z$,6,2):T=T+(W*58-6)/9:W=W AND &H386:PRINT U;Z;"UZ";U*Z:V(8)=V(9)+C*9.5-2:W$=F$+"56-9"+MID$(Z$,3,2):IF M>S THEN M=M-S ELSE S=S-M
+590 N$=K$+"57-0"+MID$(Z$,1,2):P=P+(N*59-1)/4:N=N AND &H391:PRINT Q;R;"QR";Q*R:R(3)=R(4)+U*4.5-3:S$=X$+"57-4"+MID$(Z$,5,2):T=T+(A*59-5)/8:A=A AND &H395:PRINT U;D;"UD";U*D:V(7)=V(8)+G*8.5-3:W$=L$+"57-8"+MID$(Z$,2,2):X=X+(P*59-9)/12:P=P AND &H399:IF N>T THEN N=N-T ELSE T=T-N
+600 P=P+(S*60-0)/3:S=S AND &H3A0:PRINT Q;V;"QV";Q*V:R(2)=R(3)+Y*3.5-4:S$=B$+"58-3"+MID$(Z$,4,2):T=T+(E*60-4)/7:E=E AND &H3A4:PRINT U;H;"UH";U*H:V(6)=V(7)+M*7.5-4:W$=Q$+"58-7"+MID$(Z$,1,2):X=X+(T*60-8)/11:T=T AND &H3A8:PRINT Y;W;"YW";Y*W:IF P>U THEN P=P-U ELSE U=U-P
+610 PRINT Q;Z;"QZ";Q*Z:R(1)=R(2)+C*2.5-5:S$=F$+"59-2"+MID$(Z$,3,2):T=T+(K*61-3)/6:K=K AND &H3B3:PRINT U;N;"UN";U*N:V(5)=V(6)+R*6.5-5:W$=U$+"59-6"+MID$(Z$,7,2):X=X+(X*61-7)/10:X=X AND &H3B7:PRINT Y;A;"YA";Y*A:Z(9)=Z(0)+D*10.5-5:IF Q>V THEN Q=Q-V ELSE V=V-Q
+620 END
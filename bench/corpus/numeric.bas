@@ -0,0 +1,36 @@
+10 REM NUMERIC-HEAVY: FINANCE, GEOMETRY AND SERIES
+20 DEFDBL D:DEFSNG S
+30 P=150000!:R=6.75E-2:Y=30:N=Y*12:I=R/12
+40 M=P*I*(1+I)^N/((1+I)^N-1)
+50 PRINT "MONTHLY PAYMENT";INT(M*100+0.5)/100
+60 B=P:T=0
+70 FOR K=1 TO N:Q=B*I:B=B-(M-Q):T=T+Q:NEXT K
+80 PRINT "TOTAL INTEREST";INT(T*100+0.5)/100
+90 D=0#:FOR K=1 TO 1000:D=D+1#/(K*K):NEXT K:PRINT "ZETA(2)";D;SQR(D*6#)
+100 S=0:X=0.5:FOR K=0 TO 20:S=S+X^K/FACT(K):NEXT K:PRINT "EXP(0.5)";S;EXP(0.5)
+110 PI#=3.14159265358979D0:E#=2.71828182845905D0:G#=1.61803398874989D0
+120 FOR A=0 TO 360 STEP 15:R#=A*PI#/180#:PRINT A;SIN(R#);COS(R#);TAN(R#+1E-10):NEXT A
+130 X1=1.5:Y1=-2.25:X2=3.75E+1:Y2=-4.125E-1:DX=X2-X1:DY=Y2-Y1
+140 L=SQR(DX*DX+DY*DY):H=ATN(DY/DX)*180/3.14159:PRINT "LENGTH";L;"HEADING";H
+150 C=&HFF00:O=&777:Z=&H7FFF:W=C AND &H0FF0 OR O XOR Z
+160 PRINT HEX$(W);OCT$(W);W\256;W MOD 256;-W;ABS(-W)
+170 F=0:G=1:FOR K=1 TO 24:T=F+G:F=G:G=T:NEXT K:PRINT "FIB(25)";G
+180 N=1:FOR K=1 TO 7:N=N*K:NEXT K:PRINT "7!=";N;N/5040;N\5040
+190 A=1:B=-3:C=2:D=B*B-4*A*C
+200 IF D<0 THEN PRINT "COMPLEX" ELSE PRINT "ROOTS";(-B+SQR(D))/(2*A);(-B-SQR(D))/(2*A)
+210 S=0:FOR K=1 TO 100:S=S+(-1)^(K+1)/(2*K-1):NEXT K:PRINT "PI ESTIMATE";4*S
+220 V=4/3*3.14159*2.5^3:AR=4*3.14159*2.5^2:PRINT "SPHERE";V;AR
+230 T1=98.6:T2=(T1-32)*5/9:T3=T2+273.15:PRINT T1;T2;T3
+240 X=12345.6789#:Y=INT(X):Z=X-Y:PRINT Y;Z;FIX(-X);CINT(X/1000);CSNG(X);CDBL(Z)
+250 FOR K=-5 TO 5:PRINT SGN(K);K^2;K^3;2^K;10^(K/10):NEXT K
+260 M1=1E+30:M2=1E-30:M3=M1*M2:M4=1.7D+308/1D+300:PRINT M3;M4
+270 FOR K=1 TO 10:PRINT K,LOG(K),LOG(K)/LOG(10),SQR(K),K^(1/3):NEXT K
+280 R1=RND(-1):FOR K=1 TO 10:R2=RND(1)*100:S=S+R2:NEXT K:PRINT "MEAN";S/10
+290 FOR K=1 TO 12:PRINT USING$(K*1.0825,2);100*(1.05^K-1);1000/(1+0.04)^K:NEXT K
+300 DATA 3.14159,2.71828,1.41421,1.73205,2.23607,0.57722,1.61803,0.69315
+310 DATA -1.5E+10,2.5E-10,&HFFFF,&17,32767,-32768,65535,1D+100,1.0#,2.5!,7%
+320 FOR K=1 TO 19:READ V:S=S+V:NEXT K:PRINT "DATA SUM";S
+330 A%=32767:B%=-32768:C%=A%\256:D%=B% MOD 7:E%=A% AND B% OR 255:PRINT A%;B%;C%;D%;E%
+340 X#=1#/3#:Y!=1!/3!:PRINT X#;Y!;X#-Y!;ABS(X#-Y!)<1E-7
+350 FOR K=0 TO 15:PRINT 2^K-1;(2^K-1) AND &HAAAA;(2^K-1) OR &H5555;NOT K:NEXT K
+360 END
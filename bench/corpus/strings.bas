@@ -0,0 +1,52 @@
+10 REM STRING-HEAVY: A SMALL TEXT ADVENTURE
+20 DIM R$(12),D$(12),E(12,4),O$(20),L(20)
+30 FOR I=1 TO 12:READ R$(I),D$(I):FOR J=1 TO 4:READ E(I,J):NEXT J:NEXT I
+40 FOR I=1 TO 20:READ O$(I),L(I):NEXT I
+50 R=1:I$="":M$="WELCOME TO THE CAVE OF SHADOWS. TYPE HELP FOR A LIST OF COMMANDS."
+60 PRINT M$:PRINT STRING$(LEN(M$),"-")
+70 PRINT:PRINT "YOU ARE IN ";R$(R);".":PRINT D$(R)
+80 FOR I=1 TO 20:IF L(I)=R THEN PRINT "THERE IS A ";O$(I);" HERE."
+90 NEXT I
+100 INPUT "WHAT NOW";C$
+110 C$=UPPER$(LEFT$(C$,1))+MID$(C$,2):V$="":N$=""
+120 P=INSTR(C$," "):IF P>0 THEN V$=LEFT$(C$,P-1):N$=MID$(C$,P+1) ELSE V$=C$
+130 IF V$="N" OR V$="NORTH" THEN D=1:GOTO 300
+140 IF V$="S" OR V$="SOUTH" THEN D=2:GOTO 300
+150 IF V$="E" OR V$="EAST" THEN D=3:GOTO 300
+160 IF V$="W" OR V$="WEST" THEN D=4:GOTO 300
+170 IF V$="TAKE" OR V$="GET" THEN GOSUB 400:GOTO 70
+180 IF V$="DROP" THEN GOSUB 500:GOTO 70
+190 IF V$="INVENTORY" OR V$="I" THEN GOSUB 600:GOTO 100
+200 IF V$="HELP" THEN PRINT "COMMANDS: NORTH, SOUTH, EAST, WEST, TAKE, DROP, INVENTORY, QUIT":GOTO 100
+210 IF V$="QUIT" THEN PRINT "THANKS FOR PLAYING, ";N$;"! GOODBYE.":END
+220 PRINT "I DON'T KNOW HOW TO ";CHR$(34);C$;CHR$(34);" SOMETHING.":GOTO 100
+300 IF E(R,D)=0 THEN PRINT "YOU CAN'T GO THAT WAY.":GOTO 100
+310 R=E(R,D):GOTO 70
+400 FOR I=1 TO 20:IF O$(I)=N$ AND L(I)=R THEN L(I)=0:PRINT "TAKEN: ";O$(I):RETURN
+410 NEXT I:PRINT "I SEE NO ";N$;" HERE.":RETURN
+500 FOR I=1 TO 20:IF O$(I)=N$ AND L(I)=0 THEN L(I)=R:PRINT "DROPPED: ";O$(I):RETURN
+510 NEXT I:PRINT "YOU ARE NOT CARRYING A ";N$;".":RETURN
+600 T$="":FOR I=1 TO 20:IF L(I)=0 THEN T$=T$+O$(I)+", "
+610 NEXT I:IF T$="" THEN PRINT "YOU ARE EMPTY-HANDED." ELSE PRINT "YOU CARRY: ";LEFT$(T$,LEN(T$)-2)
+620 RETURN
+700 A$="THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG":B$=""
+710 FOR I=LEN(A$) TO 1 STEP -1:B$=B$+MID$(A$,I,1):NEXT I
+720 PRINT "REVERSED: ";B$:PRINT "UPPER: ";A$;" LOWER: ";LOWER$(A$)
+730 W$="":FOR I=1 TO LEN(A$):IF MID$(A$,I,1)=" " THEN PRINT W$:W$="" ELSE W$=W$+MID$(A$,I,1)
+740 NEXT I:PRINT W$:RETURN
+800 MID$(A$,5,5)="SLOW ":PRINT A$;TAB(40);"<-- EDITED":RETURN
+1000 DATA "THE ENTRANCE HALL","A DRAFTY HALL WITH A HIGH VAULTED CEILING AND TORN TAPESTRIES.",2,0,3,0
+1010 DATA "THE LIBRARY","DUSTY SHELVES SAG UNDER THE WEIGHT OF FORGOTTEN BOOKS.",4,1,0,0
+1020 DATA "THE KITCHEN","A COLD HEARTH AND A TABLE SET FOR A MEAL NOBODY ATE.",0,0,5,1
+1030 DATA "THE OBSERVATORY","A BRASS TELESCOPE POINTS AT A CRACK IN THE DOME.",0,2,6,0
+1040 DATA "THE PANTRY","JARS OF PICKLED SOMETHING LINE THE WALLS. SOME ARE MOVING.",0,0,0,3
+1050 DATA "THE GALLERY","PORTRAITS WHOSE EYES FOLLOW YOU ACROSS THE ROOM.",7,0,0,4
+1060 DATA "THE CHAPEL","CANDLES BURN WITHOUT WAX ON A SILENT ALTAR.",0,6,8,0
+1070 DATA "THE CRYPT","STONE COFFINS, ONE OF THEM SLIGHTLY OPEN.",9,0,0,7
+1080 DATA "THE WELL ROOM","A DEEP SHAFT ECHOES WITH DRIPPING WATER.",10,8,0,0
+1090 DATA "THE MIRROR MAZE","A HUNDRED REFLECTIONS, NONE OF THEM QUITE YOU.",0,9,11,0
+1100 DATA "THE THRONE ROOM","A CROWN RESTS ON AN EMPTY THRONE OF BLACK GLASS.",0,0,12,10
+1110 DATA "THE EXIT","DAYLIGHT! THE WAY OUT IS JUST AHEAD.",0,0,0,11
+1200 DATA "LANTERN",1,"KEY",3,"BOOK",2,"MAP",4,"ROPE",5,"CANDLE",7,"SKULL",8
+1210 DATA "COIN",9,"MIRROR",10,"CROWN",11,"SWORD",6,"SHIELD",6,"BREAD",3,"WINE",5
+1220 DATA "SCROLL",2,"RING",11,"FEATHER",4,"BONE",8,"GEM",10,"FLASK",9
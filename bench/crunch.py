@@ -0,0 +1,51 @@
+import re
+import timeit
+from collections import deque
+from lang.tokens import TokenScan, Token, Ident
+
+program = [
+    "TOTAL=SUBTOTAL+COUNTER*RATE",
+    "FORINDEX=FIRSTTOLAST",
+    "IFBALANCETHENPRINTNAME",
+    "ACCOUNTNUMBER=CUSTOMERID",
+    "XPOSITION=YPOSITION",
+    "GOSUBHANDLER",
+    "WIDTH=HEIGHT",
+    "A=B",
+]
+
+
+def linear_scan(v: deque[Token], s: str) -> str:
+    for word, token in TokenScan.words:
+        idx = s.find(word)
+        if idx == 0:
+            v.append(token)
+            s = s[len(word) :]
+        if idx > 0:
+            v.append(Token.Ident(Ident.Plain(s[:idx])))
+            v.append(token)
+            s = s[idx + len(word) :]
+    return s
+
+
+runs = [run for line in program for run in re.findall("[A-Z]+", line)]
+
+
+def crunch_program(alphabetic):
+    for run in runs:
+        alphabetic(deque(), run)
+
+
+def main(number: int = 2000):
+    for name, alphabetic in [
+        ("linear", linear_scan),
+        ("indexed", TokenScan.alphabetic),
+    ]:
+        seconds = min(
+            timeit.repeat(lambda: crunch_program(alphabetic), number=number, repeat=5)
+        )
+        print(f"{name:8} {number * len(program) / seconds:12.0f} lines/s")
+
+
+if __name__ == "__main__":
+    main()
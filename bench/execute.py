@@ -0,0 +1,99 @@
+import argparse
+import io
+import json
+import platform
+import time
+from pathlib import Path
+from lang.bytecode import compile_program
+from lang.closure import Closures
+from lang.line import load_lines
+from lang.resolve import resolve_program
+from lang.runtime import Runtime
+from lang.transpile import Machine, Module
+from lang.vm import VM
+
+programs_dir = Path(__file__).parent / "programs"
+
+
+class Benchmark:
+    def __init__(self, path: Path):
+        self.name = path.stem
+        self.lines = load_lines(path.read_text())
+        self.symbols = resolve_program(self.lines)
+
+    def vm(self) -> str:
+        output = io.StringIO()
+        VM(compile_program(self.lines), Runtime(output)).run()
+        return output.getvalue()
+
+    def closure(self) -> str:
+        output = io.StringIO()
+        Closures(self.lines, Runtime(output)).run()
+        return output.getvalue()
+
+    def transpile(self) -> str:
+        output = io.StringIO()
+        Machine(Module.load(self.lines), Runtime(output)).run()
+        return output.getvalue()
+
+
+engines = ["vm", "closure", "transpile"]
+
+
+def measure(program: Benchmark, engine: str, repeat: int) -> dict:
+    run = getattr(program, engine)
+    output = run()
+    seconds = min(timed(run) for _ in range(repeat))
+    return {
+        "program": program.name,
+        "engine": engine,
+        "lines": len(program.lines),
+        "variables": variables(program),
+        "seconds": seconds,
+        "output": output,
+    }
+
+
+def variables(program: Benchmark) -> dict:
+    return {
+        kind.name.lower(): {t.name.lower(): n for t, n in counts.items()}
+        for kind, counts in program.symbols.counts().items()
+    }
+
+
+def timed(run) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m bench.execute")
+    parser.add_argument("files", nargs="*", type=Path)
+    parser.add_argument("--engine", action="append", choices=engines)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args(argv)
+
+    files = args.files or sorted(programs_dir.glob("*.bas"))
+    results = [
+        measure(Benchmark(path), engine, args.repeat)
+        for path in files
+        for engine in args.engine or engines
+    ]
+
+    for r in results:
+        print(f"{r['program']:12} {r['engine']:8} {r['seconds'] * 1000:10.1f} ms")
+
+    if args.json is not None:
+        report = {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
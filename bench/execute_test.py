@@ -0,0 +1,23 @@
+import unittest
+from bench.execute import Benchmark, engines, measure, programs_dir
+
+
+class TestExecute(unittest.TestCase):
+    def test_programs_run(self):
+        for path in sorted(programs_dir.glob("*.bas")):
+            program = Benchmark(path)
+            outputs = {engine: getattr(program, engine)() for engine in engines}
+            self.assertGreater(len(outputs[engines[0]]), 0)
+            self.assertEqual(len(set(outputs.values())), 1)
+
+    def test_measure(self):
+        program = Benchmark(programs_dir / "strings.bas")
+        for engine in engines:
+            result = measure(program, engine, 1)
+            self.assertEqual(result["engine"], engine)
+            self.assertGreater(result["seconds"], 0)
+            self.assertGreater(result["variables"]["scalar"]["string"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import argparse
+import gc
+import json
+import platform
+import tracemalloc
+from pathlib import Path
+from lang.lex import lex_program, split_line_number
+from lang.line import Line
+from lang.parse import parse
+from bench.suite import corpus_dir
+
+
+class NodeCounter:
+    def __init__(self):
+        self.expressions = 0
+        self.variables = 0
+        self.statements = 0
+
+    def visit_expression(self, expr):
+        self.expressions += 1
+
+    def visit_variable(self, var):
+        self.variables += 1
+
+    def visit_statement(self, statement):
+        self.statements += 1
+
+    def total(self) -> int:
+        return self.expressions + self.variables + self.statements
+
+
+def maximal_program(lines: int = Line.max_number) -> str:
+    bodies = list()
+    for path in sorted(corpus_dir.glob("*.bas")):
+        for source_line in path.read_text().splitlines():
+            _, body = split_line_number(source_line)
+            if body.strip() != "":
+                bodies.append(body.strip())
+    return "\n".join(
+        f"{number} {bodies[(number - 1) % len(bodies)]}"
+        for number in range(1, lines + 1)
+    )
+
+
+def measure(lines: int) -> dict:
+    program = list(lex_program(maximal_program(lines)))
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        spans = dict()
+        asts = [parse(number, tokens, spans=spans) for number, tokens in program]
+        gc.collect()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    counter = NodeCounter()
+    for statements in asts:
+        for statement in statements:
+            statement.accept(counter)
+    return {
+        "lines": len(program),
+        "statements": counter.statements,
+        "expressions": counter.expressions,
+        "variables": counter.variables,
+        "retained_bytes": after - before,
+        "peak_bytes": peak - before,
+        "bytes_per_node": (after - before) / counter.total(),
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m bench.memory")
+    parser.add_argument("--lines", type=int, default=Line.max_number)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args(argv)
+
+    result = measure(args.lines)
+    for key, value in result.items():
+        if type(value) is float:
+            print(f"{key:16} {value:14,.1f}")
+        else:
+            print(f"{key:16} {value:14,}")
+
+    if args.json is not None:
+        report = {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "result": result,
+        }
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+10 REM Nested FOR loops with single precision arithmetic
+20 T=0
+30 FOR I=1 TO 60
+40 FOR J=1 TO 60
+50 FOR K=1 TO 20
+60 T=T+I*J-K
+70 NEXT K,J,I
+80 PRINT T
@@ -0,0 +1,13 @@
+10 REM Sieve of Eratosthenes, after the BYTE benchmark
+20 DEFINT A-Z
+30 S=8190:DIM F(8190)
+40 FOR K=1 TO 2
+50 C=0
+60 FOR I=0 TO S:F(I)=1:NEXT I
+70 FOR I=0 TO S
+80 IF F(I)=0 THEN 110
+90 P=I+I+3:C=C+1
+100 FOR J=I+P TO S STEP P:F(J)=0:NEXT J
+110 NEXT I
+120 NEXT K
+130 PRINT C;"PRIMES"
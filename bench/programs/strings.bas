@@ -0,0 +1,11 @@
+10 REM String building, slicing and conversion
+20 N=0
+30 FOR I=1 TO 400
+40 A$=""
+50 FOR J=1 TO 20
+60 A$=A$+CHR$(65+(I+J) MOD 26)
+70 NEXT J
+80 B$=MID$(A$,5,10)+LEFT$(A$,3)+RIGHT$(STR$(I),2)
+90 N=N+LEN(B$)+INSTR(A$,"Q")+VAL(RIGHT$(STR$(I),1))
+100 NEXT I
+110 PRINT N;B$
@@ -0,0 +1,109 @@
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+from pathlib import Path
+from lang.lex import lex_program
+from lang.line import Line
+from lang.parse import BasicParser
+
+corpus_dir = Path(__file__).parent / "corpus"
+
+
+class Corpus:
+    def __init__(self, path: Path):
+        self.name = path.stem
+        self.source = path.read_text()
+        self.lines = list(lex_program(self.source))
+        self.tokens = sum(len(tokens) for _, tokens in self.lines)
+
+    def lex(self):
+        return list(lex_program(self.source))
+
+    def parse(self):
+        spans = dict()
+        return [BasicParser.parse(tokens, spans=spans) for _, tokens in self.lines]
+
+    def ast(self):
+        return [Line(number, tokens).ast() for number, tokens in self.lines]
+
+
+stages = ["lex", "parse", "ast"]
+
+
+def measure(corpus: Corpus, stage: str, repeat: int) -> dict:
+    run = getattr(corpus, stage)
+    run()
+    seconds = min(timed(run) for _ in range(repeat))
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = run()
+        after = tracemalloc.take_snapshot()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    # Blocks the stage allocated and still holds when it returns
+    own = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    grown = [
+        stat
+        for stat in after.filter_traces(own).compare_to(
+            before.filter_traces(own), "lineno"
+        )
+        if stat.count_diff > 0
+    ]
+    return {
+        "corpus": corpus.name,
+        "stage": stage,
+        "lines": len(corpus.lines),
+        "tokens": corpus.tokens,
+        "seconds": seconds,
+        "lines_per_second": len(corpus.lines) / seconds,
+        "tokens_per_second": corpus.tokens / seconds,
+        "allocations": sum(stat.count_diff for stat in grown),
+        "allocated_bytes": sum(stat.size_diff for stat in grown),
+        "peak_bytes": peak_bytes,
+    }
+
+
+def timed(run) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m bench.suite")
+    parser.add_argument("files", nargs="*", type=Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args(argv)
+
+    files = args.files or sorted(corpus_dir.glob("*.bas"))
+    results = [
+        measure(Corpus(path), stage, args.repeat) for path in files for stage in stages
+    ]
+
+    for r in results:
+        print(
+            f"{r['corpus']:12} {r['stage']:6}"
+            f" {r['lines_per_second']:10.0f} lines/s"
+            f" {r['tokens_per_second']:12.0f} tokens/s"
+            f" {r['allocations']:8} allocations"
+            f" {r['peak_bytes']:10} peak bytes"
+        )
+
+    if args.json is not None:
+        report = {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
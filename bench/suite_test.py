@@ -0,0 +1,24 @@
+import unittest
+from bench.suite import Corpus, corpus_dir, measure, stages
+
+
+class TestSuite(unittest.TestCase):
+    def test_corpus_parses(self):
+        for path in sorted(corpus_dir.glob("*.bas")):
+            corpus = Corpus(path)
+            self.assertGreater(len(corpus.lines), 0)
+            self.assertEqual(len(corpus.ast()), len(corpus.lines))
+
+    def test_measure(self):
+        corpus = Corpus(corpus_dir / "keywords.bas")
+        for stage in stages:
+            result = measure(corpus, stage, 1)
+            self.assertEqual(result["stage"], stage)
+            self.assertGreater(result["tokens_per_second"], 0)
+            self.assertGreater(result["allocations"], 0)
+            self.assertGreater(result["allocated_bytes"], 0)
+            self.assertGreater(result["peak_bytes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,324 @@
+import math
+import struct
+from enum import IntEnum, verify, UNIQUE
+from typing import Callable
+from lang.tokens import Operator
+from lang.error import Error, ErrorCode
+
+
+@verify(UNIQUE)
+class Type(IntEnum):
+    Integer = 0
+    Single = 1
+    Double = 2
+    String = 3
+
+
+class Arith:
+    max_string = 255
+    f32 = struct.Struct("f")
+
+    # Conversions
+
+    def integer(x: int | float) -> int:
+        if type(x) is not int:
+            # CINT rounds halves away from zero
+            x = int(math.copysign(math.floor(abs(x) + 0.5), x))
+        if x < -32768 or x > 32767:
+            raise Error(ErrorCode.Overflow)
+        return x
+
+    def single(x: int | float) -> float:
+        try:
+            f32 = Arith.f32.unpack(Arith.f32.pack(x))[0]
+        except OverflowError:
+            raise Error(ErrorCode.Overflow)
+        if math.isinf(f32):
+            raise Error(ErrorCode.Overflow)
+        return f32
+
+    def double(x: int | float) -> float:
+        f64 = float(x)
+        if math.isinf(f64):
+            raise Error(ErrorCode.Overflow)
+        return f64
+
+    def string(s: str) -> str:
+        if len(s) > Arith.max_string:
+            raise Error(ErrorCode.StringTooLong)
+        return s
+
+    def convert(t: Type, x):
+        if (t == Type.String) != (type(x) is str):
+            raise Error(ErrorCode.TypeMismatch)
+        match t:
+            case Type.Integer:
+                return Arith.integer(x)
+            case Type.Single:
+                return Arith.single(x)
+            case Type.Double:
+                return Arith.double(x)
+        return Arith.string(x)
+
+    def datum(t: Type, x):
+        # Empty DATA fields read as zero into numbers
+        if x == "" and t != Type.String:
+            x = 0
+        return Arith.convert(t, x)
+
+    def number(t: Type, x: int | float) -> (Type, int | float):
+        # Integer results that leave the i16 range widen to single precision
+        match t:
+            case Type.Integer if -32768 <= x <= 32767:
+                return (Type.Integer, x)
+            case Type.Integer | Type.Single:
+                return (Type.Single, Arith.single(x))
+        return (Type.Double, Arith.double(x))
+
+    def narrow(t: Type) -> Callable:
+        # Result rounding for a statically known operand type
+        match t:
+            case Type.Integer:
+                return Arith.widen
+            case Type.Single:
+                return Arith.single
+            case Type.Double:
+                return Arith.double
+        return Arith.string
+
+    def widen(x: int | float) -> int | float:
+        if -32768 <= x <= 32767:
+            return x
+        return Arith.single(x)
+
+    def promote(t0: Type, t1: Type) -> Type:
+        if (t0 == Type.String) != (t1 == Type.String):
+            raise Error(ErrorCode.TypeMismatch)
+        return max(t0, t1)
+
+    def numeric(t0: Type, t1: Type) -> Type:
+        t = Arith.promote(t0, t1)
+        if t == Type.String:
+            raise Error(ErrorCode.TypeMismatch)
+        return t
+
+    # Operators
+
+    def power(t0: Type, v0, t1: Type, v1) -> (Type, int | float):
+        t = max(Arith.numeric(t0, t1), Type.Single)
+        if v0 == 0 and v1 < 0:
+            raise Error(ErrorCode.DivisionByZero)
+        if v0 < 0 and v1 != int(v1):
+            raise Error(ErrorCode.IllegalFunctionCall)
+        try:
+            return Arith.number(t, float(v0) ** v1)
+        except OverflowError:
+            raise Error(ErrorCode.Overflow)
+
+    def multiply(t0: Type, v0, t1: Type, v1) -> (Type, int | float):
+        return Arith.number(Arith.numeric(t0, t1), v0 * v1)
+
+    def divide(t0: Type, v0, t1: Type, v1) -> (Type, float):
+        t = max(Arith.numeric(t0, t1), Type.Single)
+        if v1 == 0:
+            raise Error(ErrorCode.DivisionByZero)
+        return Arith.number(t, v0 / v1)
+
+    def divide_int(t0: Type, v0, t1: Type, v1) -> (Type, int):
+        Arith.numeric(t0, t1)
+        i0, i1 = Arith.integer(v0), Arith.integer(v1)
+        if i1 == 0:
+            raise Error(ErrorCode.DivisionByZero)
+        quotient = abs(i0) // abs(i1)
+        if (i0 < 0) != (i1 < 0):
+            quotient = -quotient
+        return (Type.Integer, Arith.integer(quotient))
+
+    def modulo(t0: Type, v0, t1: Type, v1) -> (Type, int):
+        Arith.numeric(t0, t1)
+        i0, i1 = Arith.integer(v0), Arith.integer(v1)
+        if i1 == 0:
+            raise Error(ErrorCode.DivisionByZero)
+        return (Type.Integer, int(math.fmod(i0, i1)))
+
+    def add(t0: Type, v0, t1: Type, v1) -> (Type, int | float | str):
+        t = Arith.promote(t0, t1)
+        if t == Type.String:
+            return (Type.String, Arith.string(v0 + v1))
+        return Arith.number(t, v0 + v1)
+
+    def subtract(t0: Type, v0, t1: Type, v1) -> (Type, int | float):
+        return Arith.number(Arith.numeric(t0, t1), v0 - v1)
+
+    def truth(b: bool) -> (Type, int):
+        return (Type.Integer, -1 if b else 0)
+
+    def equal(t0: Type, v0, t1: Type, v1) -> (Type, int):
+        Arith.promote(t0, t1)
+        return Arith.truth(v0 == v1)
+
+    def not_equal(t0: Type, v0, t1: Type, v1) -> (Type, int):
+        Arith.promote(t0, t1)
+        return Arith.truth(v0 != v1)
+
+    def less(t0: Type, v0, t1: Type, v1) -> (Type, int):
+        Arith.promote(t0, t1)
+        return Arith.truth(v0 < v1)
+
+    def less_equal(t0: Type, v0, t1: Type, v1) -> (Type, int):
+        Arith.promote(t0, t1)
+        return Arith.truth(v0 <= v1)
+
+    def greater(t0: Type, v0, t1: Type, v1) -> (Type, int):
+        Arith.promote(t0, t1)
+        return Arith.truth(v0 > v1)
+
+    def greater_equal(t0: Type, v0, t1: Type, v1) -> (Type, int):
+        Arith.promote(t0, t1)
+        return Arith.truth(v0 >= v1)
+
+    def bitwise(t0: Type, v0, t1: Type, v1) -> (int, int):
+        Arith.numeric(t0, t1)
+        return (Arith.integer(v0), Arith.integer(v1))
+
+    def and_(t0: Type, v0, t1: Type, v1) -> (Type, int):
+        i0, i1 = Arith.bitwise(t0, v0, t1, v1)
+        return (Type.Integer, i0 & i1)
+
+    def or_(t0: Type, v0, t1: Type, v1) -> (Type, int):
+        i0, i1 = Arith.bitwise(t0, v0, t1, v1)
+        return (Type.Integer, i0 | i1)
+
+    def xor(t0: Type, v0, t1: Type, v1) -> (Type, int):
+        i0, i1 = Arith.bitwise(t0, v0, t1, v1)
+        return (Type.Integer, i0 ^ i1)
+
+    def imp(t0: Type, v0, t1: Type, v1) -> (Type, int):
+        i0, i1 = Arith.bitwise(t0, v0, t1, v1)
+        return (Type.Integer, ~i0 | i1)
+
+    def eqv(t0: Type, v0, t1: Type, v1) -> (Type, int):
+        i0, i1 = Arith.bitwise(t0, v0, t1, v1)
+        return (Type.Integer, ~(i0 ^ i1))
+
+    def negate(t: Type, v) -> (Type, int | float):
+        return Arith.number(Arith.numeric(t, t), -v)
+
+    def not_(t: Type, v) -> (Type, int):
+        Arith.numeric(t, t)
+        return (Type.Integer, ~Arith.integer(v))
+
+    binary_ops = {
+        Operator.Caret: power,
+        Operator.Multiply: multiply,
+        Operator.Divide: divide,
+        Operator.DivideInt: divide_int,
+        Operator.Modulo: modulo,
+        Operator.Plus: add,
+        Operator.Minus: subtract,
+        Operator.Equal: equal,
+        Operator.NotEqual: not_equal,
+        Operator.Less: less,
+        Operator.LessEqual: less_equal,
+        Operator.Greater: greater,
+        Operator.GreaterEqual: greater_equal,
+        Operator.And: and_,
+        Operator.Or: or_,
+        Operator.Xor: xor,
+        Operator.Imp: imp,
+        Operator.Eqv: eqv,
+    }
+
+    unary_ops = {
+        Operator.Minus: negate,
+        Operator.Not: not_,
+    }
+
+    def binary(op: Operator, t0: Type, v0, t1: Type, v1) -> (Type, object):
+        return Arith.binary_ops[op](t0, v0, t1, v1)
+
+    def unary(op: Operator, t: Type, v) -> (Type, object):
+        return Arith.unary_ops[op](t, v)
+
+    # Operators specialized for statically typed operands, the returned
+    # functions work on plain values and round like the generic ones
+
+    def specialize_binary(op: Operator, t0: Type, t1: Type) -> tuple[Type, Callable]:
+        match op:
+            case Operator.Plus:
+                t = Arith.promote(t0, t1)
+                return (t, Arith.arithmetic[op][t])
+            case Operator.Minus | Operator.Multiply:
+                t = Arith.numeric(t0, t1)
+                return (t, Arith.arithmetic[op][t])
+            case Operator.Divide:
+                t = max(Arith.numeric(t0, t1), Type.Single)
+                return (t, Arith.divisions[t])
+            case Operator.Caret:
+                t = max(Arith.numeric(t0, t1), Type.Single)
+            case (
+                Operator.Equal
+                | Operator.NotEqual
+                | Operator.Less
+                | Operator.LessEqual
+                | Operator.Greater
+                | Operator.GreaterEqual
+            ):
+                Arith.promote(t0, t1)
+                return (Type.Integer, Arith.comparisons[op])
+            case _:
+                Arith.numeric(t0, t1)
+                t = Type.Integer
+        generic = Arith.binary_ops[op]
+
+        def specialized(v0, v1):
+            return generic(t0, v0, t1, v1)[1]
+
+        return (t, specialized)
+
+    def specialize_unary(op: Operator, t: Type) -> tuple[Type, Callable]:
+        t = Arith.numeric(t, t)
+        if op == Operator.Minus:
+            narrow = Arith.narrow(t)
+            return (t, lambda v: narrow(-v))
+        return (Type.Integer, lambda v: ~Arith.integer(v))
+
+    def build_arithmetic() -> tuple[dict, dict]:
+        def add(narrow: Callable) -> Callable:
+            return lambda v0, v1: narrow(v0 + v1)
+
+        def subtract(narrow: Callable) -> Callable:
+            return lambda v0, v1: narrow(v0 - v1)
+
+        def multiply(narrow: Callable) -> Callable:
+            return lambda v0, v1: narrow(v0 * v1)
+
+        def divide(narrow: Callable) -> Callable:
+            def divide(v0, v1):
+                if v1 == 0:
+                    raise Error(ErrorCode.DivisionByZero)
+                return narrow(v0 / v1)
+
+            return divide
+
+        types = list(Type)
+        return (
+            {
+                Operator.Plus: {t: add(Arith.narrow(t)) for t in types},
+                Operator.Minus: {t: subtract(Arith.narrow(t)) for t in types},
+                Operator.Multiply: {t: multiply(Arith.narrow(t)) for t in types},
+            },
+            {t: divide(Arith.narrow(t)) for t in types},
+        )
+
+    comparisons = {
+        Operator.Equal: lambda v0, v1: -1 if v0 == v1 else 0,
+        Operator.NotEqual: lambda v0, v1: -1 if v0 != v1 else 0,
+        Operator.Less: lambda v0, v1: -1 if v0 < v1 else 0,
+        Operator.LessEqual: lambda v0, v1: -1 if v0 <= v1 else 0,
+        Operator.Greater: lambda v0, v1: -1 if v0 > v1 else 0,
+        Operator.GreaterEqual: lambda v0, v1: -1 if v0 >= v1 else 0,
+    }
+
+
+Arith.arithmetic, Arith.divisions = Arith.build_arithmetic()
@@ -1,10 +1,13 @@
+import functools
+from typing import Callable, Iterator
 from lang.tokens import Token, Word, Operator, Literal
 from lang.error import Error, ErrorCode
 
 
 class Ident:
     class Base:
-        __match_args__ = "text"
+        __slots__ = ("text",)
+        __match_args__ = ("text",)
 
         def __init__(self, text: str):
             self.text = text
@@ -16,31 +19,45 @@ class Ident:
             return self.text == other.text
 
     class Plain(Base):
+        __slots__ = ()
+
         def __repr__(self):
             return f"Ident.Plain({repr(self.text)})"
 
     class String(Base):
+        __slots__ = ()
+
         def __repr__(self):
             return f"Ident.String({repr(self.text)})"
 
     class Single(Base):
+        __slots__ = ()
+
         def __repr__(self):
             return f"Ident.Single({repr(self.text)})"
 
     class Double(Base):
+        __slots__ = ()
+
         def __repr__(self):
             return f"Ident.Double({repr(self.text)})"
 
     class Integer(Base):
+        __slots__ = ()
+
         def __repr__(self):
             return f"Ident.Integer({repr(self.text)})"
 
 
 class Variable:
     class Base:
-        pass
+        __slots__ = ()
+
+        def accept(self, visitor):
+            Traverse.accept(self, visitor)
 
     class Unary(Base):
+        __slots__ = ("col", "ident")
         __match_args__ = ("col", "ident")
 
         def __eq__(self, other):
@@ -56,6 +73,7 @@ class Variable:
             return f"Variable.Unary({repr(self.col)}, {repr(self.ident)})"
 
     class Array(Base):
+        __slots__ = ("col", "ident", "list_expr")
         __match_args__ = ("col", "ident", "list_expr")
 
         def __eq__(self, other):
@@ -68,22 +86,17 @@ class Variable:
             self.ident = ident
             self.list_expr = list_expr
 
-    # Accept visitors
-
-    def accept(self, visitor):
-        match self:
-            case Variable.Array(_, _, list_expr):
-                for expr in list_expr:
-                    expr.accept(visitor)
-        visitor.visit_variable(self)
-
 
 class Expression:
     class Base:
-        pass
+        __slots__ = ()
+
+        def accept(self, visitor):
+            Traverse.accept(self, visitor)
 
     class Variable(Base):
-        __match_args__ = "var"
+        __slots__ = ("var",)
+        __match_args__ = ("var",)
 
         def __init__(self, var: int):
             self.var = var
@@ -94,6 +107,7 @@ class Expression:
             return self.var == other.var
 
     class Single(Base):
+        __slots__ = ("col", "f32")
         __match_args__ = ("col", "f32")
 
         def __init__(self, col: range, f32: float):
@@ -106,6 +120,7 @@ class Expression:
             return self.f32 == other.f32
 
     class Double(Base):
+        __slots__ = ("col", "f64")
         __match_args__ = ("col", "f64")
 
         def __init__(self, col: range, f64: float):
@@ -118,6 +133,7 @@ class Expression:
             return self.f64 == other.f64
 
     class Integer(Base):
+        __slots__ = ("col", "i16")
         __match_args__ = ("col", "i16")
 
         def __init__(self, col: range, i16: int):
@@ -133,6 +149,7 @@ class Expression:
             return f"Expression.Integer({repr(self.col)}, {repr(self.i16)})"
 
     class String(Base):
+        __slots__ = ("col", "text")
         __match_args__ = ("col", "text")
 
         def __init__(self, col: range, text: str):
@@ -148,6 +165,7 @@ class Expression:
             return f"Expression.String({repr(self.col)}, {repr(self.text)})"
 
     class _ColExpr(Base):
+        __slots__ = ("col", "expr")
         __match_args__ = ("col", "expr")
 
         def __init__(self, col: range, expr):
@@ -155,6 +173,7 @@ class Expression:
             self.expr = expr
 
     class _ColExprExpr(Base):
+        __slots__ = ("col", "expr0", "expr1")
         __match_args__ = ("col", "expr0", "expr1")
 
         def __init__(self, col: range, expr0, expr1):
@@ -163,287 +182,207 @@ class Expression:
             self.expr1 = expr1
 
     class Negation(_ColExpr):
-        pass
+        __slots__ = ()
 
     class Power(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class Multiply(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class Divide(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class DivideInt(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class Modulo(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class Add(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class Subtract(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class Equal(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class NotEqual(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class Less(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class LessEqual(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class Greater(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class GreaterEqual(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class Not(_ColExpr):
-        pass
+        __slots__ = ()
 
     class And(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class Or(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class Xor(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class Imp(_ColExprExpr):
-        pass
+        __slots__ = ()
 
     class Eqv(_ColExprExpr):
-        pass
-
-    # Accept visitors
-
-    def accept(self, visitor):
-        match self:
-            case Expression.Variable(var):
-                var.accept(visitor)
-            case Expression.Negation(_, expr) | Expression.Not(_, expr):
-                expr.accept(visitor)
-            case (
-                Expression.Power(_, expr0, expr1)
-                | Expression.Multiply(_, expr0, expr1)
-                | Expression.Divide(_, expr0, expr1)
-                | Expression.DivideInt(_, expr0, expr1)
-                | Expression.Modulo(_, expr0, expr1)
-                | Expression.Add(_, expr0, expr1)
-                | Expression.Subtract(_, expr0, expr1)
-                | Expression.Equal(_, expr0, expr1)
-                | Expression.NotEqual(_, expr0, expr1)
-                | Expression.Less(_, expr0, expr1)
-                | Expression.LessEqual(_, expr0, expr1)
-                | Expression.Greater(_, expr0, expr1)
-                | Expression.GreaterEqual(_, expr0, expr1)
-                | Expression.And(_, expr0, expr1)
-                | Expression.Or(_, expr0, expr1)
-                | Expression.Xor(_, expr0, expr1)
-                | Expression.Imp(_, expr0, expr1)
-                | Expression.Eqv(_, expr0, expr1)
-            ):
-                expr0.accept(visitor)
-                expr1.accept(visitor)
-        visitor.visit_expression(self)
+        __slots__ = ()
 
     def expect(parse, var_map: dict[Ident, Variable]) -> Base:
-        def descend(parse, var_map, precedence):
-            match parse.next():  # lhs =
-                case Token.LParen:
-                    expr = descend(parse, var_map, 0)
-                    parse.expect(Token.RParen)
-                    lhs = expr
-                case Token.Ident(tok_ident):
-                    col = range(parse.col.start, parse.col.stop)
-                    match parse.peek():
-                        case Token.LParen:
-                            parse.expect(Token.LParen)
-                            list_expr = list()
-                            if not parse.maybe(Token.RParen):
-                                list_expr = parse.expect_fn_expression_list(var_map)
-                                parse.expect(Token.RParen)
-                            col = range(col.start, parse.col.stop)
-                            lhs = Expression.Variable(
-                                Variable.Array(col, tok_ident, list_expr)
-                            )
-                        case _:
-                            if tok_ident.is_user_function():
-                                raise Error(ErrorCode.SyntaxError).add_column(
-                                    col
-                                ).add_message("FN RESERVED FOR FUNCTIONS")
-                            if tok_ident in var_map:
-                                lhs = Expression.Variable(var_map[tok_ident])
-                            else:
-                                lhs = Expression.Variable(
-                                    Variable.Unary(col, tok_ident)
-                                )
-                case Token.Operator(Operator.Plus):
-                    op_prec = Expression.unary_op_precedence(Operator.Plus)
-                    lhs = descend(parse, var_map, op_prec)
-                case Token.Operator(Operator.Minus):
-                    col = range(parse.col.start, parse.col.stop)
-                    op_prec = Expression.unary_op_precedence(Operator.Minus)
-                    expr = descend(parse, var_map, op_prec)
-                    lhs = Expression.Negation(col, expr)
-                case Token.Operator(Operator.Not):
-                    col = range(parse.col.start, parse.col.stop)
-                    op_prec = Expression.unary_op_precedence(Operator.Not)
-                    expr = descend(parse, var_map, op_prec)
-                    lhs = Expression.Not(col, expr)
-                case Token.Literal(lit):
-                    lhs = Expression.literal(parse.col, lit)
-                case _:
-                    raise Error(ErrorCode.SyntaxError).add_column(
-                        parse.col
-                    ).add_message("EXPECTED EXPRESSION")
-            while True:
-                match parse.peek():
-                    case Token.Operator(op):
-                        op_prec = Expression.binary_op_precedence(op)
-                        if op_prec <= precedence:
-                            break
-                        parse.next()
-                        column = range(parse.col.start, parse.col.stop)
-                        rhs = descend(parse, var_map, op_prec)
-                        lhs = Expression.binary_op(column, op, lhs, rhs)
-                    case _:
-                        break
-            return lhs
-
-        return descend(parse, var_map, 0)
-
-    def binary_op(col: range, op: Operator, lhs: Base, rhs: Base) -> Base:
-        match op:
-            case Operator.Caret:
-                return (Expression.Power(col, lhs, rhs),)
-            case Operator.Multiply:
-                return (Expression.Multiply(col, lhs, rhs),)
-            case Operator.Divide:
-                return (Expression.Divide(col, lhs, rhs),)
-            case Operator.DivideInt:
-                return (Expression.DivideInt(col, lhs, rhs),)
-            case Operator.Modulo:
-                return (Expression.Modulo(col, lhs, rhs),)
-            case Operator.Plus:
-                return (Expression.Add(col, lhs, rhs),)
-            case Operator.Minus:
-                return (Expression.Subtract(col, lhs, rhs),)
-            case Operator.Equal:
-                return (Expression.Equal(col, lhs, rhs),)
-            case Operator.NotEqual:
-                return (Expression.NotEqual(col, lhs, rhs),)
-            case Operator.Less:
-                return (Expression.Less(col, lhs, rhs),)
-            case Operator.LessEqual:
-                return (Expression.LessEqual(col, lhs, rhs),)
-            case Operator.Greater:
-                return (Expression.Greater(col, lhs, rhs),)
-            case Operator.GreaterEqual:
-                return (Expression.GreaterEqual(col, lhs, rhs),)
-            case Operator.And:
-                return (Expression.And(col, lhs, rhs),)
-            case Operator.Or:
-                return (Expression.Or(col, lhs, rhs),)
-            case Operator.Xor:
-                return (Expression.Xor(col, lhs, rhs),)
-            case Operator.Imp:
-                return (Expression.Imp(col, lhs, rhs),)
-            case Operator.Eqv:
-                return (Expression.Eqv(col, lhs, rhs),)
-        raise Error(ErrorCode.InternalError).add_column(col)
-
-    def unary_op_precedence(op: Operator) -> int:
-        match op:
-            case Operator.Plus | Operator.Minus:
-                return 12
-            case Operator.Not:
-                return 6
-        return 0
-
-    def binary_op_precedence(op: Operator) -> int:
-        match op:
-            case Operator.Caret:
-                return 13
-            case Operator.Multiply | Operator.Divide:
-                return 11
-            case Operator.DivideInt:
-                return 10
-            case Operator.Modulo:
-                return 9
-            case Operator.Plus | Operator.Minus:
-                return 8
-            case (
-                Operator.Equal
-                | Operator.NotEqual
-                | Operator.Less
-                | Operator.LessEqual
-                | Operator.Greater
-                | Operator.GreaterEqual
-            ):
-                return 7
-            case Operator.And:
-                return 5
-            case Operator.Or:
-                return 4
-            case Operator.Xor:
-                return 3
-            case Operator.Imp:
-                return 2
-            case Operator.Eqv:
-                return 1
-        return 0
+        return Expression.descend(parse, var_map, 0)
+
+    def descend(parse, var_map: dict[Ident, Variable], precedence: int) -> Base:
+        token = parse.next()
+        prefix = Expression.prefix.get(type(token))
+        if prefix is None:
+            raise Error(ErrorCode.SyntaxError).add_column(parse.col).add_message(
+                "EXPECTED EXPRESSION"
+            )
+        lhs = prefix(parse, var_map, token)
+        binary_ops = Expression.binary_ops
+        while True:
+            token = parse.peek()
+            if type(token) is not Token.Operator:
+                break
+            op = binary_ops.get(token.operator)
+            if op is None:
+                break
+            op_prec, constructor = op
+            if op_prec <= precedence:
+                break
+            parse.next()
+            column = parse.col
+            rhs = Expression.descend(parse, var_map, op_prec)
+            lhs = constructor(column, lhs, rhs)
+        return lhs
+
+    def expect_paren(parse, var_map: dict[Ident, Variable], token: Token) -> Base:
+        expr = Expression.descend(parse, var_map, 0)
+        parse.expect(Token.RParen())
+        return expr
+
+    def expect_ident(parse, var_map: dict[Ident, Variable], token: Token) -> Base:
+        tok_ident = token.id
+        col = parse.col
+        if type(parse.peek()) is Token.LParen:
+            parse.next()
+            list_expr = list()
+            if not parse.maybe(Token.RParen()):
+                list_expr = parse.expect_fn_expression_list(var_map)
+                parse.expect(Token.RParen())
+            col = parse.span(col.start, parse.col.stop)
+            return Expression.Variable(Variable.Array(col, tok_ident, list_expr))
+        if tok_ident.is_user_function():
+            raise Error(ErrorCode.SyntaxError).add_column(col).add_message(
+                "FN RESERVED FOR FUNCTIONS"
+            )
+        if tok_ident in var_map:
+            return Expression.Variable(var_map[tok_ident])
+        return Expression.Variable(Variable.Unary(col, tok_ident))
+
+    def expect_unary(parse, var_map: dict[Ident, Variable], token: Token) -> Base:
+        op = Expression.unary_ops.get(token.operator)
+        if op is None:
+            raise Error(ErrorCode.SyntaxError).add_column(parse.col).add_message(
+                "EXPECTED EXPRESSION"
+            )
+        op_prec, constructor = op
+        col = parse.col
+        expr = Expression.descend(parse, var_map, op_prec)
+        if constructor is None:
+            return expr
+        return constructor(col, expr)
+
+    def expect_literal(parse, var_map: dict[Ident, Variable], token: Token) -> Base:
+        return Expression.literal(parse.col, token.literal)
+
+    prefix = {
+        Token.LParen: expect_paren,
+        Token.Ident: expect_ident,
+        Token.Operator: expect_unary,
+        Token.Literal: expect_literal,
+    }
+
+    unary_ops = {
+        Operator.Plus: (12, None),
+        Operator.Minus: (12, Negation),
+        Operator.Not: (6, Not),
+    }
+
+    binary_ops = {
+        Operator.Caret: (13, Power),
+        Operator.Multiply: (11, Multiply),
+        Operator.Divide: (11, Divide),
+        Operator.DivideInt: (10, DivideInt),
+        Operator.Modulo: (9, Modulo),
+        Operator.Plus: (8, Add),
+        Operator.Minus: (8, Subtract),
+        Operator.Equal: (7, Equal),
+        Operator.NotEqual: (7, NotEqual),
+        Operator.Less: (7, Less),
+        Operator.LessEqual: (7, LessEqual),
+        Operator.Greater: (7, Greater),
+        Operator.GreaterEqual: (7, GreaterEqual),
+        Operator.And: (5, And),
+        Operator.Or: (4, Or),
+        Operator.Xor: (3, Xor),
+        Operator.Imp: (2, Imp),
+        Operator.Eqv: (1, Eqv),
+    }
 
     def literal(col: range, lit) -> Base:
-        # TODO validate parsers
-        def parse_float(s: str):
-            s = s.replace("D", "E")
-            if s[-1] in ["!", "#", "%"]:
-                s = s[:-1]
-            return float(s)
-
-        def parse_radix(s: str, radix: int):
-            return int(s, radix)
-
         match lit:
-            case Literal.Hex(s):
-                return Expression.Integer(col, parse_radix(s, 16))
-            case Literal.Octal(s):
-                return Expression.Integer(col, parse_radix(s, 8))
-            case Literal.Single(s):
-                return Expression.Single(col, parse_float(s))
-            case Literal.Double(s):
-                return Expression.Double(col, parse_float(s))
-            case Literal.Integer(s):
-                return Expression.Integer(col, parse_radix(s, 10))
             case Literal.String(s):
                 if len(s) > 255:
                     raise Error(ErrorCode.StringTooLong).add_column(col).add_message(
                         "MAXIMUM LITERAL LENGTH IS 255"
                     )
                 return Expression.String(col, s)
+            case Literal.Single(_) | Literal.Double(_) if lit.value is None:
+                raise Error(ErrorCode.SyntaxError).add_column(col).add_message(
+                    "INVALID NUMBER"
+                )
+            case _ if lit.value is None:
+                raise Error(ErrorCode.Overflow).add_column(col)
+            case Literal.Single(_):
+                return Expression.Single(col, lit.value)
+            case Literal.Double(_):
+                return Expression.Double(col, lit.value)
+            case _:
+                return Expression.Integer(col, lit.value)
 
 
 class Statement:
     class Base:
-        pass
+        __slots__ = ()
+
+        def accept(self, visitor):
+            Traverse.accept(self, visitor)
 
     # Match patterns
 
     class _Col(Base):
-        __match_args__ = "col"
+        __slots__ = ("col",)
+        __match_args__ = ("col",)
 
         def __init__(self, col: range):
             self.col = col
 
     class _ColListExpr(Base):
+        __slots__ = ("col", "list_expr")
         __match_args__ = ("col", "list_expr")
 
         def __init__(self, col: range, list_expr: list[Expression]):
@@ -451,6 +390,7 @@ class Statement:
             self.list_expr = list_expr
 
     class _ColListVar(Base):
+        __slots__ = ("col", "list_var")
         __match_args__ = ("col", "list_var")
 
         def __init__(self, col: range, list_var: list[Variable]):
@@ -458,6 +398,7 @@ class Statement:
             self.list_var = list_var
 
     class _ColVarVar(Base):
+        __slots__ = ("col", "var0", "var1")
         __match_args__ = ("col", "var0", "var1")
 
         def __init__(self, col: range, var0: Variable, var1: Variable):
@@ -466,6 +407,7 @@ class Statement:
             self.var1 = var1
 
     class _ColExpr(Base):
+        __slots__ = ("col", "expr")
         __match_args__ = ("col", "expr")
 
         def __init__(self, col: range, expr: Expression):
@@ -473,6 +415,7 @@ class Statement:
             self.expr = expr
 
     class _ColExprExpr(Base):
+        __slots__ = ("col", "expr0", "expr1")
         __match_args__ = ("col", "expr0", "expr1")
 
         def __init__(self, col: range, expr0: Expression, expr1: Expression):
@@ -481,6 +424,7 @@ class Statement:
             self.expr1 = expr1
 
     class _ColExprListExpr(Base):
+        __slots__ = ("col", "expr", "list_expr")
         __match_args__ = ("col", "expr", "list_expr")
 
         def __init__(self, col: range, expr: Expression, list_expr: list[Expression]):
@@ -489,6 +433,7 @@ class Statement:
             self.list_expr = list_expr
 
     class _ColVarExprExprExpr(Base):
+        __slots__ = ("col", "var", "expr0", "expr1", "expr2")
         __match_args__ = ("col", "var", "expr0", "expr1", "expr2")
 
         def __init__(
@@ -508,18 +453,32 @@ class Statement:
     # Statements
 
     class Clear(_Col):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            return Statement.Clear(parse.col)
 
     class Cls(_Col):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            return Statement.Cls(parse.col)
 
     class Cont(_Col):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            return Statement.Cont(parse.col)
 
     class Data(_ColListExpr):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.Data(col, parse.expect_data_list())
 
     class Def(Base):
+        __slots__ = ("col", "var", "list_var", "expr")
         __match_args__ = ("col", "var", "list_var", "expr")
 
         def __init__(
@@ -530,40 +489,118 @@ class Statement:
             self.list_var = list_var
             self.expr = expr
 
+        def expect(parse):
+            col = parse.col
+            match parse.next():
+                case Token.Ident(ident) if ident.is_user_function():
+                    var = Variable.Unary(parse.col, ident)
+                case _:
+                    raise Error(ErrorCode.SyntaxError).add_column(
+                        parse.col
+                    ).add_message("EXPECTED FUNCTION NAME")
+            var_map = dict()
+            list_var = list()
+            if parse.maybe(Token.LParen()):
+                while True:
+                    param = Variable.Unary(*parse.expect_ident())
+                    var_map[param.ident] = param
+                    list_var.append(param)
+                    if not parse.maybe(Token.Comma()):
+                        break
+                parse.expect(Token.RParen())
+            parse.expect(Token.Operator(Operator.Equal))
+            expr = parse.expect_fn_expression(var_map)
+            return Statement.Def(col, var, list_var, expr)
+
     class Defdbl(_ColVarVar):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.Defdbl(col, *parse.expect_var_range())
 
     class Defint(_ColVarVar):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.Defint(col, *parse.expect_var_range())
 
     class Defsng(_ColVarVar):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.Defsng(col, *parse.expect_var_range())
 
     class Defstr(_ColVarVar):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.Defstr(col, *parse.expect_var_range())
 
     class Delete(_ColExprExpr):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.Delete(col, *parse.expect_line_number_range())
 
     class Dim(_ColListVar):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.Dim(col, parse.expect_var_list())
 
     class End(_Col):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            return Statement.End(parse.col)
 
     class Erase(_ColListVar):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            list_var = [Variable.Unary(c, i) for c, i in parse.expect_ident_list()]
+            return Statement.Erase(col, list_var)
 
     class For(_ColVarExprExprExpr):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            var = Variable.Unary(*parse.expect_ident())
+            parse.expect(Token.Operator(Operator.Equal))
+            expr0 = parse.expect_expression()
+            parse.expect(Token.Word(Word.To))
+            expr1 = parse.expect_expression()
+            if parse.maybe(Token.Word(Word.Step)):
+                expr2 = parse.expect_expression()
+            else:
+                stop = parse.col.stop
+                expr2 = Expression.Integer(parse.span(stop, stop), 1)
+            return Statement.For(col, var, expr0, expr1, expr2)
 
     class Gosub(_ColExpr):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.Gosub(col, parse.expect_line_number())
 
     class Goto(_ColExpr):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.Goto(col, parse.expect_line_number())
 
     class If(Base):
+        __slots__ = ("col", "expr", "list_statement0", "list_statement1")
         __match_args__ = ("col", "expr", "list_statement0", "list_statement1")
 
         def __init__(
@@ -582,7 +619,7 @@ class Statement:
             return f"Statement.If({repr(self.col)}, {repr(self.expr)}, {repr(self.list_statement0)}, {repr(self.list_statement1)})"
 
         def expect(parse):
-            column = range(parse.col.start, parse.col.stop)
+            column = parse.col
             predicate = parse.expect_expression()
             if parse.maybe(Token.Word(Word.Goto)):
                 then_stmt = [Statement.Goto(parse.col, parse.expect_line_number())]
@@ -612,6 +649,7 @@ class Statement:
             return Statement.If(column, predicate, then_stmt, else_stmt)
 
     class Input(Base):
+        __slots__ = ("col", "expr0", "expr1", "list_var")
         __match_args__ = ("col", "expr0", "expr1", "list_var")
 
         def __init__(
@@ -626,7 +664,28 @@ class Statement:
             self.expr1 = expr1
             self.list_var = list_var
 
+        def expect(parse):
+            # expr0 is true (-1) when INPUT; keeps the cursor on the line
+            col = parse.col
+            if parse.maybe(Token.Semicolon()):
+                expr0 = Expression.Integer(parse.col, -1)
+            else:
+                expr0 = Expression.Integer(parse.span(col.stop, col.stop), 0)
+            match parse.peek():
+                case Token.Literal(Literal.String(s)):
+                    parse.next()
+                    prompt_col = parse.col
+                    if not parse.maybe(Token.Comma()):
+                        parse.expect(Token.Semicolon())
+                        s += "? "
+                    expr1 = Expression.String(prompt_col, s)
+                case _:
+                    start = parse.col.start
+                    expr1 = Expression.String(parse.span(start, start), "? ")
+            return Statement.Input(col, expr0, expr1, parse.expect_var_list())
+
     class Let(Base):
+        __slots__ = ("col", "var", "expr")
         __match_args__ = ("col", "var", "expr")
 
         def __init__(self, col: range, var: Variable, expr: Expression):
@@ -646,19 +705,19 @@ class Statement:
 
         def expect(parse, is_shortcut):
             pk = parse.peek()
-            column = range(parse.col.start, parse.col.stop)
+            column = parse.col
             match pk:
-                case Token.Ident(Ident.String(s)) if s == "MID$":
+                case Token.Ident(ident) if ident.text == "MID$":
                     parse.next()
-                    parse.expect(Token.LParen)
+                    parse.expect(Token.LParen())
                     var = parse.expect_var()
-                    parse.expect(Token.Comma)
+                    parse.expect(Token.Comma())
                     pos = parse.expect_expression()
-                    if parse.maybe(Token.Comma):
+                    if parse.maybe(Token.Comma()):
                         length = parse.expect_expression()
                     else:
                         length = Expression.Integer(parse.col, 32767)
-                    parse.expect(Token.RParen)
+                    parse.expect(Token.RParen())
                     parse.expect(Token.Operator(Operator.Equal))
                     expr = parse.expect_expression()
                     return Statement.Mid(column, var, pos, length, expr)
@@ -676,33 +735,70 @@ class Statement:
                 )
 
     class List(_ColExprExpr):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.List(col, *parse.expect_line_number_range())
 
     class Load(_ColExpr):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.Load(col, parse.expect_expression())
 
     class Mid(_ColVarExprExprExpr):
-        pass
+        __slots__ = ()
 
     class New(_Col):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            return Statement.New(parse.col)
 
     class Next(_ColListVar):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            list_var = [Variable.Unary(c, i) for c, i in parse.expect_ident_list()]
+            return Statement.Next(col, list_var)
 
     class OnGoto(_ColExprListExpr):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            expr = parse.expect_expression()
+            match parse.next():
+                case Token.Word(Word.Goto):
+                    return Statement.OnGoto(col, expr, parse.expect_line_number_list())
+                case Token.Word(Word.Gosub):
+                    return Statement.OnGosub(col, expr, parse.expect_line_number_list())
+            raise Error(ErrorCode.SyntaxError).add_column(parse.col).add_message(
+                "EXPECTED GOTO OR GOSUB"
+            )
 
     class OnGosub(_ColExprListExpr):
-        pass
+        __slots__ = ()
 
     class Print(_ColListExpr):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.Print(col, parse.expect_print_list())
 
     class Read(_ColListVar):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.Read(col, parse.expect_var_list())
 
     class Renum(Base):
+        __slots__ = ("col", "expr0", "expr1", "expr2")
         __match_args__ = ("col", "expr0", "expr1", "expr2")
 
         def __init__(
@@ -717,192 +813,243 @@ class Statement:
             self.expr1 = expr1
             self.expr2 = expr2
 
+        def expect(parse):
+            col = parse.col
+            expr0 = parse.maybe_line_number_expression(10)
+            stop = parse.col.stop
+            expr1 = Expression.Single(parse.span(stop, stop), 0.0)
+            expr2 = Expression.Single(parse.span(stop, stop), 10.0)
+            if parse.maybe(Token.Comma()):
+                expr1 = parse.maybe_line_number_expression(0)
+                if parse.maybe(Token.Comma()):
+                    expr2 = parse.expect_line_number()
+            return Statement.Renum(col, expr0, expr1, expr2)
+
     class Restore(_ColExpr):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.Restore(col, parse.maybe_line_number_expression())
 
     class Return(_Col):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            return Statement.Return(parse.col)
 
     class Run(_ColExpr):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            match parse.peek():
+                case Token.Literal(Literal.String(_)):
+                    return Statement.Run(col, parse.expect_expression())
+            return Statement.Run(col, parse.maybe_line_number_expression())
 
     class Save(_ColExpr):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.Save(col, parse.expect_expression())
 
     class Stop(_Col):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            return Statement.Stop(parse.col)
 
     class Swap(_ColVarVar):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            var0 = parse.expect_var()
+            parse.expect(Token.Comma())
+            return Statement.Swap(col, var0, parse.expect_var())
 
     class Troff(_Col):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            return Statement.Troff(parse.col)
 
     class Tron(_Col):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            return Statement.Tron(parse.col)
 
     class Wend(_Col):
-        pass
+        __slots__ = ()
+
+        def expect(parse):
+            return Statement.Wend(parse.col)
 
     class While(_ColExpr):
-        pass
-
-    # Accept visitors
-
-    def accept(self, visitor):
-        match self:
-            case Statement.Data(_, list_expr):
-                for expr in list_expr:
-                    expr.accept(visitor)
-            case Statement.Def(_, var, list_var, expr):
-                var.accept(visitor)
-                for v in list_var:
-                    v.accept(visitor)
-                expr.accept(visitor)
-            case (
-                Statement.Defdbl(_, var0, var1)
-                | Statement.Defint(_, var0, var1)
-                | Statement.Defsng(_, var0, var1)
-                | Statement.Defstr(_, var0, var1)
-                | Statement.Swap(_, var0, var1)
-            ):
-                var0.accept(visitor)
-                var1.accept(visitor)
-            case Statement.Mid(_, var, expr0, expr1, expr2) | Statement.For(
-                _, var, expr0, expr1, expr2
-            ):
-                var.accept(visitor)
-                expr0.accept(visitor)
-                expr1.accept(visitor)
-                expr2.accept(visitor)
-            case (
-                Statement.Gosub(_, expr)
-                | Statement.Goto(_, expr)
-                | Statement.Load(_, expr)
-                | Statement.Restore(_, expr)
-                | Statement.Run(_, expr)
-                | Statement.Save(_, expr)
-                | Statement.While(_, expr)
-            ):
-                expr.accept(visitor)
-            case Statement.If(_, expr, list_statement0, list_statement1):
-                expr.accept(visitor)
-                for statement in list_statement0:
-                    statement.accept(visitor)
-                for statement in list_statement1:
-                    statement.accept(visitor)
-            case Statement.Let(_, var, expr):
-                var.accept(visitor)
-                expr.accept(visitor)
-            case Statement.Delete(_, expr0, expr1) | Statement.List(_, expr0, expr1):
-                expr0.accept(visitor)
-                expr1.accept(visitor)
-            case Statement.Input(_, expr0, expr1, list_var):
-                expr0.accept(visitor)
-                expr1.accept(visitor)
-                for var in list_var:
-                    var.accept(visitor)
-            case Statement.OnGoto(_, expr, list_expr):
-                expr.accept(visitor)
-                for expr in list_expr:
-                    expr.accept(visitor)
-            case Statement.Renum(_, var, expr0, expr1, expr2):
-                var.accept(visitor)
-                expr0.accept(visitor)
-                expr1.accept(visitor)
-                expr2.accept(visitor)
-            case (
-                Statement.Dim(_, list_var)
-                | Statement.Erase(_, list_var)
-                | Statement.Next(_, list_var)
-                | Statement.Read(_, list_var)
-            ):
-                for var in list_var:
-                    var.accept(visitor)
-        visitor.visit_statement(self)
+        __slots__ = ()
+
+        def expect(parse):
+            col = parse.col
+            return Statement.While(col, parse.expect_expression())
 
     def expect(parse) -> Base:
-        pk = parse.peek()
-        match pk:
-            case Token.Ident(_):
+        token = parse.peek()
+        match type(token):
+            case Token.Ident:
                 return Statement.Let.expect(parse, True)
-            case Token.Word(word):
-                parse.next()
-                match word:
-                    case Word.Clear:
-                        return Statement.Clear.expect(parse)
-                    case Word.Cls:
-                        return Statement.Cls.expect(parse)
-                    case Word.Cont:
-                        return Statement.Cont.expect(parse)
-                    case Word.Data:
-                        return Statement.Data.expect(parse)
-                    case Word.Def:
-                        return Statement.Def.expect(parse)
-                    case Word.Defdbl:
-                        return Statement.Defdbl.expect(parse)
-                    case Word.Defint:
-                        return Statement.Defint.expect(parse)
-                    case Word.Defsng:
-                        return Statement.Defsng.expect(parse)
-                    case Word.Defstr:
-                        return Statement.Defstr.expect(parse)
-                    case Word.Delete:
-                        return Statement.Delete.expect(parse)
-                    case Word.Dim:
-                        return Statement.Dim.expect(parse)
-                    case Word.End:
-                        return Statement.End.expect(parse)
-                    case Word.Erase:
-                        return Statement.Erase.expect(parse)
-                    case Word.For:
-                        return Statement.For.expect(parse)
-                    case Word.Gosub:
-                        return Statement.Gosub.expect(parse)
-                    case Word.Goto:
-                        return Statement.Goto.expect(parse)
-                    case Word.If:
-                        return Statement.If.expect(parse)
-                    case Word.Input:
-                        return Statement.Input.expect(parse)
-                    case Word.Let:
-                        return Statement.Let.expect(parse, False)
-                    case Word.List:
-                        return Statement.List.expect(parse)
-                    case Word.Load:
-                        return Statement.Load.expect(parse)
-                    case Word.New:
-                        return Statement.New.expect(parse)
-                    case Word.Next:
-                        return Statement.Next.expect(parse)
-                    case Word.On:
-                        return Statement.On.expect(parse)
-                    case Word.Print:
-                        return Statement.Print.expect(parse)
-                    case Word.Read:
-                        return Statement.Read.expect(parse)
-                    case Word.Renum:
-                        return Statement.Renum.expect(parse)
-                    case Word.Restore:
-                        return Statement.Restore.expect(parse)
-                    case Word.Return:
-                        return Statement.Return.expect(parse)
-                    case Word.Save:
-                        return Statement.Save.expect(parse)
-                    case Word.Stop:
-                        return Statement.Stop.expect(parse)
-                    case Word.Swap:
-                        return Statement.Swap.expect(parse)
-                    case Word.Run:
-                        return Statement.Run.expect(parse)
-                    case Word.Troff:
-                        return Statement.Troff.expect(parse)
-                    case Word.Tron:
-                        return Statement.Tron.expect(parse)
-                    case Word.Wend:
-                        return Statement.Wend.expect(parse)
-                    case Word.While:
-                        return Statement.While.expect(parse)
+            case Token.Word:
+                handler = Statement.handlers.get(token.word)
+                if handler is not None:
+                    parse.next()
+                    return handler(parse)
         raise Error(ErrorCode.SyntaxError).add_column(parse.col).add_message(
             "EXPECTED STATEMENT"
         )
+
+    handlers = {
+        Word.Clear: Clear.expect,
+        Word.Cls: Cls.expect,
+        Word.Cont: Cont.expect,
+        Word.Data: Data.expect,
+        Word.Def: Def.expect,
+        Word.Defdbl: Defdbl.expect,
+        Word.Defint: Defint.expect,
+        Word.Defsng: Defsng.expect,
+        Word.Defstr: Defstr.expect,
+        Word.Delete: Delete.expect,
+        Word.Dim: Dim.expect,
+        Word.End: End.expect,
+        Word.Erase: Erase.expect,
+        Word.For: For.expect,
+        Word.Gosub: Gosub.expect,
+        Word.Goto: Goto.expect,
+        Word.If: If.expect,
+        Word.Input: Input.expect,
+        Word.Let: functools.partial(Let.expect, is_shortcut=False),
+        Word.List: List.expect,
+        Word.Load: Load.expect,
+        Word.New: New.expect,
+        Word.Next: Next.expect,
+        Word.On: OnGoto.expect,
+        Word.Print: Print.expect,
+        Word.Read: Read.expect,
+        Word.Renum: Renum.expect,
+        Word.Restore: Restore.expect,
+        Word.Return: Return.expect,
+        Word.Save: Save.expect,
+        Word.Stop: Stop.expect,
+        Word.Swap: Swap.expect,
+        Word.Run: Run.expect,
+        Word.Troff: Troff.expect,
+        Word.Tron: Tron.expect,
+        Word.Wend: Wend.expect,
+        Word.While: While.expect,
+    }
+
+
+class Traverse:
+    def node_classes(namespace) -> list[type]:
+        return [
+            cls
+            for cls in vars(namespace).values()
+            if isinstance(cls, type) and issubclass(cls, namespace.Base)
+        ]
+
+    def build_children() -> dict[type, Callable]:
+        def leaf(node) -> tuple:
+            return ()
+
+        def unary(node) -> tuple:
+            return (node.expr,)
+
+        def binary(node) -> tuple:
+            return (node.expr0, node.expr1)
+
+        def fields(names: tuple[str, ...]) -> Callable:
+            def children(node) -> list:
+                nodes = list()
+                for name in names:
+                    value = getattr(node, name)
+                    if isinstance(value, list):
+                        nodes.extend(value)
+                    else:
+                        nodes.append(value)
+                return nodes
+
+            return children
+
+        children = {
+            Variable.Unary: leaf,
+            Variable.Array: lambda node: node.list_expr,
+            Expression.Variable: lambda node: (node.var,),
+            Expression.Single: leaf,
+            Expression.Double: leaf,
+            Expression.Integer: leaf,
+            Expression.String: leaf,
+        }
+        for cls in Traverse.node_classes(Expression):
+            if issubclass(cls, Expression._ColExpr):
+                children[cls] = unary
+            elif issubclass(cls, Expression._ColExprExpr):
+                children[cls] = binary
+        for cls in Traverse.node_classes(Statement):
+            if hasattr(cls, "__match_args__"):
+                children[cls] = fields(cls.__match_args__[1:])
+        return children
+
+    def build_kinds() -> dict[type, int]:
+        kinds = dict()
+        for kind, namespace in enumerate([Variable, Expression, Statement]):
+            for cls in Traverse.node_classes(namespace):
+                kinds[cls] = kind
+        return kinds
+
+    def postorder(roots: list) -> Iterator:
+        children = Traverse.children
+        nodes = list(reversed(roots))
+        expanded = [False] * len(nodes)
+        while nodes:
+            node = nodes.pop()
+            if expanded.pop():
+                yield node
+                continue
+            kids = children[type(node)](node)
+            if not kids:
+                yield node
+                continue
+            nodes.append(node)
+            expanded.append(True)
+            nodes.extend(reversed(kids))
+            expanded.extend([False] * len(kids))
+
+    def accept(node, visitor):
+        # Same walk as postorder, inlined to keep visits cheap
+        visits = (
+            visitor.visit_variable,
+            visitor.visit_expression,
+            visitor.visit_statement,
+        )
+        kinds = Traverse.kinds
+        children = Traverse.children
+        nodes = [node]
+        expanded = [False]
+        while nodes:
+            node = nodes.pop()
+            if expanded.pop():
+                visits[kinds[type(node)]](node)
+                continue
+            kids = children[type(node)](node)
+            if not kids:
+                visits[kinds[type(node)]](node)
+                continue
+            nodes.append(node)
+            expanded.append(True)
+            nodes.extend(reversed(kids))
+            expanded.extend([False] * len(kids))
+
+
+Traverse.children = Traverse.build_children()
+Traverse.kinds = Traverse.build_kinds()
@@ -0,0 +1,81 @@
+import unittest
+from lang.ast import Statement, Variable, Expression, Traverse
+from lang.lex import lex
+from lang.line import Line
+
+
+class Recorder:
+    def __init__(self):
+        self.visits = list()
+
+    def visit_variable(self, var):
+        self.visits.append(("variable", type(var).__name__))
+
+    def visit_expression(self, expr):
+        self.visits.append(("expression", type(expr).__name__))
+
+    def visit_statement(self, statement):
+        self.visits.append(("statement", type(statement).__name__))
+
+
+class TestTraverse(unittest.TestCase):
+    def test_postorder(self):
+        statements = Line(*lex("IF A(1)>2 THEN PRINT -B ELSE RENUM 10")).ast()
+        self.assertEqual(
+            [type(node).__name__ for node in Traverse.postorder(statements)],
+            [
+                "Integer",
+                "Array",
+                "Variable",
+                "Integer",
+                "Greater",
+                "Unary",
+                "Variable",
+                "Negation",
+                "String",
+                "Print",
+                "Single",
+                "Single",
+                "Single",
+                "Renum",
+                "If",
+            ],
+        )
+
+    def test_accept(self):
+        recorder = Recorder()
+        for statement in Line(*lex("DEF FNA(X)=X*2:A=FNA(3)")).ast():
+            statement.accept(recorder)
+        self.assertEqual(
+            recorder.visits,
+            [
+                ("variable", "Unary"),
+                ("variable", "Unary"),
+                ("variable", "Unary"),
+                ("expression", "Variable"),
+                ("expression", "Integer"),
+                ("expression", "Multiply"),
+                ("statement", "Def"),
+                ("variable", "Unary"),
+                ("expression", "Integer"),
+                ("variable", "Array"),
+                ("expression", "Variable"),
+                ("statement", "Let"),
+            ],
+        )
+
+    def test_deep_nesting(self):
+        depth = 100000
+        col = range(0)
+        expr = Expression.Integer(col, 1)
+        for _ in range(depth):
+            expr = Expression.Negation(col, expr)
+        statement = Statement.Let(col, Variable.Unary(col, None), expr)
+        recorder = Recorder()
+        statement.accept(recorder)
+        self.assertEqual(len(recorder.visits), depth + 3)
+        self.assertEqual(sum(1 for _ in Traverse.postorder([statement])), depth + 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import sys
+from array import array
+from lang.error import Error, ErrorCode
+
+
+def padded(data: bytes) -> bytes:
+    return data + bytes(-len(data) % 4)
+
+
+def little_endian(items: array) -> bytes:
+    if sys.byteorder != "little":
+        items = array(items.typecode, items)
+        items.byteswap()
+    return padded(items.tobytes())
+
+
+def section(view: memoryview, pos: int, typecode: str, count: int):
+    # Returns the items and the position of the next section
+    size = array(typecode).itemsize * count
+    end = pos + size
+    if end > len(view):
+        raise Error(ErrorCode.BadFileMode).add_message("TRUNCATED FILE")
+    items = view[pos:end]
+    if sys.byteorder != "little":
+        items = array(typecode, items.tobytes())
+        items.byteswap()
+    else:
+        items = items.cast(typecode)
+    return (items, end + (-size % 4))
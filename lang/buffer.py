@@ -0,0 +1,154 @@
+from array import array
+from enum import IntEnum, verify, UNIQUE
+from typing import Iterator
+from lang.tokens import Token, Literal, Ident, Word, Operator
+from lang.line import Line
+from lang.ast import Statement
+from lang.parse import parse
+
+
+@verify(UNIQUE)
+class Kind(IntEnum):
+    Unknown = 0
+    Whitespace = 1
+    Single = 2
+    Double = 3
+    Integer = 4
+    Hex = 5
+    Octal = 6
+    String = 7
+    IdentPlain = 8
+    IdentString = 9
+    IdentSingle = 10
+    IdentDouble = 11
+    IdentInteger = 12
+    Word = 13
+    Operator = 14
+    LParen = 15
+    RParen = 16
+    Comma = 17
+    Colon = 18
+    Semicolon = 19
+
+
+class TokenBuffer:
+    literals = {
+        Literal.Single: Kind.Single,
+        Literal.Double: Kind.Double,
+        Literal.Integer: Kind.Integer,
+        Literal.Hex: Kind.Hex,
+        Literal.Octal: Kind.Octal,
+        Literal.String: Kind.String,
+    }
+    idents = {
+        Ident.Plain: Kind.IdentPlain,
+        Ident.String: Kind.IdentString,
+        Ident.Single: Kind.IdentSingle,
+        Ident.Double: Kind.IdentDouble,
+        Ident.Integer: Kind.IdentInteger,
+    }
+    fixed = {
+        Token.LParen: Kind.LParen,
+        Token.RParen: Kind.RParen,
+        Token.Comma: Kind.Comma,
+        Token.Colon: Kind.Colon,
+        Token.Semicolon: Kind.Semicolon,
+    }
+    pooled = {kind: cls for cls, kind in (literals | idents).items()}
+    singletons = {kind: cls() for cls, kind in fixed.items()}
+    words = list(Word)
+    operators = list(Operator)
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.payloads = array("I")
+        self.starts = array("I", [0])
+        self.numbers = array("i")
+        self.pool = list()
+        self.pool_index = dict()
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def intern(self, text: str) -> int:
+        try:
+            return self.pool_index[text]
+        except KeyError:
+            self.pool.append(text)
+            return self.pool_index.setdefault(text, len(self.pool) - 1)
+
+    def append(self, line_number: int | None, tokens: list[Token]) -> int:
+        kinds = self.kinds
+        payloads = self.payloads
+        for token in tokens:
+            match token:
+                case Token.Word(word):
+                    kinds.append(Kind.Word)
+                    payloads.append(word.value)
+                case Token.Operator(operator):
+                    kinds.append(Kind.Operator)
+                    payloads.append(operator.value)
+                case Token.Whitespace(length):
+                    kinds.append(Kind.Whitespace)
+                    payloads.append(length)
+                case Token.Ident(ident):
+                    kinds.append(TokenBuffer.idents[type(ident)])
+                    payloads.append(self.intern(ident.text))
+                case Token.Literal(literal):
+                    kinds.append(TokenBuffer.literals[type(literal)])
+                    payloads.append(self.intern(literal.text))
+                case Token.Unknown():
+                    kinds.append(Kind.Unknown)
+                    payloads.append(self.intern(token.text))
+                case _:
+                    kinds.append(TokenBuffer.fixed[type(token)])
+                    payloads.append(0)
+        self.starts.append(len(kinds))
+        self.numbers.append(-1 if line_number is None else line_number)
+        return len(self.numbers) - 1
+
+    def extend(self, other: "TokenBuffer"):
+        remap = [self.intern(text) for text in other.pool]
+        base = self.starts[-1]
+        self.kinds.extend(other.kinds)
+        payloads = self.payloads
+        for kind, payload in zip(other.kinds, other.payloads):
+            if kind in TokenBuffer.pooled or kind == Kind.Unknown:
+                payloads.append(remap[payload])
+            else:
+                payloads.append(payload)
+        self.starts.extend([base + start for start in other.starts[1:]])
+        self.numbers.extend(other.numbers)
+
+    def line_number(self, index: int) -> int | None:
+        number = self.numbers[index]
+        return None if number < 0 else number
+
+    def tokens(self, index: int) -> Iterator[Token]:
+        kinds = self.kinds
+        payloads = self.payloads
+        pool = self.pool
+        for i in range(self.starts[index], self.starts[index + 1]):
+            kind = kinds[i]
+            payload = payloads[i]
+            match kind:
+                case Kind.Word:
+                    yield Token.Word(TokenBuffer.words[payload - 1])
+                case Kind.Operator:
+                    yield Token.Operator(TokenBuffer.operators[payload - 1])
+                case Kind.Whitespace:
+                    yield Token.Whitespace(payload)
+                case Kind.Unknown:
+                    yield Token.Unknown(pool[payload])
+                case _ if kind >= Kind.LParen:
+                    yield TokenBuffer.singletons[kind]
+                case _ if kind >= Kind.IdentPlain:
+                    yield Token.Ident(TokenBuffer.pooled[kind](pool[payload]))
+                case _:
+                    yield Token.Literal(TokenBuffer.pooled[kind](pool[payload]))
+
+    def line(self, index: int) -> Line:
+        return Line(self.line_number(index), list(self.tokens(index)))
+
+    def ast(self, index: int) -> list[Statement]:
+        return parse(self.line_number(index), self.tokens(index))
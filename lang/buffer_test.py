@@ -0,0 +1,31 @@
+from lang.buffer import TokenBuffer
+from lang.lex import lex
+from lang.line import Line
+import unittest
+
+
+class Test_TestBuffer(unittest.TestCase):
+    def test_round_trip(self):
+        sources = [
+            "10 PRINT A(1),B;:X=2 ' Comment",
+            '20 A%=&H10+&17*1.5#-2!+1E5+99:B$="Foo" AND X @',
+            "A=A+1",
+        ]
+        buffer = TokenBuffer()
+        for source in sources:
+            buffer.append(*lex(source))
+        self.assertEqual(len(buffer), 3)
+        for index, source in enumerate(sources):
+            line = Line(*lex(source))
+            self.assertEqual(buffer.line_number(index), line.number)
+            self.assertEqual(list(buffer.tokens(index)), line.tokens)
+        self.assertEqual(buffer.pool.count("A"), 1)
+
+    def test_parse(self):
+        buffer = TokenBuffer()
+        buffer.append(*lex("10 A%=1234 ' Comment "))
+        self.assertEqual(buffer.ast(0), Line(*lex("A%=1234")).ast())
+
+
+if __name__ == "__main__":
+    unittest.main()
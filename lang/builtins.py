@@ -0,0 +1,173 @@
+import functools
+import math
+from typing import Callable
+from lang.arith import Arith, Type
+from lang.error import Error, ErrorCode
+from lang.runtime import Runtime
+
+
+class Builtin:
+    # Argument kinds
+    Numeric = 0
+    String = 1
+    Any = 2
+
+    converters = {
+        Type.Integer: Arith.integer,
+        Type.Single: Arith.single,
+        Type.Double: Arith.double,
+        Type.String: Arith.string,
+    }
+
+    def same(types: list[Type]) -> Type:
+        return types[0]
+
+    def floating(types: list[Type]) -> Type:
+        return max(types[0], Type.Single)
+
+    def count(n: int | float, low: int = 0) -> int:
+        n = Arith.integer(n)
+        if n < low or n > 255:
+            raise Error(ErrorCode.IllegalFunctionCall)
+        return n
+
+    # Numeric functions
+
+    def sgn(x: int | float) -> int:
+        return (x > 0) - (x < 0)
+
+    def sqr(x: int | float) -> float:
+        if x < 0:
+            raise Error(ErrorCode.IllegalFunctionCall)
+        return math.sqrt(x)
+
+    def exp(x: int | float) -> float:
+        try:
+            return math.exp(x)
+        except OverflowError:
+            raise Error(ErrorCode.Overflow)
+
+    def log(x: int | float) -> float:
+        if x <= 0:
+            raise Error(ErrorCode.IllegalFunctionCall)
+        return math.log(x)
+
+    # String functions
+
+    def asc(s: str) -> int:
+        if s == "":
+            raise Error(ErrorCode.IllegalFunctionCall)
+        return ord(s[0])
+
+    def chr_(n: int | float) -> str:
+        return chr(Builtin.count(n))
+
+    def str_(t: Type, x: int | float) -> str:
+        return Runtime.format_number(t, x)
+
+    def val(s: str) -> float:
+        return Runtime.leading_number(s.strip())
+
+    def left(s: str, n: int | float) -> str:
+        return s[: Builtin.count(n)]
+
+    def right(s: str, n: int | float) -> str:
+        n = Builtin.count(n)
+        return s[len(s) - n :] if n > 0 else ""
+
+    def mid(s: str, start: int | float, n: int | float = 255) -> str:
+        start = Builtin.count(start, 1)
+        return s[start - 1 : start - 1 + Builtin.count(n)]
+
+    def space(n: int | float) -> str:
+        return " " * Builtin.count(n)
+
+    def string(n: int | float, c: int | float | str) -> str:
+        if type(c) is str:
+            return Builtin.left(c, 1) * Builtin.count(n) if c != "" else ""
+        return chr(Builtin.count(c)) * Builtin.count(n)
+
+    def instr(*args) -> int:
+        match args:
+            case (s, pattern):
+                start = 1
+            case (start, s, pattern):
+                start = Builtin.count(start, 1)
+        if type(s) is not str or type(pattern) is not str:
+            raise Error(ErrorCode.TypeMismatch)
+        if start > len(s):
+            return 0
+        return s.find(pattern, start - 1) + 1
+
+    def mid_assign(s: str, start: int | float, n: int | float, value: str) -> str:
+        # MID$(S$, START, N) = VALUE never changes the length of S$
+        start = Builtin.count(start, 1)
+        n = Arith.integer(n)
+        if start > len(s) or n < 0:
+            raise Error(ErrorCode.IllegalFunctionCall)
+        n = min(n, len(value), len(s) - start + 1)
+        return s[: start - 1] + value[:n] + s[start - 1 + n :]
+
+    def hex_(n: int | float) -> str:
+        return format(Arith.integer(n) & 0xFFFF, "X")
+
+    def oct_(n: int | float) -> str:
+        return format(Arith.integer(n) & 0xFFFF, "o")
+
+    # Name: (result type, argument kinds, required arguments, implementation)
+    functions = {
+        "ABS": (same, (Numeric,), 1, abs),
+        "ATN": (floating, (Numeric,), 1, math.atan),
+        "CDBL": (Type.Double, (Numeric,), 1, float),
+        "CINT": (Type.Integer, (Numeric,), 1, Arith.integer),
+        "COS": (floating, (Numeric,), 1, math.cos),
+        "CSNG": (Type.Single, (Numeric,), 1, float),
+        "EXP": (floating, (Numeric,), 1, exp),
+        "FIX": (same, (Numeric,), 1, math.trunc),
+        "INT": (same, (Numeric,), 1, math.floor),
+        "LOG": (floating, (Numeric,), 1, log),
+        "RND": (Type.Single, (Numeric,), 0, Runtime.rnd),
+        "SGN": (Type.Integer, (Numeric,), 1, sgn),
+        "SIN": (floating, (Numeric,), 1, math.sin),
+        "SQR": (floating, (Numeric,), 1, sqr),
+        "TAN": (floating, (Numeric,), 1, math.tan),
+        "ASC": (Type.Integer, (String,), 1, asc),
+        "CHR$": (Type.String, (Numeric,), 1, chr_),
+        "HEX$": (Type.String, (Numeric,), 1, hex_),
+        "INSTR": (Type.Integer, (Any, Any, String), 2, instr),
+        "LEFT$": (Type.String, (String, Numeric), 2, left),
+        "LEN": (Type.Integer, (String,), 1, len),
+        "MID$": (Type.String, (String, Numeric, Numeric), 2, mid),
+        "OCT$": (Type.String, (Numeric,), 1, oct_),
+        "RIGHT$": (Type.String, (String, Numeric), 2, right),
+        "SPACE$": (Type.String, (Numeric,), 1, space),
+        "STR$": (Type.String, (Numeric,), 1, str_),
+        "STRING$": (Type.String, (Numeric, Any), 2, string),
+        "VAL": (Type.Single, (String,), 1, val),
+    }
+
+    def result_type(name: str, types: list[Type]) -> Type | None:
+        spec = Builtin.functions.get(name)
+        if spec is None:
+            return None
+        result, kinds, required, _ = spec
+        if not required <= len(types) <= len(kinds):
+            raise Error(ErrorCode.SyntaxError).add_message("WRONG NUMBER OF ARGUMENTS")
+        for kind, t in zip(kinds, types):
+            if kind != Builtin.Any and (kind == Builtin.Numeric) == (t == Type.String):
+                raise Error(ErrorCode.TypeMismatch)
+        return result if isinstance(result, Type) else result(types)
+
+    def bind(name: str, types: list[Type], runtime: Runtime) -> Callable:
+        _, _, _, impl = Builtin.functions[name]
+        match name:
+            case "RND":
+                impl = functools.partial(impl, runtime)
+            case "STR$":
+                impl = functools.partial(impl, types[0])
+        convert = Builtin.converters[Builtin.result_type(name, types)]
+
+        def call(*args):
+            return convert(impl(*args))
+
+        return call
@@ -0,0 +1,553 @@
+import functools
+from array import array
+from enum import IntEnum, verify, UNIQUE
+from typing import Iterable
+from lang.arith import Arith, Type
+from lang.ast import Statement, Variable, Expression
+from lang.builtins import Builtin
+from lang.error import Error, ErrorCode
+from lang.line import Line
+from lang.resolve import Symbols, resolve_program
+from lang.tokens import Ident
+
+
+@verify(UNIQUE)
+class Op(IntEnum):
+    Const = 0
+    Load = 1
+    Store = 2
+    LoadElement = 3
+    StoreElement = 4
+    Binary = 5
+    Unary = 6
+    Convert = 7
+    Jump = 8
+    JumpFalse = 9
+    Gosub = 10
+    Return = 11
+    OnGoto = 12
+    OnGosub = 13
+    For = 14
+    Next = 15
+    While = 16
+    Call = 17
+    CallFn = 18
+    ReturnFn = 19
+    Def = 20
+    Dim = 21
+    Erase = 22
+    PrintNumber = 23
+    PrintString = 24
+    Tab = 25
+    Spc = 26
+    Input = 27
+    InputItem = 28
+    Read = 29
+    Restore = 30
+    MidAssign = 31
+    Clear = 32
+    Run = 33
+    End = 34
+    Stop = 35
+    Raise = 36
+
+
+class Code:
+    # Instructions are parallel arrays indexed by pc, element operands pack
+    # the array slot and the number of subscripts as slot << 8 | rank.
+    defaults = {Type.Integer: 0, Type.Single: 0.0, Type.Double: 0.0, Type.String: ""}
+
+    def __init__(self):
+        self.ops = array("B")
+        self.args = array("i")
+        self.lines = array("i")
+        self.cols = list()
+        self.consts = list()
+        self.scalars = list()
+        self.arrays = list()
+        self.binary = list()
+        self.unary = list()
+        self.builtins = list()
+        self.functions = list()
+        self.defs = list()
+        self.fors = list()
+        self.whiles = list()
+        self.branches = list()
+        self.inputs = list()
+        self.data = list()
+        self.errors = list()
+        self.line_starts = dict()
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def position(self, pc: int) -> tuple[int | None, range]:
+        line_number = self.lines[pc]
+        return (None if line_number < 0 else line_number, self.cols[pc])
+
+
+class Compiler:
+    binary_ops = {
+        constructor: op for op, (_, constructor) in Expression.binary_ops.items()
+    }
+    unary_ops = {
+        constructor: op
+        for op, (_, constructor) in Expression.unary_ops.items()
+        if constructor is not None
+    }
+    def __init__(self):
+        self.code = Code()
+        self.line_number = None
+        self.col = range(0)
+        self.symbols = None
+        self.consts = dict()
+        self.binary_fns = dict()
+        self.unary_fns = dict()
+        self.open_fors = list()
+        self.open_whiles = list()
+        self.targets = list()
+        self.restores = list()
+        self.data_lines = list()
+
+    # Emission
+
+    def emit(self, op: Op, arg: int = 0, col: range | None = None) -> int:
+        code = self.code
+        code.ops.append(op)
+        code.args.append(arg)
+        code.lines.append(-1 if self.line_number is None else self.line_number)
+        code.cols.append(self.col if col is None else col)
+        return len(code.ops) - 1
+
+    def here(self) -> int:
+        return len(self.code.ops)
+
+    def patch(self, pc: int, arg: int):
+        self.code.args[pc] = arg
+
+    def emit_error(self, error: Error):
+        index = len(self.code.errors)
+        self.code.errors.append((error.code, error.message))
+        col = error.column if error.column != range(0) else self.col
+        self.emit(Op.Raise, index, col)
+
+    def target(self, expr: Expression.Base, set_target):
+        self.targets.append((int(expr.f32), set_target, self.here() - 1))
+
+    # Symbols
+
+    def hidden(self, t: Type) -> int:
+        self.code.scalars.append(Code.defaults[t])
+        return len(self.code.scalars) - 1
+
+    def const(self, value) -> int:
+        key = (type(value), value)
+        index = self.consts.get(key)
+        if index is None:
+            index = len(self.code.consts)
+            self.code.consts.append(value)
+            self.consts[key] = index
+        return index
+
+    # Program
+
+    def program(self, symbols: Symbols) -> Code:
+        self.symbols = symbols
+        self.code.scalars = [Code.defaults[t] for _, t in symbols.scalars]
+        self.code.arrays = [t for _, t in symbols.arrays]
+        self.code.functions = list(symbols.functions)
+        for number, statements in symbols.lines:
+            self.line_number = number
+            self.code.line_starts[number] = self.here()
+            self.col = range(0)
+            if isinstance(statements, Error):
+                self.emit_error(statements)
+                continue
+            self.statements(statements)
+        self.line_number = None
+        self.emit(Op.End)
+        self.resolve()
+        return self.code
+
+    def resolve(self):
+        line_starts = self.code.line_starts
+        for number, set_target, pc in self.targets:
+            start = line_starts.get(number)
+            if start is not None:
+                set_target(start)
+                continue
+            set_target(-1)
+            if pc >= 0 and self.code.ops[pc] not in (Op.OnGoto, Op.OnGosub):
+                self.code.ops[pc] = Op.Raise
+                self.code.args[pc] = len(self.code.errors)
+                self.code.errors.append((ErrorCode.UndefinedLine, ""))
+        for pc, number in self.restores:
+            starts = [i for n, i in self.data_lines if n >= number]
+            self.patch(pc, starts[0] if starts else len(self.code.data))
+
+    def statements(self, statements: list[Statement.Base]):
+        for statement in statements:
+            self.col = statement.col
+            mark = self.mark()
+            try:
+                self.statement(statement)
+            except Error as e:
+                # A statement that fails to compile leaves none of its code
+                self.rewind(mark)
+                self.emit_error(e)
+
+    def mark(self) -> tuple:
+        return (
+            self.here(),
+            len(self.targets),
+            len(self.restores),
+            len(self.data_lines),
+            len(self.code.data),
+            list(self.open_fors),
+            list(self.open_whiles),
+        )
+
+    def rewind(self, mark: tuple):
+        pc, targets, restores, data_lines, data, open_fors, open_whiles = mark
+        code = self.code
+        for column in (code.ops, code.args, code.lines, code.cols):
+            del column[pc:]
+        del self.targets[targets:]
+        del self.restores[restores:]
+        del self.data_lines[data_lines:]
+        del code.data[data:]
+        self.open_fors[:] = open_fors
+        self.open_whiles[:] = open_whiles
+
+    # Statements
+
+    def statement(self, statement: Statement.Base):
+        match statement:
+            case Statement.Let(_, var, expr):
+                t = self.store_prefix(var)
+                self.expression_as(expr, t)
+                self.store(var)
+            case Statement.Print(_, list_expr):
+                self.print(list_expr)
+            case Statement.If(_, expr, then_statements, else_statements):
+                self.numeric(self.expression(expr))
+                branch = self.emit(Op.JumpFalse)
+                self.statements(then_statements)
+                if else_statements:
+                    skip = self.emit(Op.Jump)
+                    self.patch(branch, self.here())
+                    self.statements(else_statements)
+                    self.patch(skip, self.here())
+                else:
+                    self.patch(branch, self.here())
+            case Statement.For(_, var, start, stop, step):
+                self.for_(var, start, stop, step)
+            case Statement.Next(_, list_var):
+                self.next(list_var)
+            case Statement.While(_, expr):
+                top = self.here()
+                self.numeric(self.expression(expr))
+                index = len(self.code.whiles)
+                self.code.whiles.append(-1)
+                self.emit(Op.While, index)
+                self.open_whiles.append((index, top))
+            case Statement.Wend():
+                if not self.open_whiles:
+                    raise Error(ErrorCode.WendWithoutWhile)
+                index, top = self.open_whiles.pop()
+                self.emit(Op.Jump, top)
+                self.code.whiles[index] = self.here()
+            case Statement.Goto(_, expr):
+                pc = self.emit(Op.Jump)
+                self.target(expr, lambda start: self.patch(pc, start))
+            case Statement.Gosub(_, expr):
+                pc = self.emit(Op.Gosub)
+                self.target(expr, lambda start: self.patch(pc, start))
+            case Statement.Return():
+                self.emit(Op.Return)
+            case Statement.OnGoto(_, expr, list_expr) | Statement.OnGosub(
+                _, expr, list_expr
+            ):
+                self.numeric(self.expression(expr))
+                index = len(self.code.branches)
+                table = [-1] * len(list_expr)
+                self.code.branches.append(table)
+                op = Op.OnGoto if type(statement) is Statement.OnGoto else Op.OnGosub
+                self.emit(op, index)
+                for i, line_expr in enumerate(list_expr):
+                    self.target(line_expr, functools.partial(table.__setitem__, i))
+            case Statement.Def(_, var, list_var, expr):
+                self.def_(var, list_var, expr)
+            case Statement.Dim(_, list_var):
+                for var in list_var:
+                    match var:
+                        case Variable.Array(col, ident, list_expr):
+                            for bound in list_expr:
+                                self.numeric(self.expression(bound))
+                            arg = self.symbols.slot(var) << 8 | len(list_expr)
+                            self.emit(Op.Dim, arg, col)
+            case Statement.Erase(_, list_var):
+                for var in list_var:
+                    self.emit(Op.Erase, self.symbols.slot(var), var.col)
+            case Statement.Data(_, list_expr):
+                self.data_lines.append((self.line_number, len(self.code.data)))
+                for expr in list_expr:
+                    _, value = Compiler.literal(expr)
+                    self.code.data.append(value)
+            case Statement.Read(_, list_var):
+                for var in list_var:
+                    t = self.store_prefix(var)
+                    self.emit(Op.Read, t, var.col)
+                    self.store(var)
+            case Statement.Restore(_, expr):
+                pc = self.emit(Op.Restore)
+                self.restores.append((pc, int(expr.f32)))
+            case Statement.Input(_, _, prompt, list_var):
+                _, text = Compiler.literal(prompt)
+                types = [self.symbols.type(var) for var in list_var]
+                self.code.inputs.append((text, types))
+                self.emit(Op.Input, len(self.code.inputs) - 1)
+                for var in list_var:
+                    self.store_prefix(var)
+                    self.emit(Op.InputItem, 0, var.col)
+                    self.store(var)
+            case Statement.Swap(_, var0, var1):
+                t = self.variable(var0)
+                if self.symbols.type(var1) != t:
+                    raise Error(ErrorCode.TypeMismatch)
+                temp0, temp1 = self.hidden(t), self.hidden(t)
+                self.emit(Op.Store, temp0)
+                self.variable(var1)
+                self.emit(Op.Store, temp1)
+                self.store_prefix(var0)
+                self.emit(Op.Load, temp1)
+                self.store(var0)
+                self.store_prefix(var1)
+                self.emit(Op.Load, temp0)
+                self.store(var1)
+            case Statement.Mid(_, var, start, length, expr):
+                if self.store_prefix(var) != Type.String:
+                    raise Error(ErrorCode.TypeMismatch).add_column(var.col)
+                self.variable(var)
+                self.numeric(self.expression(start))
+                self.numeric(self.expression(length))
+                self.expression_as(expr, Type.String)
+                self.emit(Op.MidAssign)
+                self.store(var)
+            case (
+                Statement.Defint(_, var0, var1)
+                | Statement.Defsng(_, var0, var1)
+                | Statement.Defdbl(_, var0, var1)
+                | Statement.Defstr(_, var0, var1)
+            ):
+                # Types are fixed at compile time, in program order
+                pass
+            case Statement.Clear():
+                self.emit(Op.Clear)
+            case Statement.Run(_, Expression.Single(_, f32) as expr):
+                pc = self.emit(Op.Run)
+                if f32 == 0:
+                    self.patch(pc, 0)
+                else:
+                    self.target(expr, lambda start: self.patch(pc, start))
+            case Statement.End():
+                self.emit(Op.End)
+            case Statement.Stop():
+                self.emit(Op.Stop)
+            case Statement.Cls() | Statement.Tron() | Statement.Troff():
+                pass
+            case _:
+                raise Error(ErrorCode.IllegalFunctionCall).add_message(
+                    "NOT SUPPORTED IN PROGRAMS"
+                )
+
+    def print(self, list_expr: list[Expression.Base]):
+        for expr in list_expr:
+            match expr:
+                case Expression.Variable(
+                    Variable.Array(col, Ident.Base(text), [arg])
+                ) if text in ("TAB", "SPC"):
+                    self.numeric(self.expression(arg))
+                    self.emit(Op.Tab if text == "TAB" else Op.Spc, 0, col)
+                case _:
+                    t = self.expression(expr)
+                    if t == Type.String:
+                        self.emit(Op.PrintString)
+                    else:
+                        self.emit(Op.PrintNumber, t)
+
+    def for_(self, var: Variable.Unary, start, stop, step):
+        t = self.store_prefix(var)
+        if t == Type.String:
+            raise Error(ErrorCode.TypeMismatch).add_column(var.col)
+        self.expression_as(start, t)
+        self.store(var)
+        self.expression_as(stop, t)
+        self.expression_as(step, t)
+        slot = self.symbols.slot(var)
+        index = len(self.code.fors)
+        self.code.fors.append((slot, t, -1))
+        self.emit(Op.For, index)
+        self.open_fors.append((slot, index))
+
+    def next(self, list_var: list[Variable.Unary]):
+        if not list_var:
+            self.emit(Op.Next, -1)
+            if self.open_fors:
+                _, index = self.open_fors.pop()
+                self.close_for(index)
+            return
+        for var in list_var:
+            slot = self.symbols.slot(var)
+            self.emit(Op.Next, slot, var.col)
+            while self.open_fors:
+                open_slot, index = self.open_fors.pop()
+                if open_slot == slot:
+                    self.close_for(index)
+                    break
+
+    def close_for(self, index: int):
+        slot, t, _ = self.code.fors[index]
+        self.code.fors[index] = (slot, t, self.here())
+
+    def def_(self, var: Variable.Unary, list_var: list[Variable.Unary], expr):
+        function = self.symbols.slot(var)
+        slots = [self.symbols.slot(param) for param in list_var]
+        types = [self.symbols.type(param) for param in list_var]
+        index = len(self.code.defs)
+        self.code.defs.append((function, -1, slots, types))
+        self.emit(Op.Def, index)
+        skip = self.emit(Op.Jump)
+        entry = self.here()
+        self.expression_as(expr, self.symbols.type(var))
+        self.emit(Op.ReturnFn)
+        self.patch(skip, self.here())
+        self.code.defs[index] = (function, entry, slots, types)
+
+    # Variables
+
+    def store_prefix(self, var: Variable.Base) -> Type:
+        match var:
+            case Variable.Array(_, ident, list_expr):
+                for expr in list_expr:
+                    self.numeric(self.expression(expr))
+        return self.symbols.type(var)
+
+    def store(self, var: Variable.Base):
+        match var:
+            case Variable.Unary(col, _):
+                self.emit(Op.Store, self.symbols.slot(var), col)
+            case Variable.Array(col, _, list_expr):
+                arg = self.symbols.slot(var) << 8 | len(list_expr)
+                self.emit(Op.StoreElement, arg, col)
+
+    def variable(self, var: Variable.Base) -> Type:
+        match var:
+            case Variable.Unary(col, ident) if ident.text == "RND":
+                return self.call(col, ident.text, [])
+            case Variable.Unary(col, _):
+                self.emit(Op.Load, self.symbols.slot(var), col)
+            case Variable.Array(col, ident, list_expr) if ident.is_user_function():
+                for expr in list_expr:
+                    self.expression(expr)
+                arg = self.symbols.slot(var) << 8 | len(list_expr)
+                self.emit(Op.CallFn, arg, col)
+            case Variable.Array(col, ident, list_expr) if (
+                ident.text in Builtin.functions
+            ):
+                return self.call(col, ident.text, list_expr)
+            case Variable.Array(col, ident, list_expr):
+                for expr in list_expr:
+                    self.numeric(self.expression(expr))
+                arg = self.symbols.slot(var) << 8 | len(list_expr)
+                self.emit(Op.LoadElement, arg, col)
+        return self.symbols.type(var)
+
+    def call(self, col: range, name: str, list_expr: list) -> Type:
+        types = [self.expression(expr) for expr in list_expr]
+        try:
+            t = Builtin.result_type(name, types)
+        except Error as e:
+            raise e.add_column(col)
+        self.code.builtins.append((name, types))
+        self.emit(Op.Call, len(self.code.builtins) - 1, col)
+        return t
+
+    # Expressions
+
+    def literal(expr: Expression.Base) -> tuple[Type, object]:
+        match expr:
+            case Expression.Integer(_, i16):
+                return (Type.Integer, i16)
+            case Expression.Single(_, f32):
+                return (Type.Single, f32)
+            case Expression.Double(_, f64):
+                return (Type.Double, f64)
+            case Expression.String(_, text):
+                return (Type.String, text)
+        raise Error(ErrorCode.SyntaxError)
+
+    def numeric(self, t: Type):
+        if t == Type.String:
+            raise Error(ErrorCode.TypeMismatch)
+
+    def expression_as(self, expr: Expression.Base, t: Type):
+        self.convert(self.expression(expr), t)
+
+    def convert(self, source: Type, target: Type):
+        if (source == Type.String) != (target == Type.String):
+            raise Error(ErrorCode.TypeMismatch)
+        if target == Type.Integer:
+            # Integer operators may have widened, loads never do
+            if source != Type.Integer or self.code.ops[-1] not in Compiler.exact:
+                self.emit(Op.Convert, target)
+        elif source != target and target != Type.String:
+            if not (source == Type.Single and target == Type.Double):
+                self.emit(Op.Convert, target)
+
+    exact = (Op.Const, Op.Load, Op.LoadElement, Op.Call, Op.CallFn)
+
+    def expression(self, expr: Expression.Base) -> Type:
+        match expr:
+            case (
+                Expression.Integer(col, _)
+                | Expression.Single(col, _)
+                | Expression.Double(col, _)
+                | Expression.String(col, _)
+            ):
+                t, value = Compiler.literal(expr)
+                self.emit(Op.Const, self.const(value), col)
+                return t
+            case Expression.Variable(var):
+                return self.variable(var)
+            case Expression._ColExprExpr(col, lhs, rhs):
+                t0 = self.expression(lhs)
+                t1 = self.expression(rhs)
+                op = Compiler.binary_ops[type(expr)]
+                try:
+                    t, fn = Arith.specialize_binary(op, t0, t1)
+                except Error as e:
+                    raise e.add_column(col)
+                key = (op, t0, t1)
+                if key not in self.binary_fns:
+                    self.binary_fns[key] = len(self.code.binary)
+                    self.code.binary.append(fn)
+                self.emit(Op.Binary, self.binary_fns[key], col)
+                return t
+            case Expression._ColExpr(col, operand):
+                t0 = self.expression(operand)
+                op = Compiler.unary_ops[type(expr)]
+                try:
+                    t, fn = Arith.specialize_unary(op, t0)
+                except Error as e:
+                    raise e.add_column(col)
+                key = (op, t0)
+                if key not in self.unary_fns:
+                    self.unary_fns[key] = len(self.code.unary)
+                    self.code.unary.append(fn)
+                self.emit(Op.Unary, self.unary_fns[key], col)
+                return t
+
+
+def compile_program(lines: Iterable[Line]) -> Code:
+    return Compiler().program(resolve_program(lines))
@@ -0,0 +1,51 @@
+from collections import namedtuple
+from functools import lru_cache
+from lang.tokens import Token
+from lang.ast import Statement
+from lang.lex import lex_tokens, split_line_number
+from lang.parse import BasicParser
+from lang.error import Error
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class LineCache:
+    # Statements are keyed on the listed text of the body, so letter case
+    # and keyword spelling do not matter. Spacing does, columns depend on
+    # it. Parsed statements are shared between lines and must not be
+    # mutated, passes over them rebuild nodes instead.
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.lex_body = lru_cache(maxsize)(LineCache.lex_uncached)
+        self.parse_body = lru_cache(maxsize)(self.parse_uncached)
+
+    def lex_uncached(body: str) -> tuple[Token, ...]:
+        return tuple(lex_tokens(body))
+
+    def parse_uncached(self, body: str) -> tuple[Statement, ...]:
+        return tuple(BasicParser.parse(lex_tokens(body)))
+
+    def lex(self, source_line: str) -> (int | None, tuple[Token, ...]):
+        line_number, body = split_line_number(source_line)
+        return (line_number, self.lex_body(body))
+
+    def normalize(tokens: tuple[Token, ...]) -> str:
+        return "".join(str(token) for token in tokens)
+
+    def parse(self, source_line: str) -> (int | None, tuple[Statement, ...]):
+        line_number, body = split_line_number(source_line)
+        try:
+            text = LineCache.normalize(self.lex_body(body))
+            return (line_number, self.parse_body(text))
+        except Error as e:
+            raise e.add_line_number(line_number)
+
+    def lex_info(self) -> CacheInfo:
+        return CacheInfo(*self.lex_body.cache_info())
+
+    def parse_info(self) -> CacheInfo:
+        return CacheInfo(*self.parse_body.cache_info())
+
+    def clear(self):
+        self.lex_body.cache_clear()
+        self.parse_body.cache_clear()
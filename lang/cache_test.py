@@ -0,0 +1,68 @@
+from lang.ast import Traverse
+from lang.cache import LineCache, CacheInfo
+from lang.error import Error, ErrorCode
+from lang.fold import fold
+from lang.hashcons import HashCons
+from lang.lex import lex, lex_program
+from lang.line import load_lines
+from lang.resolve import resolve_program
+import unittest
+
+
+class Test_TestCache(unittest.TestCase):
+    def test_shared_lines(self):
+        cache = LineCache()
+        number10, tokens10 = cache.lex("10 A=A+1")
+        number20, tokens20 = cache.lex("20 A=A+1")
+        self.assertEqual((number10, number20), (10, 20))
+        self.assertIs(tokens10, tokens20)
+        self.assertEqual(list(tokens10), lex("A=A+1")[1])
+        self.assertIs(cache.parse("10 A=A+1")[1], cache.parse("30 A=A+1")[1])
+        self.assertEqual(cache.lex_info(), CacheInfo(3, 1, 4096, 1))
+        self.assertEqual(cache.parse_info(), CacheInfo(1, 1, 4096, 1))
+
+    def test_normalized_keys(self):
+        cache = LineCache()
+        self.assertIs(cache.parse("10 a=b+1")[1], cache.parse("20 A=B+1")[1])
+        self.assertIs(cache.parse("10 print a")[1], cache.parse("20 ?A")[1])
+        # Spacing moves columns, so it is part of the key
+        [spaced] = cache.parse("30 A = B+1")[1]
+        self.assertEqual(spaced.expr.col, range(5, 6))
+        self.assertEqual(cache.parse_info().currsize, 3)
+
+    def test_shared_statements_intact(self):
+        cache = LineCache()
+        [statement] = cache.parse("10 IF A(I)>1 THEN DEF FNA(X)=X+A(I)")[1]
+        before = [(type(node), id(node)) for node in Traverse.postorder([statement])]
+        lines = load_lines("10 X=1\n20 IF A(I)>1 THEN DEF FNA(X)=X+A(I)")
+        for line in lines:
+            line.statements = list(cache.parse(str(line))[1])
+        resolve_program(lines)
+        HashCons().intern(lines[1].statements)
+        fold(lines[1].statements)
+        after = [(type(node), id(node)) for node in Traverse.postorder([statement])]
+        self.assertEqual(before, after)
+
+    def test_eviction(self):
+        cache = LineCache(maxsize=2)
+        for source in ["A=1", "B=2", "A=1", "C=3", "B=2"]:
+            cache.lex(source)
+        self.assertEqual(cache.lex_info(), CacheInfo(1, 4, 2, 2))
+
+    def test_errors_are_not_cached(self):
+        cache = LineCache()
+        for number in [10, 20]:
+            with self.assertRaises(Error) as cm:
+                cache.parse(f"{number} A%=&H10000")
+            self.assertEqual(cm.exception.code, ErrorCode.Overflow)
+            self.assertEqual(cm.exception.line_number, number)
+        self.assertEqual(cache.parse_info().currsize, 0)
+
+    def test_lex_program(self):
+        cache = LineCache()
+        lines = list(lex_program("10 A=1\n20 A=1\n", cache=cache))
+        self.assertIs(lines[0][1], lines[1][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,886 @@
+import functools
+from typing import Callable, Iterable
+from lang.arith import Arith, Type
+from lang.ast import Statement, Variable, Expression
+from lang.builtins import Builtin
+from lang.bytecode import Code, Compiler
+from lang.error import Error, ErrorCode
+from lang.line import Line
+from lang.resolve import Symbols, resolve_program
+from lang.runtime import Runtime
+from lang.tokens import Ident, Operator
+
+
+def located(error: Error, col: range) -> Error:
+    # The innermost node that knows its column wins
+    if error.column == range(0):
+        error.add_column(col)
+    return error
+
+
+class Typed:
+    # Closure factories for statically typed operands, each returns a
+    # closure evaluating both operands and combining their values
+
+    def integer(op: Operator) -> Callable | None:
+        # Integer results that leave the i16 range widen to single precision,
+        # i16 sums and products never overflow a single
+        widen = Arith.single
+        match op:
+            case Operator.Plus:
+
+                def make(lhs: Callable, rhs: Callable) -> Callable:
+                    def add():
+                        v = lhs() + rhs()
+                        return v if -32768 <= v <= 32767 else widen(v)
+
+                    return add
+
+            case Operator.Minus:
+
+                def make(lhs: Callable, rhs: Callable) -> Callable:
+                    def subtract():
+                        v = lhs() - rhs()
+                        return v if -32768 <= v <= 32767 else widen(v)
+
+                    return subtract
+
+            case Operator.Multiply:
+
+                def make(lhs: Callable, rhs: Callable) -> Callable:
+                    def multiply():
+                        v = lhs() * rhs()
+                        return v if -32768 <= v <= 32767 else widen(v)
+
+                    return multiply
+
+            case _:
+                return None
+        return make
+
+    def comparison(op: Operator) -> Callable | None:
+        match op:
+            case Operator.Equal:
+                return lambda lhs, rhs: lambda: -1 if lhs() == rhs() else 0
+            case Operator.NotEqual:
+                return lambda lhs, rhs: lambda: -1 if lhs() != rhs() else 0
+            case Operator.Less:
+                return lambda lhs, rhs: lambda: -1 if lhs() < rhs() else 0
+            case Operator.LessEqual:
+                return lambda lhs, rhs: lambda: -1 if lhs() <= rhs() else 0
+            case Operator.Greater:
+                return lambda lhs, rhs: lambda: -1 if lhs() > rhs() else 0
+            case Operator.GreaterEqual:
+                return lambda lhs, rhs: lambda: -1 if lhs() >= rhs() else 0
+        return None
+
+    def floating(op: Operator, narrow: Callable) -> Callable | None:
+        match op:
+            case Operator.Plus:
+
+                def make(lhs: Callable, rhs: Callable) -> Callable:
+                    return lambda: narrow(lhs() + rhs())
+
+            case Operator.Minus:
+
+                def make(lhs: Callable, rhs: Callable) -> Callable:
+                    return lambda: narrow(lhs() - rhs())
+
+            case Operator.Multiply:
+
+                def make(lhs: Callable, rhs: Callable) -> Callable:
+                    return lambda: narrow(lhs() * rhs())
+
+            case _:
+                return None
+        return make
+
+    def generic(fn: Callable) -> Callable:
+        return lambda lhs, rhs: lambda: fn(lhs(), rhs())
+
+    def binary(op: Operator, t0: Type, t1: Type, t: Type, fn: Callable) -> Callable:
+        make = None
+        if op in Arith.comparisons:
+            make = Typed.comparison(op)
+        elif t0 == Type.Integer and t1 == Type.Integer:
+            make = Typed.integer(op)
+        elif t in (Type.Single, Type.Double):
+            make = Typed.floating(op, Arith.narrow(t))
+        return Typed.generic(fn) if make is None else make
+
+    def safe(op: Operator, t0: Type, t1: Type) -> bool:
+        # Closures that can never raise need no column of their own
+        if op in Arith.comparisons:
+            return True
+        return t0 == t1 == Type.Integer and op in Typed.integer_ops
+
+    integer_ops = (Operator.Plus, Operator.Minus, Operator.Multiply)
+
+
+class Closures:
+    # Every statement is compiled once into a closure returning the index
+    # of the next statement to run, or -1 to stop. Expressions become
+    # closures returning plain values of their statically known type.
+    narrowers = [Arith.integer, Arith.single, Arith.double]
+
+    def __init__(self, lines: Iterable[Line], runtime: Runtime):
+        self.runtime = runtime
+        self.line_number = None
+        self.col = range(0)
+        self.symbols = resolve_program(lines)
+        self.scalars = [Code.defaults[t] for _, t in self.symbols.scalars]
+        self.statements = list()
+        self.positions = list()
+        self.line_starts = dict()
+        self.skips = list()
+        self.whiles = list()
+        self.open_fors = list()
+        self.open_whiles = list()
+        self.targets = list()
+        self.restores = list()
+        self.data = list()
+        self.data_lines = list()
+        self.vars = list()
+        self.arrays = list()
+        self.defined = list()
+        self.gosubs = list()
+        self.fors = list()
+        self.program(self.symbols)
+        self.reset()
+
+    def clear(self):
+        self.vars[:] = self.scalars
+        self.arrays[:] = [None] * len(self.symbols.arrays)
+        self.defined[:] = [None] * len(self.symbols.functions)
+        self.data_pointer = 0
+
+    def reset(self):
+        self.clear()
+        self.gosubs.clear()
+        self.fors.clear()
+
+    def run(self, index: int = 0):
+        statements = self.statements
+        try:
+            while index >= 0:
+                index = statements[index]()
+        except Error as e:
+            line_number, col = self.positions[index]
+            if e.line_number is None:
+                e.add_line_number(line_number)
+            raise located(e, col)
+        except RecursionError:
+            # DEF FN calling itself
+            line_number, col = self.positions[index]
+            error = Error(ErrorCode.OutOfMemory).add_line_number(line_number)
+            raise located(error, col) from None
+
+    # Emission
+
+    def add(self, statement: Callable | None, col: range | None = None) -> int:
+        self.statements.append(statement)
+        self.positions.append((self.line_number, self.col if col is None else col))
+        return len(self.statements) - 1
+
+    def here(self) -> int:
+        return len(self.statements)
+
+    def add_error(self, error: Error):
+        col = error.column if error.column != range(0) else self.col
+
+        def raise_():
+            raise Error(error.code).add_message(error.message)
+
+        self.add(raise_, col)
+
+    def target(self, expr: Expression.Base, set_target, index: int = -1):
+        self.targets.append((int(expr.f32), set_target, index))
+
+    # Program
+
+    def program(self, symbols: Symbols):
+        for number, statements in symbols.lines:
+            self.line_number = number
+            self.line_starts[number] = self.here()
+            self.col = range(0)
+            if isinstance(statements, Error):
+                self.add_error(statements)
+                continue
+            self.statements_(statements)
+        self.line_number = None
+        self.add(lambda: -1)
+        self.resolve()
+
+    def resolve(self):
+        for number, set_target, index in self.targets:
+            start = self.line_starts.get(number)
+            if start is not None:
+                set_target(start)
+            elif index >= 0:
+                self.statements[index] = Closures.undefined_line
+            else:
+                set_target(-1)
+        for index, number in self.restores:
+            starts = [i for n, i in self.data_lines if n >= number]
+            pointer = starts[0] if starts else len(self.data)
+            self.statements[index] = self.restore(pointer, index + 1)
+
+    def undefined_line() -> int:
+        raise Error(ErrorCode.UndefinedLine)
+
+    def statements_(self, statements: list[Statement.Base]):
+        for statement in statements:
+            self.col = statement.col
+            mark = self.mark()
+            try:
+                self.statement(statement)
+            except Error as e:
+                # A statement that fails to compile leaves none of its code
+                self.rewind(mark)
+                self.add_error(e)
+
+    def mark(self) -> tuple:
+        return (
+            self.here(),
+            len(self.targets),
+            len(self.restores),
+            len(self.data_lines),
+            len(self.data),
+            list(self.open_fors),
+            list(self.open_whiles),
+        )
+
+    def rewind(self, mark: tuple):
+        index, targets, restores, data_lines, data, open_fors, open_whiles = mark
+        del self.statements[index:]
+        del self.positions[index:]
+        del self.targets[targets:]
+        del self.restores[restores:]
+        del self.data_lines[data_lines:]
+        del self.data[data:]
+        self.open_fors[:] = open_fors
+        self.open_whiles[:] = open_whiles
+
+    # Statements
+
+    def statement(self, statement: Statement.Base):
+        following = self.here() + 1
+        match statement:
+            case Statement.Let(_, Variable.Unary() as var, expr):
+                value = self.expression_as(expr, self.symbols.type(var))
+                self.add(self.let(self.symbols.slot(var), value, following))
+            case Statement.Let(_, var, expr):
+                t = self.symbols.type(var)
+                subscripts, assign = self.store(var)
+                value = self.expression_as(expr, t)
+
+                def let():
+                    assign(subscripts(), value())
+                    return following
+
+                self.add(let)
+            case Statement.Print(_, list_expr):
+                self.add(self.print(list_expr, following))
+            case Statement.If(_, expr, then_statements, else_statements):
+                condition = self.numeric(self.expression(expr))
+                branch = self.add(None)
+                self.statements_(then_statements)
+                if else_statements:
+                    skip = self.add(None)
+                    otherwise = self.here()
+                    self.statements_(else_statements)
+                    self.statements[skip] = self.jump(self.here())
+                else:
+                    otherwise = self.here()
+                self.statements[branch] = self.branch(condition, following, otherwise)
+            case Statement.For(_, var, start, stop, step):
+                self.for_(var, start, stop, step, following)
+            case Statement.Next(_, list_var):
+                self.next(list_var)
+            case Statement.While(_, expr):
+                condition = self.numeric(self.expression(expr))
+                whiles = self.whiles
+                exit = len(whiles)
+                whiles.append(-1)
+
+                def while_():
+                    if condition():
+                        return following
+                    if whiles[exit] < 0:
+                        raise Error(ErrorCode.WhileWithoutWend)
+                    return whiles[exit]
+
+                self.open_whiles.append((exit, self.add(while_)))
+            case Statement.Wend():
+                if not self.open_whiles:
+                    raise Error(ErrorCode.WendWithoutWhile)
+                exit, top = self.open_whiles.pop()
+                self.add(self.jump(top))
+                self.whiles[exit] = self.here()
+            case Statement.Goto(_, expr):
+                index = self.add(None)
+                self.target(expr, self.setter(index, self.jump), index)
+            case Statement.Gosub(_, expr):
+                index = self.add(None)
+                make = functools.partial(self.gosub, following)
+                self.target(expr, self.setter(index, make), index)
+            case Statement.Return():
+                gosubs = self.gosubs
+
+                def return_():
+                    if not gosubs:
+                        raise Error(ErrorCode.ReturnWithoutGosub)
+                    return gosubs.pop()
+
+                self.add(return_)
+            case Statement.OnGoto(_, expr, list_expr) | Statement.OnGosub(
+                _, expr, list_expr
+            ):
+                selector = self.numeric(self.expression(expr))
+                table = [-1] * len(list_expr)
+                gosub = type(statement) is Statement.OnGosub
+                self.add(self.on(selector, table, gosub, following))
+                for i, line_expr in enumerate(list_expr):
+                    self.target(line_expr, functools.partial(table.__setitem__, i))
+            case Statement.Def(_, var, list_var, expr):
+                self.def_(var, list_var, expr, following)
+            case Statement.Dim(_, list_var):
+                for var in list_var:
+                    match var:
+                        case Variable.Array(col, _, list_expr):
+                            bounds = [
+                                self.numeric(self.expression(bound))
+                                for bound in list_expr
+                            ]
+                            slot = self.symbols.slot(var)
+                            self.add(self.dim(slot, bounds), col)
+            case Statement.Erase(_, list_var):
+                for var in list_var:
+                    self.add(self.erase(self.symbols.slot(var)), var.col)
+            case Statement.Data(_, list_expr):
+                self.data_lines.append((self.line_number, len(self.data)))
+                for expr in list_expr:
+                    _, value = Compiler.literal(expr)
+                    self.data.append(value)
+            case Statement.Read(_, list_var):
+                for var in list_var:
+                    t = self.symbols.type(var)
+                    self.add(self.read(t, self.store(var)), var.col)
+            case Statement.Restore(_, expr):
+                self.restores.append((self.add(None), int(expr.f32)))
+            case Statement.Input(_, _, prompt, list_var):
+                _, text = Compiler.literal(prompt)
+                types = [self.symbols.type(var) for var in list_var]
+                stores = [self.store(var) for var in list_var]
+                self.add(self.input(text, types, stores, following))
+            case Statement.Swap(_, var0, var1):
+                t, load0 = self.variable(var0)
+                if self.symbols.type(var1) != t:
+                    raise Error(ErrorCode.TypeMismatch)
+                _, load1 = self.variable(var1)
+                subscripts0, store0 = self.store(var0)
+                subscripts1, store1 = self.store(var1)
+
+                def swap():
+                    value0, value1 = load0(), load1()
+                    store0(subscripts0(), value1)
+                    store1(subscripts1(), value0)
+                    return following
+
+                self.add(swap)
+            case Statement.Mid(_, var, start, length, expr):
+                if self.symbols.type(var) != Type.String:
+                    raise Error(ErrorCode.TypeMismatch).add_column(var.col)
+                subscripts, assign = self.store(var)
+                _, load = self.variable(var)
+                start = self.numeric(self.expression(start))
+                length = self.numeric(self.expression(length))
+                value = self.expression_as(expr, Type.String)
+                mid_assign = Builtin.mid_assign
+
+                def mid():
+                    indices = subscripts()
+                    text = mid_assign(load(), start(), length(), value())
+                    assign(indices, text)
+                    return following
+
+                self.add(mid)
+            case (
+                Statement.Defint(_, var0, var1)
+                | Statement.Defsng(_, var0, var1)
+                | Statement.Defdbl(_, var0, var1)
+                | Statement.Defstr(_, var0, var1)
+            ):
+                # Types are fixed at compile time, in program order
+                pass
+            case Statement.Clear():
+
+                def clear():
+                    self.clear()
+                    return following
+
+                self.add(clear)
+            case Statement.Run(_, Expression.Single(_, f32) as expr):
+                index = self.add(None)
+                if f32 == 0:
+                    self.statements[index] = self.restart(0)
+                else:
+                    self.target(expr, self.setter(index, self.restart), index)
+            case Statement.End():
+                self.add(lambda: -1)
+            case Statement.Stop():
+                self.add(Closures.stop)
+            case Statement.Cls() | Statement.Tron() | Statement.Troff():
+                pass
+            case _:
+                raise Error(ErrorCode.IllegalFunctionCall).add_message(
+                    "NOT SUPPORTED IN PROGRAMS"
+                )
+
+    def setter(self, index: int, make: Callable) -> Callable:
+        return lambda start: self.statements.__setitem__(index, make(start))
+
+    def let(self, slot: int, value: Callable, following: int) -> Callable:
+        vars = self.vars
+
+        def let():
+            vars[slot] = value()
+            return following
+
+        return let
+
+    def jump(self, target: int) -> Callable:
+        return lambda: target
+
+    def branch(self, condition: Callable, following: int, otherwise: int) -> Callable:
+        return lambda: following if condition() else otherwise
+
+    def gosub(self, following: int, target: int) -> Callable:
+        push = self.gosubs.append
+
+        def gosub():
+            push(following)
+            return target
+
+        return gosub
+
+    def on(self, selector: Callable, table: list, gosub: bool, following: int):
+        gosubs = self.gosubs
+
+        def on():
+            n = Arith.integer(selector())
+            if n < 0 or n > 255:
+                raise Error(ErrorCode.IllegalFunctionCall)
+            if n == 0 or n > len(table):
+                return following
+            if table[n - 1] < 0:
+                raise Error(ErrorCode.UndefinedLine)
+            if gosub:
+                gosubs.append(following)
+            return table[n - 1]
+
+        return on
+
+    def restart(self, target: int) -> Callable:
+        def restart():
+            self.reset()
+            return target
+
+        return restart
+
+    def stop() -> int:
+        raise Error(ErrorCode.Break)
+
+    def print(self, list_expr: list[Expression.Base], following: int) -> Callable:
+        runtime = self.runtime
+        items = list()
+        for expr in list_expr:
+            match expr:
+                case Expression.Variable(
+                    Variable.Array(_, Ident.Base(text), [arg])
+                ) if text in ("TAB", "SPC"):
+                    value = self.numeric(self.expression(arg))
+                    action = runtime.tab if text == "TAB" else runtime.spc
+                case _:
+                    t, value = self.expression(expr)
+                    if t == Type.String:
+                        action = runtime.write
+                    else:
+                        action = functools.partial(runtime.print_number, t)
+            items.append((action, value))
+
+        def print_():
+            for action, value in items:
+                action(value())
+            return following
+
+        return print_
+
+    def for_(self, var: Variable.Unary, start, stop, step, following: int):
+        t = self.symbols.type(var)
+        if t == Type.String:
+            raise Error(ErrorCode.TypeMismatch).add_column(var.col)
+        start = self.expression_as(start, t)
+        stop = self.expression_as(stop, t)
+        step = self.expression_as(step, t)
+        slot = self.symbols.slot(var)
+        narrow = Closures.narrowers[t]
+        vars = self.vars
+        fors = self.fors
+        skips = self.skips
+        skip = len(skips)
+        skips.append(-1)
+
+        def for_():
+            vars[slot] = value = start()
+            limit = stop()
+            increment = step()
+            for i, frame in enumerate(fors):
+                if frame[0] == slot:
+                    del fors[i:]
+                    break
+            if value > limit if increment >= 0 else value < limit:
+                if skips[skip] < 0:
+                    raise Error(ErrorCode.ForWithoutNext)
+                return skips[skip]
+            fors.append((slot, limit, increment, following, narrow))
+            return following
+
+        self.add(for_)
+        self.open_fors.append((slot, skip))
+
+    def next(self, list_var: list[Variable.Unary]):
+        if not list_var:
+            self.add(self.next_(-1, self.here() + 1))
+            if self.open_fors:
+                _, skip = self.open_fors.pop()
+                self.skips[skip] = self.here()
+            return
+        for var in list_var:
+            slot = self.symbols.slot(var)
+            self.add(self.next_(slot, self.here() + 1), var.col)
+            while self.open_fors:
+                open_slot, skip = self.open_fors.pop()
+                if open_slot == slot:
+                    self.skips[skip] = self.here()
+                    break
+
+    def next_(self, slot: int, following: int) -> Callable:
+        vars = self.vars
+        fors = self.fors
+
+        def next_():
+            if slot >= 0:
+                while fors and fors[-1][0] != slot:
+                    fors.pop()
+            if not fors:
+                raise Error(ErrorCode.NextWithoutFor)
+            var, limit, increment, body, narrow = fors[-1]
+            value = narrow(vars[var] + increment)
+            vars[var] = value
+            if value <= limit if increment >= 0 else value >= limit:
+                return body
+            fors.pop()
+            return following
+
+        return next_
+
+    def def_(self, var: Variable.Unary, list_var: list, expr, following: int):
+        function = self.symbols.slot(var)
+        slots = [self.symbols.slot(param) for param in list_var]
+        types = [self.symbols.type(param) for param in list_var]
+        body = self.expression_as(expr, self.symbols.type(var))
+        definition = (slots, types, body)
+        defined = self.defined
+
+        def def_():
+            defined[function] = definition
+            return following
+
+        self.add(def_)
+
+    def dim(self, slot: int, bounds: list[Callable]) -> Callable:
+        following = self.here() + 1
+
+        def dim():
+            values = [Arith.integer(bound()) for bound in bounds]
+            if self.arrays[slot] is not None:
+                raise Error(ErrorCode.RedimensionedArray)
+            if any(value < 0 for value in values):
+                raise Error(ErrorCode.IllegalFunctionCall)
+            self.dimension(slot, values)
+            return following
+
+        return dim
+
+    def erase(self, slot: int) -> Callable:
+        following = self.here() + 1
+
+        def erase():
+            if self.arrays[slot] is None:
+                raise Error(ErrorCode.IllegalFunctionCall)
+            self.arrays[slot] = None
+            return following
+
+        return erase
+
+    def read(self, t: Type, store: tuple[Callable, Callable]) -> Callable:
+        following = self.here() + 1
+        data = self.data
+        subscripts, assign = store
+
+        def read():
+            indices = subscripts()
+            if self.data_pointer >= len(data):
+                raise Error(ErrorCode.OutOfData)
+            value = data[self.data_pointer]
+            self.data_pointer += 1
+            assign(indices, Arith.datum(t, value))
+            return following
+
+        return read
+
+    def restore(self, pointer: int, following: int) -> Callable:
+        def restore():
+            self.data_pointer = pointer
+            return following
+
+        return restore
+
+    def input(self, prompt: str, types: list, stores: list, following: int):
+        runtime = self.runtime
+
+        def input_():
+            values = runtime.read_values(prompt, types)
+            for (subscripts, assign), value in zip(stores, values):
+                assign(subscripts(), value)
+            return following
+
+        return input_
+
+    # Arrays
+
+    def dimension(self, slot: int, bounds: list[int]) -> tuple:
+        size = 1
+        for bound in bounds:
+            size *= bound + 1
+        _, t = self.symbols.arrays[slot]
+        default = Code.defaults[t]
+        array = (tuple(bounds), [default] * size)
+        self.arrays[slot] = array
+        return array
+
+    def subscripts(self, var: Variable.Array) -> Callable:
+        # Returns a closure evaluating the subscripts in order
+        subscripts = [self.numeric(self.expression(expr)) for expr in var.list_expr]
+        match subscripts:
+            case [subscript]:
+                return lambda: (subscript(),)
+            case _:
+                return lambda: [subscript() for subscript in subscripts]
+
+    def element(self, var: Variable.Array) -> Callable:
+        # Returns a closure locating the element selected by evaluated
+        # subscripts as (values, index)
+        col, rank = var.col, len(var.list_expr)
+        slot = self.symbols.slot(var)
+        arrays = self.arrays
+        integer = Arith.integer
+
+        def element(subscripts) -> tuple[list, int]:
+            array = arrays[slot]
+            if array is None:
+                array = self.dimension(slot, [10] * rank)
+            bounds, values = array
+            try:
+                if len(bounds) != rank:
+                    raise Error(ErrorCode.SubscriptOutOfRange)
+                index = 0
+                for i, bound in zip(subscripts, bounds):
+                    if type(i) is not int:
+                        i = integer(i)
+                    if i < 0 or i > bound:
+                        raise Error(ErrorCode.SubscriptOutOfRange)
+                    index = index * (bound + 1) + i
+            except Error as e:
+                raise located(e, col)
+            return (values, index)
+
+        return element
+
+    # Variables
+
+    def store(self, var: Variable.Base) -> tuple[Callable, Callable]:
+        # Returns closures evaluating the subscripts of the variable and
+        # assigning a value to the element they select, as on the VM the
+        # value is evaluated in between
+        match var:
+            case Variable.Unary():
+                vars = self.vars
+                slot = self.symbols.slot(var)
+
+                def assign(_, value):
+                    vars[slot] = value
+
+                return (Closures.no_subscripts, assign)
+            case Variable.Array():
+                element = self.element(var)
+
+                def assign(subscripts, value):
+                    values, index = element(subscripts)
+                    values[index] = value
+
+                return (self.subscripts(var), assign)
+
+    def no_subscripts() -> None:
+        return None
+
+    def variable(self, var: Variable.Base) -> tuple[Type, Callable]:
+        vars = self.vars
+        match var:
+            case Variable.Unary(col, ident) if ident.text == "RND":
+                return self.call(col, ident.text, [])
+            case Variable.Unary():
+                slot = self.symbols.slot(var)
+                return (self.symbols.type(var), lambda: vars[slot])
+            case Variable.Array(_, ident) if ident.is_user_function():
+                return self.call_fn(var)
+            case Variable.Array(col, ident, list_expr) if (
+                ident.text in Builtin.functions
+            ):
+                return self.call(col, ident.text, list_expr)
+            case Variable.Array():
+                subscripts = self.subscripts(var)
+                element = self.element(var)
+
+                def load():
+                    values, index = element(subscripts())
+                    return values[index]
+
+                return (self.symbols.type(var), load)
+
+    def call(self, col: range, name: str, list_expr: list) -> tuple[Type, Callable]:
+        typed = [self.expression(expr) for expr in list_expr]
+        types = [t for t, _ in typed]
+        args = [arg for _, arg in typed]
+        try:
+            t = Builtin.result_type(name, types)
+        except Error as e:
+            raise e.add_column(col)
+        fn = Builtin.bind(name, types, self.runtime)
+        match args:
+            case []:
+                call = fn
+            case [arg]:
+                call = lambda: fn(arg())
+            case [arg0, arg1]:
+                call = lambda: fn(arg0(), arg1())
+            case _:
+                call = lambda: fn(*[arg() for arg in args])
+
+        def located_call():
+            try:
+                return call()
+            except Error as e:
+                raise located(e, col)
+
+        return (t, located_call)
+
+    def call_fn(self, var: Variable.Array) -> tuple[Type, Callable]:
+        col = var.col
+        function = self.symbols.slot(var)
+        args = [arg for _, arg in map(self.expression, var.list_expr)]
+        vars = self.vars
+        defined = self.defined
+        convert = Arith.convert
+
+        def call_fn():
+            # Arguments are evaluated before the function is looked up
+            values = [arg() for arg in args]
+            try:
+                definition = defined[function]
+                if definition is None:
+                    raise Error(ErrorCode.UndefinedUserFunction)
+                slots, types, body = definition
+                if len(values) != len(slots):
+                    raise Error(ErrorCode.SyntaxError)
+                for slot, t, value in zip(slots, types, values):
+                    vars[slot] = convert(t, value)
+            except Error as e:
+                raise located(e, col)
+            return body()
+
+        return (self.symbols.type(var), call_fn)
+
+    # Expressions
+
+    def numeric(self, typed: tuple[Type, Callable]) -> Callable:
+        t, value = typed
+        if t == Type.String:
+            raise Error(ErrorCode.TypeMismatch)
+        return value
+
+    def expression_as(self, expr: Expression.Base, t: Type) -> Callable:
+        source, value = self.expression(expr)
+        if (source == Type.String) != (t == Type.String):
+            raise Error(ErrorCode.TypeMismatch)
+        if t == Type.Integer:
+            # Integer operators may have widened, literals and loads never do
+            if source == Type.Integer and type(expr) in Closures.exact:
+                return value
+        elif source == t or t == Type.String:
+            return value
+        elif source == Type.Single and t == Type.Double:
+            return value
+        convert = Closures.narrowers[t]
+        return lambda: convert(value())
+
+    exact = (Expression.Integer, Expression.Variable)
+
+    def expression(self, expr: Expression.Base) -> tuple[Type, Callable]:
+        match expr:
+            case (
+                Expression.Integer(_, _)
+                | Expression.Single(_, _)
+                | Expression.Double(_, _)
+                | Expression.String(_, _)
+            ):
+                t, value = Compiler.literal(expr)
+                return (t, lambda: value)
+            case Expression.Variable(var):
+                return self.variable(var)
+            case Expression._ColExprExpr(col, lhs, rhs):
+                t0, lhs = self.expression(lhs)
+                t1, rhs = self.expression(rhs)
+                op = Compiler.binary_ops[type(expr)]
+                try:
+                    t, fn = Arith.specialize_binary(op, t0, t1)
+                except Error as e:
+                    raise e.add_column(col)
+                value = Typed.binary(op, t0, t1, t, fn)(lhs, rhs)
+                if Typed.safe(op, t0, t1):
+                    return (t, value)
+                return (t, self.locate(value, col))
+            case Expression._ColExpr(col, operand):
+                t0, operand = self.expression(operand)
+                op = Compiler.unary_ops[type(expr)]
+                try:
+                    t, fn = Arith.specialize_unary(op, t0)
+                except Error as e:
+                    raise e.add_column(col)
+                return (t, self.locate(lambda: fn(operand()), col))
+
+    def locate(self, value: Callable, col: range) -> Callable:
+        def located_value():
+            try:
+                return value()
+            except Error as e:
+                raise located(e, col)
+
+        return located_value
+
+
+def run(lines: Iterable[Line], runtime: Runtime | None = None) -> Closures:
+    closures = Closures(lines, Runtime() if runtime is None else runtime)
+    closures.run()
+    return closures
@@ -0,0 +1,136 @@
+import io
+import unittest
+from lang.bytecode import compile_program
+from lang.closure import Closures
+from lang.error import Error
+from lang.line import load_lines
+from lang.runtime import Runtime
+from lang.vm import VM
+
+
+def execute(source: str, input: str = "", output: io.StringIO | None = None) -> str:
+    output = io.StringIO() if output is None else output
+    runtime = Runtime(output, io.StringIO(input))
+    Closures(load_lines(source, tokens_only=True), runtime).run()
+    return output.getvalue()
+
+
+def execute_vm(source: str, input: str = "", output: io.StringIO | None = None) -> str:
+    output = io.StringIO() if output is None else output
+    runtime = Runtime(output, io.StringIO(input))
+    VM(compile_program(load_lines(source, tokens_only=True)), runtime).run()
+    return output.getvalue()
+
+
+class TestClosures(unittest.TestCase):
+    def assertSame(self, source: str, input: str = ""):
+        # Both engines agree on the output and on where errors are raised
+        outcomes = list()
+        for engine in [execute_vm, execute]:
+            output = io.StringIO()
+            try:
+                engine(source, input, output)
+                error = None
+            except Error as e:
+                error = (e.code, e.line_number, e.column)
+            outcomes.append((output.getvalue(), error))
+        self.assertEqual(outcomes[1], outcomes[0], source)
+
+    def test_print(self):
+        self.assertEqual(execute('10 PRINT 1;-2;"A"'), " 1 -2 A\n")
+        self.assertSame("10 PRINT 1/3;2/3#;32767+1;-32768-1;1E20;0.001")
+        self.assertSame('10 PRINT "A","B";:PRINT "C":PRINT TAB(4);"X";SPC(2);"Y"')
+
+    def test_typed_arithmetic(self):
+        self.assertEqual(execute("10 A%=200:PRINT A%*A%;A%+A%"), " 40000  400 \n")
+        self.assertSame("10 A%=2.5:B=A%/4:C#=1/3#:D$=\"X\"+\"Y\":PRINT A%;B;C#;D$")
+        self.assertSame("10 A=1E38:B#=A*10:PRINT B#:C=A*10")
+        self.assertSame("10 A%=7:PRINT A% MOD 3;A%\\2;A% AND 3;NOT A%;-A%;2^10")
+        self.assertSame('10 PRINT "A"<"B";1=1#;2>=3;"X"+"Y"="XY"')
+
+    def test_control_flow(self):
+        self.assertSame(
+            """10 FOR I=1 TO 3:FOR J=I TO 2
+20 PRINT I*10+J;
+30 NEXT J,I:PRINT
+40 I=0:WHILE I<3:I=I+1:GOSUB 100:WEND
+50 ON I-1 GOTO 60,70
+60 PRINT "SIXTY"
+70 IF I=3 THEN PRINT "DONE" ELSE PRINT "NOT"
+80 END
+100 PRINT I;:RETURN
+"""
+        )
+        self.assertSame("10 FOR I=5 TO 1:PRINT I:NEXT I:PRINT I")
+        self.assertSame("10 FOR I=1 TO 2:FOR J=1 TO 2:PRINT I;J:NEXT:NEXT")
+        self.assertSame("10 ON 2 GOSUB 30,40:END\n30 PRINT 30\n40 PRINT 40:RETURN")
+
+    def test_arrays_and_functions(self):
+        self.assertSame(
+            """10 DIM A(2,3):A(2,3)=5:B(10)=1
+20 PRINT A(2,3);A(1,1);B(10)
+30 DEF FNA(X)=X*X+Y:Y=1
+40 DEF FNB$(S$,N)=LEFT$(S$,N)+"!"
+50 PRINT FNA(3);FNB$("HELLO",2);LEN("ABC");MID$("ABCDEF",2,3);INT(-2.5)
+60 A$="HELLO":MID$(A$,2)="EY":SWAP A$,B$:PRINT A$;B$
+"""
+        )
+
+    def test_data_and_input(self):
+        self.assertSame(
+            """10 READ A,B$:PRINT A;B$
+20 RESTORE 40:READ C:PRINT C
+30 DATA 1,"ONE"
+40 DATA -2
+"""
+        )
+        self.assertSame("10 READ A$,B$,C,D,E$:PRINT A$;B$;C;D;E$;\n20 DATA ABC,DEF,1,,")
+        self.assertSame('10 INPUT "VALUES";A,B$:PRINT A*2;B$', "X,Y\n4,HI\n")
+
+    def test_errors(self):
+        for source in [
+            "10 DIM A(2):A(3)=1",
+            "10 A(1)=1:DIM A(5)",
+            "10 PRINT FNX(1)",
+            "10 READ A",
+            "10 A=1:B=A/0",
+            "10 A%=32767:A%=A%+1",
+            "10 RETURN",
+            "10 NEXT",
+            "10 STOP",
+            '10 PRINT "A";:GOTO 30\n20 A=1+"X"\n30 PRINT "B":GOTO 50',
+            '10 A=1+"X"',
+            "10 A=",
+            "10 WEND",
+            "10 WHILE 0",
+            "10 FOR I=1 TO 0",
+            '10 PRINT LEFT$("A",-1)',
+        ]:
+            self.assertSame(source)
+
+    def test_evaluation_order(self):
+        # Subscripts before values, arguments before the function lookup
+        self.assertSame("10 Z(1/A)=1 MOD B")
+        self.assertSame("10 DIM Z(2):Z(3)=1/A")
+        self.assertSame("10 Z(1,2)=1:Z(1/A)=1")
+        self.assertSame("10 READ Z(1/A)")
+        self.assertSame('10 A$="X":MID$(A$,1/B)="Y"')
+        self.assertSame("10 PRINT FNF(1/A)")
+        self.assertSame("10 DEF FNF(X)=X:PRINT FNF(1,1/A)")
+        # Statements that fail to compile run none of their parts
+        self.assertSame('10 PRINT "AB";LEN(1)')
+        self.assertSame('10 DIM A(2),B("X"):A(3)=1')
+        self.assertSame('10 READ A,B$("X"):DATA 1')
+
+    def test_run_restarts(self):
+        self.assertEqual(
+            execute("10 A=1:PRINT A;:RUN 30\n20 PRINT 2\n30 PRINT A"), " 1  0 \n"
+        )
+        self.assertEqual(
+            execute("10 PRINT A;:A=A+1:IF A<3 THEN 10 ELSE CLEAR:PRINT A"),
+            " 0  1  2  0 \n",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
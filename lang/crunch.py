@@ -0,0 +1,126 @@
+import itertools
+import mmap
+import struct
+from array import array
+from lang.binary import little_endian, padded, section
+from lang.buffer import Kind, TokenBuffer
+from lang.line import Line
+from lang.error import Error, ErrorCode
+
+
+class Header:
+    format = struct.Struct("<4sIIII")
+    magic = b"\xffBAS"
+    version = 1
+    max_whitespace = 0xFFFF
+
+
+def crunch(buffer: TokenBuffer) -> bytes:
+    pool = [text.encode() for text in buffer.pool]
+    offsets = array("I", [0])
+    for text in pool:
+        offsets.append(offsets[-1] + len(text))
+    sections = [
+        Header.format.pack(
+            Header.magic,
+            Header.version,
+            len(buffer.numbers),
+            len(buffer.kinds),
+            len(pool),
+        ),
+        little_endian(buffer.numbers),
+        little_endian(buffer.starts),
+        little_endian(buffer.payloads),
+        little_endian(offsets),
+        padded(bytes(buffer.kinds)),
+        b"".join(pool),
+    ]
+    return b"".join(sections)
+
+
+def uncrunch(data) -> TokenBuffer:
+    view = memoryview(data)
+    try:
+        magic, version, lines, tokens, pool_size = Header.format.unpack_from(view)
+    except struct.error:
+        magic = version = None
+    if magic != Header.magic or version != Header.version:
+        raise Error(ErrorCode.BadFileMode).add_message("NOT A CRUNCHED PROGRAM")
+    pos = Header.format.size
+    buffer = TokenBuffer()
+    buffer.numbers, pos = section(view, pos, "i", lines)
+    buffer.starts, pos = section(view, pos, "I", lines + 1)
+    buffer.payloads, pos = section(view, pos, "I", tokens)
+    offsets, pos = section(view, pos, "I", pool_size + 1)
+    buffer.kinds, pos = section(view, pos, "B", tokens)
+    blob = view[pos:]
+    if len(blob) != offsets[-1]:
+        raise Error(ErrorCode.BadFileMode).add_message("TRUNCATED CRUNCHED PROGRAM")
+    if offsets[0] != 0 or any(a > b for a, b in itertools.pairwise(offsets)):
+        raise _corrupt()
+    try:
+        buffer.pool = [
+            str(blob[offsets[i] : offsets[i + 1]], "utf-8") for i in range(pool_size)
+        ]
+    except UnicodeDecodeError:
+        raise _corrupt() from None
+    buffer.pool_index = {text: i for i, text in enumerate(buffer.pool)}
+    _validate(buffer, tokens)
+    return buffer
+
+
+def _validate(buffer: TokenBuffer, tokens: int):
+    starts = buffer.starts
+    if starts[0] != 0 or starts[-1] != tokens:
+        raise _corrupt()
+    if any(a > b for a, b in itertools.pairwise(starts)):
+        raise _corrupt()
+    if any(n < -1 or n > Line.max_number for n in buffer.numbers):
+        raise _corrupt()
+    pool = buffer.pool
+    words = len(TokenBuffer.words)
+    operators = len(TokenBuffer.operators)
+    checked = set()
+    for kind, payload in zip(buffer.kinds, buffer.payloads):
+        match kind:
+            case Kind.Word if 1 <= payload <= words:
+                pass
+            case Kind.Operator if 1 <= payload <= operators:
+                pass
+            case Kind.Whitespace if 1 <= payload <= Header.max_whitespace:
+                pass
+            case Kind.Unknown if payload < len(pool):
+                pass
+            case _ if kind in TokenBuffer.pooled and payload < len(pool):
+                # Literals decode their text as they are built
+                if pool[payload] == "":
+                    raise _corrupt()
+                if (kind, payload) not in checked:
+                    checked.add((kind, payload))
+                    try:
+                        TokenBuffer.pooled[kind](pool[payload])
+                    except ValueError:
+                        raise _corrupt() from None
+            case _ if kind in TokenBuffer.singletons:
+                pass
+            case _:
+                raise _corrupt()
+
+
+def _corrupt() -> Error:
+    return Error(ErrorCode.BadFileMode).add_message("CORRUPT CRUNCHED PROGRAM")
+
+
+def save_program(path: str, buffer: TokenBuffer):
+    with open(path, "wb") as f:
+        f.write(crunch(buffer))
+
+
+def load_program(path: str) -> TokenBuffer:
+    # The returned buffer is read-only and maps the file directly.
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            data = b""
+    return uncrunch(data)
@@ -0,0 +1,70 @@
+from lang.buffer import TokenBuffer
+from lang.crunch import crunch, uncrunch, save_program, load_program
+from lang.error import Error, ErrorCode
+from lang.lex import lex_program
+import os
+import random
+import tempfile
+import unittest
+
+
+class Test_TestCrunch(unittest.TestCase):
+    source = "\n".join(
+        [
+            "10 PRINT A(1),B;:X=2 ' Comment",
+            '20 A%=&H10+&17*1.5#-2!+1E5:B$="Fé" AND X @',
+            "A=A+1",
+        ]
+    )
+
+    def buffer(self) -> TokenBuffer:
+        buffer = TokenBuffer()
+        for line_number, tokens in lex_program(self.source):
+            buffer.append(line_number, tokens)
+        return buffer
+
+    def assertSameProgram(self, buffer: TokenBuffer, loaded: TokenBuffer):
+        self.assertEqual(len(loaded), len(buffer))
+        for i in range(len(buffer)):
+            self.assertEqual(loaded.line_number(i), buffer.line_number(i))
+            self.assertEqual(list(loaded.tokens(i)), list(buffer.tokens(i)))
+
+    def test_round_trip(self):
+        buffer = self.buffer()
+        self.assertSameProgram(buffer, uncrunch(crunch(buffer)))
+
+    def test_save_load(self):
+        buffer = self.buffer()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "PROGRAM.BAS")
+            save_program(path, buffer)
+            loaded = load_program(path)
+            self.assertSameProgram(buffer, loaded)
+            self.assertEqual(str(loaded.line(1)), str(buffer.line(1)))
+            del loaded
+
+    def test_not_crunched(self):
+        with self.assertRaises(Error) as cm:
+            uncrunch(b"10 PRINT")
+        self.assertEqual(cm.exception.code, ErrorCode.BadFileMode)
+        with self.assertRaises(Error):
+            uncrunch(crunch(self.buffer())[:-3])
+
+    def test_corrupt(self):
+        data = crunch(self.buffer())
+        rng = random.Random(0)
+        for _ in range(500):
+            corrupt = bytearray(data)
+            for _ in range(3):
+                corrupt[rng.randrange(len(corrupt))] = rng.randrange(256)
+            try:
+                loaded = uncrunch(bytes(corrupt))
+            except Error as e:
+                self.assertEqual(e.code, ErrorCode.BadFileMode)
+                continue
+            for i in range(len(loaded)):
+                str(loaded.line(i))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -28,6 +28,7 @@ class ErrorCode(IntEnum):
     WendWithoutWhile = 30
     InternalError = 51
     FileNotFound = 53
+    BadFileMode = 54
     FileAlreadyExists = 58
     BadFileName = 64
     DirectStatementInFile = 66
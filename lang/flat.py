@@ -0,0 +1,263 @@
+import struct
+from array import array
+from lang.ast import Statement, Variable, Expression, Traverse
+from lang.binary import little_endian, padded, section
+from lang.error import Error, ErrorCode
+from lang.tokens import Ident
+
+
+class Header:
+    format = struct.Struct("<4sIIIIII")
+    magic = b"\xffAST"
+    version = 1
+
+
+class FlatProgram:
+    # Nodes are stored in post-order, children always precede their parent
+    classes = [
+        cls
+        for namespace in [Variable, Expression, Statement]
+        for cls in Traverse.node_classes(namespace)
+        if cls is not namespace.Base and not cls.__name__.startswith("_")
+    ]
+    codes = {cls: code for code, cls in enumerate(classes)}
+    fields = [
+        tuple(name for name in cls.__match_args__ if name != "col")
+        for cls in classes
+    ]
+    values = ("ident", "i16", "f32", "f64", "text")
+    idents = [Ident.Plain, Ident.String, Ident.Single, Ident.Double, Ident.Integer]
+
+    def __init__(self):
+        self.numbers = array("i")
+        self.root_starts = array("I", [0])
+        self.roots = array("I")
+        self.ops = array("B")
+        self.starts = array("i")
+        self.stops = array("i")
+        self.link_starts = array("I", [0])
+        self.links = array("I")
+        self.pool = list()
+        self.pool_index = dict()
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def build(lines) -> "FlatProgram":
+        program = FlatProgram()
+        for line_number, statements in lines:
+            program.append(line_number, statements)
+        return program
+
+    def intern(self, value) -> int:
+        key = (type(value), repr(value))
+        try:
+            return self.pool_index[key]
+        except KeyError:
+            self.pool.append(value)
+            return self.pool_index.setdefault(key, len(self.pool) - 1)
+
+    def append(
+        self, line_number: int | None, statements: list[Statement.Base]
+    ) -> int:
+        # Nodes shared within a line, such as DEF FN parameters, are stored once
+        indexes = dict()
+        for node in Traverse.postorder(statements):
+            if id(node) in indexes:
+                continue
+            indexes[id(node)] = len(self.ops)
+            code = FlatProgram.codes[type(node)]
+            self.ops.append(code)
+            col = getattr(node, "col", None)
+            self.starts.append(-1 if col is None else col.start)
+            self.stops.append(-1 if col is None else col.stop)
+            links = self.links
+            for name in FlatProgram.fields[code]:
+                value = getattr(node, name)
+                if isinstance(value, list):
+                    links.append(len(value))
+                    links.extend(indexes[id(item)] for item in value)
+                elif name in FlatProgram.values:
+                    links.append(self.intern(value))
+                else:
+                    links.append(indexes[id(value)])
+            self.link_starts.append(len(links))
+        self.roots.extend(indexes[id(statement)] for statement in statements)
+        self.root_starts.append(len(self.roots))
+        self.numbers.append(-1 if line_number is None else line_number)
+        return len(self.numbers) - 1
+
+    def line_number(self, index: int) -> int | None:
+        number = self.numbers[index]
+        return None if number < 0 else number
+
+    def statements(self, index: int) -> array:
+        return self.roots[self.root_starts[index] : self.root_starts[index + 1]]
+
+    def node_class(self, node: int) -> type:
+        return FlatProgram.classes[self.ops[node]]
+
+    def col(self, node: int) -> range | None:
+        start = self.starts[node]
+        return None if start < 0 else range(start, self.stops[node])
+
+    def decode(self, node: int) -> list:
+        # Field values: node index, list of node indexes, or pool value
+        links = self.links
+        pos = self.link_starts[node]
+        values = list()
+        for name in FlatProgram.fields[self.ops[node]]:
+            if name.startswith("list_"):
+                count = links[pos]
+                values.append(list(links[pos + 1 : pos + 1 + count]))
+                pos += 1 + count
+            elif name in FlatProgram.values:
+                values.append(self.pool[links[pos]])
+                pos += 1
+            else:
+                values.append(links[pos])
+                pos += 1
+        return values
+
+    def children(self, node: int) -> list[int]:
+        kids = list()
+        for name, value in zip(FlatProgram.fields[self.ops[node]], self.decode(node)):
+            if isinstance(value, list):
+                kids.extend(value)
+            elif name not in FlatProgram.values:
+                kids.append(value)
+        return kids
+
+    def node(self, node: int):
+        return self.rebuild([node])[node]
+
+    def ast(self, index: int) -> list[Statement.Base]:
+        roots = self.statements(index)
+        nodes = self.rebuild(roots)
+        return [nodes[root] for root in roots]
+
+    def to_ast(self) -> list[tuple[int | None, list[Statement.Base]]]:
+        return [(self.line_number(i), self.ast(i)) for i in range(len(self))]
+
+    def rebuild(self, roots) -> dict:
+        reachable = set()
+        pending = list(roots)
+        while pending:
+            node = pending.pop()
+            if node not in reachable:
+                reachable.add(node)
+                pending.extend(self.children(node))
+        nodes = dict()
+        for node in sorted(reachable):
+            cls = self.node_class(node)
+            args = list()
+            fields = FlatProgram.fields[self.ops[node]]
+            for name, value in zip(fields, self.decode(node)):
+                if isinstance(value, list):
+                    args.append([nodes[item] for item in value])
+                elif name in FlatProgram.values:
+                    args.append(value)
+                else:
+                    args.append(nodes[value])
+            col = self.col(node)
+            nodes[node] = cls(*args) if col is None else cls(col, *args)
+        return nodes
+
+
+def dump(program: FlatProgram) -> bytes:
+    tags = array("B")
+    texts = list()
+    for value in program.pool:
+        match value:
+            case Ident.Base():
+                tags.append(3 + FlatProgram.idents.index(type(value)))
+                texts.append(value.text)
+            case str():
+                tags.append(2)
+                texts.append(value)
+            case float():
+                tags.append(1)
+                texts.append(value.hex())
+            case _:
+                tags.append(0)
+                texts.append(str(value))
+    blobs = [text.encode() for text in texts]
+    offsets = array("I", [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    sections = [
+        Header.format.pack(
+            Header.magic,
+            Header.version,
+            len(program.numbers),
+            len(program.roots),
+            len(program.ops),
+            len(program.links),
+            len(program.pool),
+        ),
+        little_endian(program.numbers),
+        little_endian(program.root_starts),
+        little_endian(program.roots),
+        little_endian(program.starts),
+        little_endian(program.stops),
+        little_endian(program.link_starts),
+        little_endian(program.links),
+        little_endian(offsets),
+        padded(bytes(program.ops)),
+        padded(bytes(tags)),
+        b"".join(blobs),
+    ]
+    return b"".join(sections)
+
+
+def load(data) -> FlatProgram:
+    # Like uncrunch, the arrays of the returned program are read-only views
+    view = memoryview(data)
+    try:
+        magic, version, lines, roots, nodes, links, pool_size = (
+            Header.format.unpack_from(view)
+        )
+    except struct.error:
+        magic = version = None
+    if magic != Header.magic or version != Header.version:
+        raise Error(ErrorCode.BadFileMode).add_message("NOT A FLATTENED PROGRAM")
+    pos = Header.format.size
+    program = FlatProgram()
+    program.numbers, pos = section(view, pos, "i", lines)
+    program.root_starts, pos = section(view, pos, "I", lines + 1)
+    program.roots, pos = section(view, pos, "I", roots)
+    program.starts, pos = section(view, pos, "i", nodes)
+    program.stops, pos = section(view, pos, "i", nodes)
+    program.link_starts, pos = section(view, pos, "I", nodes + 1)
+    program.links, pos = section(view, pos, "I", links)
+    offsets, pos = section(view, pos, "I", pool_size + 1)
+    program.ops, pos = section(view, pos, "B", nodes)
+    tags, pos = section(view, pos, "B", pool_size)
+    blob = view[pos:]
+    if len(blob) != offsets[-1]:
+        raise Error(ErrorCode.BadFileMode).add_message("TRUNCATED FLATTENED PROGRAM")
+    for i in range(pool_size):
+        text = str(blob[offsets[i] : offsets[i + 1]], "utf-8")
+        match tags[i]:
+            case 0:
+                value = int(text)
+            case 1:
+                value = float.fromhex(text)
+            case 2:
+                value = text
+            case tag:
+                value = FlatProgram.idents[tag - 3](text)
+        program.pool.append(value)
+        program.pool_index[(type(value), repr(value))] = i
+    return program
+
+
+def same(a, b) -> bool:
+    # Nodes are equal field by field, columns included
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if type(a) is not type(b):
+        return False
+    if not hasattr(a, "__match_args__") or isinstance(a, Ident.Base):
+        return a == b
+    return all(same(getattr(a, f), getattr(b, f)) for f in a.__match_args__)
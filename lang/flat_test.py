@@ -0,0 +1,66 @@
+import unittest
+from lang.ast import Statement, Expression
+from lang.error import Error, ErrorCode
+from lang.flat import FlatProgram, dump, load, same
+from lang.lex import lex_program
+from lang.parse import parse
+
+source = """10 DEF FNA(X)=X*X+1
+20 DIM A(10),B$(5)
+30 FOR I=1 TO 10 STEP 2:A(I)=FNA(I)/3.5#:NEXT I
+40 IF A(1)>2 THEN PRINT "BIG";A(1) ELSE 60
+50 INPUT "NAME";B$(0):PRINT B$(0)+"!",-2.5!
+60 ON I GOSUB 10,20,30:END
+"""
+
+
+def parse_source(text: str) -> list:
+    return [(n, parse(n, tokens)) for n, tokens in lex_program(text)]
+
+
+class TestFlatProgram(unittest.TestCase):
+    def test_round_trip(self):
+        lines = parse_source(source)
+        program = FlatProgram.build(lines)
+        self.assertEqual(len(program), 6)
+        self.assertTrue(same(program.to_ast(), lines))
+
+    def test_post_order(self):
+        program = FlatProgram.build(parse_source("10 X=1+2*Y"))
+        [root] = program.statements(0)
+        self.assertEqual(root, len(program.ops) - 1)
+        for node in range(len(program.ops)):
+            for child in program.children(node):
+                self.assertLess(child, node)
+        self.assertIs(program.node_class(root), Statement.Let)
+        self.assertEqual(program.col(root), range(0, 1))
+
+    def test_literal_pool(self):
+        program = FlatProgram.build(parse_source("10 X=1:Y=1:Z=1!:S$=\"1\""))
+        self.assertEqual(len([v for v in program.pool if v == 1]), 2)
+        self.assertIn("1", program.pool)
+
+    def test_node(self):
+        program = FlatProgram.build(parse_source("10 PRINT 1+2"))
+        [root] = program.statements(0)
+        [add, *_] = program.children(root)
+        match program.node(add):
+            case Expression.Add(_, Expression.Integer(_, 1), Expression.Integer(_, 2)):
+                pass
+            case expr:
+                self.fail(repr(expr))
+
+    def test_dump_load(self):
+        lines = parse_source(source)
+        data = dump(FlatProgram.build(lines))
+        self.assertTrue(same(load(data).to_ast(), lines))
+        self.assertTrue(same(load(bytearray(data)).ast(2), lines[2][1]))
+
+    def test_load_bad(self):
+        data = dump(FlatProgram.build(parse_source(source)))
+        with self.assertRaises(Error) as e:
+            load(b"\xffBAS" + data[4:])
+        self.assertEqual(e.exception.code, ErrorCode.BadFileMode)
+        with self.assertRaises(Error) as e:
+            load(data[:-3])
+        self.assertEqual(e.exception.code, ErrorCode.BadFileMode)
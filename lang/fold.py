@@ -0,0 +1,130 @@
+from lang.ast import Statement, Variable, Expression
+from lang.arith import Arith, Type
+from lang.error import Error
+from lang.tokens import Operator
+
+
+class ConstantFolder:
+    # Nodes are rebuilt rather than mutated, cached statements stay intact.
+    # A fresh fold copies every variable and the nodes above it, so shared
+    # nodes get one copy per site.
+    literals = {
+        Type.Integer: Expression.Integer,
+        Type.Single: Expression.Single,
+        Type.Double: Expression.Double,
+        Type.String: Expression.String,
+    }
+    binary_ops = {
+        constructor: op for op, (_, constructor) in Expression.binary_ops.items()
+    }
+    unary_ops = {
+        Expression.Negation: Operator.Minus,
+        Expression.Not: Operator.Not,
+    }
+
+    def __init__(self, fresh: bool = False):
+        self.fresh = fresh
+        self.exprs = list()
+        self.vars = list()
+        self.statements = list()
+
+    def constant(expr: Expression.Base) -> tuple[Type, object] | None:
+        match expr:
+            case Expression.Integer(_, i16):
+                return (Type.Integer, i16)
+            case Expression.Single(_, f32):
+                return (Type.Single, f32)
+            case Expression.Double(_, f64):
+                return (Type.Double, f64)
+            case Expression.String(_, text):
+                return (Type.String, text)
+        return None
+
+    def literal(col: range, value: (Type, object)) -> Expression.Base:
+        t, v = value
+        return ConstantFolder.literals[t](col, v)
+
+    def pop(self, node):
+        match node:
+            case Expression.Base():
+                return self.exprs.pop()
+            case Variable.Base():
+                return self.vars.pop()
+            case Statement.Base():
+                return self.statements.pop()
+        return node
+
+    def pop_list(self, nodes: list) -> list:
+        return [self.pop(node) for node in reversed(nodes)][::-1]
+
+    def visit_expression(self, expr: Expression.Base):
+        match expr:
+            case Expression.Variable(var):
+                new = self.vars.pop()
+                if self.fresh or new is not var:
+                    expr = Expression.Variable(new)
+            case Expression.Negation(col, operand) | Expression.Not(col, operand):
+                new = self.exprs.pop()
+                value = ConstantFolder.constant(new)
+                if value is not None:
+                    op = ConstantFolder.unary_ops[type(expr)]
+                    try:
+                        value = Arith.unary(op, *value)
+                    except Error as e:
+                        raise e.add_column(col)
+                    col = range(col.start, new.col.stop)
+                    expr = ConstantFolder.literal(col, value)
+                elif self.fresh or new is not operand:
+                    expr = type(expr)(col, new)
+            case Expression._ColExprExpr(col, lhs, rhs):
+                new_rhs = self.exprs.pop()
+                new_lhs = self.exprs.pop()
+                value0 = ConstantFolder.constant(new_lhs)
+                value1 = ConstantFolder.constant(new_rhs)
+                if value0 is not None and value1 is not None:
+                    op = ConstantFolder.binary_ops[type(expr)]
+                    try:
+                        value = Arith.binary(op, *value0, *value1)
+                    except Error as e:
+                        raise e.add_column(col)
+                    col = range(new_lhs.col.start, new_rhs.col.stop)
+                    expr = ConstantFolder.literal(col, value)
+                elif self.fresh or new_lhs is not lhs or new_rhs is not rhs:
+                    expr = type(expr)(col, new_lhs, new_rhs)
+        self.exprs.append(expr)
+
+    def visit_variable(self, var: Variable.Base):
+        match var:
+            case Variable.Array(col, ident, list_expr):
+                new = self.pop_list(list_expr)
+                if self.fresh or any(a is not b for a, b in zip(list_expr, new)):
+                    var = Variable.Array(col, ident, new)
+            case Variable.Unary(col, ident) if self.fresh:
+                var = Variable.Unary(col, ident)
+        self.vars.append(var)
+
+    def visit_statement(self, statement: Statement.Base):
+        fields = type(statement).__match_args__[1:]
+        values = [self.pop_field(getattr(statement, f)) for f in reversed(fields)]
+        values.reverse()
+        changed = (new is not getattr(statement, f) for f, new in zip(fields, values))
+        if self.fresh or any(changed):
+            statement = type(statement)(statement.col, *values)
+        self.statements.append(statement)
+
+    def pop_field(self, old):
+        if isinstance(old, list):
+            new = self.pop_list(old)
+            if not self.fresh and all(a is b for a, b in zip(old, new)):
+                return old
+            return new
+        return self.pop(old)
+
+
+def fold(
+    statements: list[Statement.Base], fresh: bool = False
+) -> list[Statement.Base]:
+    folder = ConstantFolder(fresh)
+    for statement in statements:
+        statement.accept(folder)
+    return folder.statements
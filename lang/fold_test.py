@@ -0,0 +1,90 @@
+import unittest
+from lang.ast import Statement, Expression
+from lang.error import Error, ErrorCode
+from lang.fold import fold
+from lang.lex import lex
+from lang.line import Line
+
+
+def folded(source: str) -> Expression.Base:
+    [statement] = fold(Line(*lex(source)).ast())
+    return statement.expr
+
+
+class TestFold(unittest.TestCase):
+    def test_integer(self):
+        self.assertEqual(folded("A=2*3+1"), Expression.Integer(range(2, 7), 7))
+        self.assertEqual(folded("A=-5").col, range(2, 4))
+        self.assertEqual(folded("A=NOT 0"), Expression.Integer(range(0), -1))
+        self.assertEqual(folded("A=&HFF AND 15"), Expression.Integer(range(0), 15))
+        self.assertEqual(folded("A=7 MOD -3"), Expression.Integer(range(0), 1))
+        self.assertEqual(folded("A=-7\\2"), Expression.Integer(range(0), -3))
+        self.assertEqual(folded("A=1<2"), Expression.Integer(range(0), -1))
+
+    def test_widening(self):
+        match folded("A=32767+1"):
+            case Expression.Single(_, 32768.0):
+                pass
+            case expr:
+                self.fail(repr(expr))
+        match folded("A=1/3"):
+            case Expression.Single(_, f32):
+                self.assertNotEqual(f32, 1 / 3)
+                self.assertAlmostEqual(f32, 1 / 3, places=6)
+            case expr:
+                self.fail(repr(expr))
+        match folded("A=1#/3"):
+            case Expression.Double(_, f64):
+                self.assertEqual(f64, 1 / 3)
+            case expr:
+                self.fail(repr(expr))
+
+    def test_string(self):
+        self.assertEqual(folded('A$="AB"+"CD"'), Expression.String(range(0), "ABCD"))
+
+    def test_partial(self):
+        original = Line(*lex("A%=X(2*3)+Y")).ast()
+        [statement] = fold(original)
+        match statement.expr:
+            case Expression.Add(_, Expression.Variable(array), Expression.Variable()):
+                self.assertEqual(array.list_expr, [Expression.Integer(range(0), 6)])
+            case expr:
+                self.fail(repr(expr))
+        match original[0].expr:
+            case Expression.Add(_, Expression.Variable(array), _):
+                self.assertIsInstance(array.list_expr[0], Expression.Multiply)
+
+    def test_unchanged_shared(self):
+        original = Line(*lex("IF A THEN PRINT B ELSE GOTO 10")).ast()
+        self.assertIs(fold(original)[0], original[0])
+        [statement] = fold(Line(*lex("IF 1+1 THEN PRINT 2^10")).ast())
+        match statement:
+            case Statement.If(_, Expression.Integer(_, 2), [Statement.Print()], []):
+                pass
+            case _:
+                self.fail(repr(statement))
+
+    def test_fresh(self):
+        original = Line(*lex("A=B+C(I)")).ast()
+        [statement] = fold(original, fresh=True)
+        self.assertEqual(statement.var, original[0].var)
+        self.assertIsNot(statement.var, original[0].var)
+        self.assertIsNot(statement.expr.expr0.var, original[0].expr.expr0.var)
+        self.assertIsNot(statement.expr.expr1.var, original[0].expr.expr1.var)
+
+    def test_faults(self):
+        for source, code, column in [
+            ("A=1/0", ErrorCode.DivisionByZero, range(3, 4)),
+            ("A=1 MOD 0", ErrorCode.DivisionByZero, range(4, 7)),
+            ("A=1E38*1E38", ErrorCode.Overflow, range(6, 7)),
+            ("A=100000 AND 1", ErrorCode.Overflow, range(9, 12)),
+            ('A="A"+1', ErrorCode.TypeMismatch, range(5, 6)),
+        ]:
+            with self.assertRaises(Error) as cm:
+                fold(Line(*lex(source)).ast())
+            self.assertEqual(cm.exception.code, code)
+            self.assertEqual(cm.exception.column, column)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+from lang.ast import Statement, Variable, Expression, Traverse
+from lang.tokens import Ident
+
+
+class HashCons:
+    # Canonical nodes keep the column of their first occurrence, every
+    # occurrence is listed in spans under the canonical node's id. Nodes
+    # are rebuilt rather than mutated, cached statements stay intact.
+    # Plain names are keyed with the DEFxxx statements seen so far for
+    # their letter, and DEF FN parameters with the DEF they belong to.
+    deftypes = (Statement.Defint, Statement.Defsng, Statement.Defdbl, Statement.Defstr)
+
+    def __init__(self):
+        self.table = dict()
+        self.spans = dict()
+        self.line_number = None
+        self.epochs = dict()
+        self.defs = 0
+        self.scopes = dict()
+        self.exprs = list()
+        self.vars = list()
+        self.statements = list()
+
+    def intern(self, statements: list[Statement.Base]) -> list[Statement.Base]:
+        interned = list()
+        for statement in statements:
+            self.scope(statement)
+            statement.accept(self)
+            interned.append(self.statements.pop())
+            self.scopes.clear()
+        return interned
+
+    def scope(self, statement: Statement.Base):
+        for node in Traverse.postorder([statement]):
+            match node:
+                case Statement.Def(_, _, list_var, expr):
+                    self.defs += 1
+                    params = {var.ident for var in list_var}
+                    for var in Traverse.postorder(list_var + [expr]):
+                        if type(var) is Variable.Unary and var.ident in params:
+                            self.scopes[id(var)] = self.defs
+
+    def canonical(self, key: tuple, node):
+        canon = self.table.setdefault(key, node)
+        self.spans.setdefault(id(canon), list()).append((self.line_number, node.col))
+        return canon
+
+    def occurrences(self, node) -> list[tuple[int | None, range]]:
+        return self.spans.get(id(node), [])
+
+    def letters(self, ident: Ident.Base) -> int | None:
+        if type(ident) is not Ident.Plain:
+            return None
+        return self.epochs.get(ident.text[0], 0)
+
+    def pop_list(self, count: int) -> list:
+        if count == 0:
+            return []
+        items = self.exprs[-count:]
+        del self.exprs[-count:]
+        return items
+
+    def pop(self, node):
+        match node:
+            case Expression.Base():
+                return self.exprs.pop()
+            case Variable.Base():
+                return self.vars.pop()
+            case Statement.Base():
+                return self.statements.pop()
+        return node
+
+    def pop_field(self, old):
+        if isinstance(old, list):
+            new = [self.pop(node) for node in reversed(old)][::-1]
+            return old if all(a is b for a, b in zip(old, new)) else new
+        return self.pop(old)
+
+    def visit_expression(self, expr: Expression.Base):
+        match expr:
+            case Expression.Variable(var):
+                new = self.vars.pop()
+                if new is not var:
+                    expr = Expression.Variable(new)
+                canon = self.table.setdefault((Expression.Variable, id(new)), expr)
+            case (
+                Expression.Integer(_, value)
+                | Expression.Single(_, value)
+                | Expression.Double(_, value)
+                | Expression.String(_, value)
+            ):
+                canon = self.canonical((type(expr), value), expr)
+            case Expression._ColExpr(col, operand):
+                new = self.exprs.pop()
+                if new is not operand:
+                    expr = type(expr)(col, new)
+                canon = self.canonical((type(expr), id(new)), expr)
+            case Expression._ColExprExpr(col, lhs, rhs):
+                new_rhs = self.exprs.pop()
+                new_lhs = self.exprs.pop()
+                if new_lhs is not lhs or new_rhs is not rhs:
+                    expr = type(expr)(col, new_lhs, new_rhs)
+                key = (type(expr), id(new_lhs), id(new_rhs))
+                canon = self.canonical(key, expr)
+        self.exprs.append(canon)
+
+    def visit_variable(self, var: Variable.Base):
+        match var:
+            case Variable.Array(col, ident, list_expr):
+                new = self.pop_list(len(list_expr))
+                if any(a is not b for a, b in zip(list_expr, new)):
+                    var = Variable.Array(col, ident, new)
+                key = (Variable.Array, ident, self.letters(ident))
+                key += tuple(id(e) for e in new)
+            case Variable.Unary(_, ident):
+                scope = self.scopes.get(id(var))
+                key = (Variable.Unary, ident, self.letters(ident), scope)
+        self.vars.append(self.canonical(key, var))
+
+    def visit_statement(self, statement: Statement.Base):
+        # Statements are not shared, only their operands are replaced
+        fields = type(statement).__match_args__[1:]
+        values = [self.pop_field(getattr(statement, f)) for f in reversed(fields)]
+        values.reverse()
+        if any(new is not getattr(statement, f) for f, new in zip(fields, values)):
+            statement = type(statement)(statement.col, *values)
+        if type(statement) in HashCons.deftypes:
+            first, last = statement.var0.ident.text, statement.var1.ident.text
+            for c in range(ord(first), ord(last) + 1):
+                self.epochs[chr(c)] = self.epochs.get(chr(c), 0) + 1
+        self.statements.append(statement)
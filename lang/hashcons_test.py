@@ -0,0 +1,82 @@
+import io
+import unittest
+from lang.ast import Statement, Expression
+from lang.bytecode import compile_program
+from lang.hashcons import HashCons
+from lang.lex import lex
+from lang.line import load_lines
+from lang.parse import parse
+from lang.runtime import Runtime
+from lang.vm import VM
+
+
+class TestHashCons(unittest.TestCase):
+    def test_shared_subtrees(self):
+        hashcons = HashCons()
+        [let0] = parse(*lex("10 X=A(I,J)+I+1"), hashcons)
+        [let1, let2] = parse(*lex("20 Y=A(I,J)+I+1:Z=A(I,J)"), hashcons)
+        self.assertIs(let0.expr, let1.expr)
+        self.assertIsNot(let0, let1)
+        match let0.expr:
+            case Expression.Add(_, Expression.Add(_, array, _), _):
+                self.assertIs(array, let2.expr)
+            case expr:
+                self.fail(repr(expr))
+        self.assertEqual(
+            hashcons.occurrences(let0.expr), [(10, range(10, 11)), (20, range(10, 11))]
+        )
+        self.assertEqual(
+            [line for line, _ in hashcons.occurrences(let2.expr.var)], [10, 20, 20]
+        )
+
+    def test_types_distinct(self):
+        hashcons = HashCons()
+        statements = parse(*lex("10 A=1:B=1!:C=1#:D$=\"1\""), hashcons)
+        self.assertEqual(len({id(s.expr) for s in statements}), 4)
+
+    def test_same_ast(self):
+        source = "10 FOR I=1 TO 10:IF A(I)>A(I+1) THEN SWAP A(I),A(I+1):PRINT A(I)"
+        self.assertEqual(
+            [type(s) for s in parse(*lex(source), HashCons())],
+            [type(s) for s in parse(*lex(source))],
+        )
+        [_, statement] = parse(*lex(source), HashCons())
+        match statement:
+            case Statement.If(_, _, [Statement.Swap(_, var0, _), Statement.Print()]):
+                self.assertIs(var0, statement.list_statement0[1].list_expr[0].var)
+            case _:
+                self.fail(repr(statement))
+
+    def test_scopes(self):
+        hashcons = HashCons()
+        [let, define] = parse(*lex("10 X=5:DEF FNA(X)=X*2+Y"), hashcons)
+        [_, print_] = parse(*lex("20 DEFINT Y:PRINT FNA(3);X;Y"), hashcons)
+        [param] = define.list_var
+        self.assertIs(define.expr.expr0.expr0.var, param)
+        self.assertIsNot(let.var, param)
+        self.assertIs(print_.list_expr[1].var, let.var)
+        self.assertIsNot(print_.list_expr[2].var, define.expr.expr1.var)
+
+    def test_scoped_program(self):
+        source = "10 X=5:DEF FNA(X)=X*2\n20 PRINT FNA(3);X"
+        hashcons = HashCons()
+        lines = load_lines(source, tokens_only=True)
+        for line in lines:
+            line.statements = parse(line.number, line.tokens, hashcons=hashcons)
+        output = io.StringIO()
+        VM(compile_program(lines), Runtime(output)).run()
+        self.assertEqual(output.getvalue(), " 6  5 \n")
+
+    def test_originals_intact(self):
+        _, tokens = lex("10 IF A(I)>1 THEN X=A(I)+1")
+        original = parse(10, tokens)
+        hashcons = HashCons()
+        hashcons.intern(parse(10, tokens))
+        [statement] = hashcons.intern(original)
+        self.assertIsNot(statement, original[0])
+        [then] = original[0].list_statement0
+        self.assertIsNot(then.expr.expr0.var, original[0].expr.expr0.var)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 import re
+from typing import Iterator, TextIO
 from lang.tokens import TokenScan, Token, Literal, Word, Ident, Operator
+from lang.error import Error, ErrorCode
 import lang.line
 from collections import deque
 
@@ -12,13 +14,34 @@ class Re:
     hex = re.compile("[0-9A-Fa-f]", flags=re.ASCII)
     alphabetic = re.compile("[A-Za-z]", flags=re.ASCII)
     not_minutia = re.compile("(?:[A-Za-z]|\\s|\\d)", flags=re.ASCII)
+    data = re.compile('(?:"[^"]*"?|[^":])*')
+    data_field = re.compile('(?:"[^"]*"?|[^",])*')
+    token = re.compile(
+        r"""
+        (?P<whitespace>\s+)
+        |(?P<number>
+            (?P<mantissa>\d+(?:\.\d*)?)
+            (?:[EeDd](?:[+-]\d*|\d+|\Z))?
+            [!\#%]?
+        )
+        |(?P<word>(?P<letters>[A-Za-z]+)(?P<digits>\d*)(?P<suffix>[$!\#%]?))
+        |(?P<string>"[^"]*"?)
+        |(?P<hex>&[Hh][0-9A-Fa-f]*)
+        |(?P<octal>&[0-7]*)
+        |(?P<minutia>[(),:;?'^*/\\+\-=<>])
+        |(?P<unknown>[^A-Za-z0-9\s]+)
+        """,
+        flags=re.ASCII | re.VERBOSE,
+    )
 
 
 class BasicLexer:
     def __init__(self, chars):
+        self.source = chars
         self.chars = deque(chars)
         self.pending = deque()
         self.remark = False
+        self.data = False
 
     def __iter__(self):
         return self
@@ -34,6 +57,13 @@ class BasicLexer:
             if token == Token.Unknown(""):
                 raise StopIteration
             return token
+        if self.data:
+            self.data = False
+            rest = "".join(self.chars)
+            stop = Re.data.match(rest).end()
+            self.chars = deque(rest[stop:])
+            if stop > 0:
+                return Token.Unknown(rest[:stop])
         try:
             pk = self.chars[0]
         except IndexError:
@@ -43,9 +73,15 @@ class BasicLexer:
         if Re.digit.match(pk):
             return self.number()
         if Re.alphabetic.match(pk):
+            start = len(self.source) - len(self.chars)
             token = self.alphabetic()
             if token == Token.Word(Word.Rem1):
                 self.remark = True
+            if token == Token.Word(Word.Data):
+                # The rest of the statement is raw text, case and all
+                self.pending.clear()
+                self.chars = deque(self.source[start + token.width :])
+                self.data = True
             return token
         if pk == '"':
             return self.string()
@@ -108,7 +144,10 @@ class BasicLexer:
                 if not Re.digit.match(pk):
                     exp = False
                     s = s[:-1]
-                    self.chars.pushleft(ch)
+                    if ch == "D":
+                        digits -= 8
+                    self.chars.appendleft(ch)
+                    break
             if Re.digit.match(pk):
                 continue
             if not exp and not decimal and pk == ".":
@@ -230,8 +269,130 @@ class BasicLexer:
         return Token.Unknown(s)
 
 
-def lex(source_line: str) -> (int, list[Token]):
-    line_number = None
+class BasicScanner:
+    idents = {
+        "$": Ident.String,
+        "!": Ident.Single,
+        "#": Ident.Double,
+        "%": Ident.Integer,
+    }
+
+    def scan(chars: str) -> list[Token]:
+        tokens = list()
+        pos = 0
+        end = len(chars)
+        token_match = Re.token.match
+        while pos < end:
+            m = token_match(chars, pos)
+            pos = m.end()
+            match m.lastgroup:
+                case "whitespace":
+                    tokens.append(Token.Whitespace(pos - m.start()))
+                case "word":
+                    start = len(tokens)
+                    pos = BasicScanner.word(tokens, m, chars)
+                    if tokens[start] is Token.Word(Word.Rem1):
+                        BasicScanner.remark(tokens, chars[pos:])
+                        break
+                    if tokens[start] is Token.Word(Word.Data):
+                        del tokens[start + 1 :]
+                        pos = m.start() + tokens[start].width
+                        pos = BasicScanner.data(tokens, chars, pos)
+                case "number":
+                    tokens.append(BasicScanner.number(m))
+                case "minutia":
+                    token = TokenScan.match_minutia(m.group())
+                    tokens.append(token)
+                    if token is Token.Word(Word.Rem2):
+                        BasicScanner.remark(tokens, chars[pos:])
+                        break
+                case "string":
+                    s = m.group()
+                    if len(s) > 1 and s[-1] == '"':
+                        tokens.append(Token.Literal(Literal.String(s[1:-1])))
+                    else:
+                        tokens.append(Token.Literal(Literal.String(s[1:])))
+                case "hex":
+                    tokens.append(Token.Literal(Literal.Hex(m.group()[2:].upper())))
+                case "octal":
+                    tokens.append(Token.Literal(Literal.Octal(m.group()[1:])))
+                case _:
+                    tokens.append(Token.Unknown(m.group()))
+        return tokens
+
+    def remark(tokens: list[Token], s: str):
+        if s != "":
+            tokens.append(Token.Unknown(s))
+
+    def data(tokens: list[Token], chars: str, pos: int) -> int:
+        # Up to the first colon outside quotes
+        stop = Re.data.match(chars, pos).end()
+        if stop > pos:
+            tokens.append(Token.Unknown(chars[pos:stop]))
+        return stop
+
+    def number(m: re.Match) -> Token:
+        s = m.group("number").upper()
+        match s[-1]:
+            case "!":
+                return Token.Literal(Literal.Single(s))
+            case "#":
+                return Token.Literal(Literal.Double(s))
+            case "%":
+                return Token.Literal(Literal.Integer(s))
+        mantissa = m.group("mantissa")
+        digits = len(mantissa)
+        if "." in mantissa:
+            digits -= 1
+        if "D" in s:
+            digits += 8
+        if digits > 7:
+            return Token.Literal(Literal.Double(s))
+        if s.isdigit() and len(s) <= 5 and int(s) <= 32767 and str(int(s)) == s:
+            return Token.Literal(Literal.Integer(s))
+        return Token.Literal(Literal.Single(s))
+
+    def word(tokens: list[Token], m: re.Match, chars: str) -> int:
+        s = TokenScan.alphabetic(tokens, m.group("letters").upper())
+        if s == "":
+            return m.end("letters")
+        digits = m.group("digits")
+        suffix = m.group("suffix")
+        if digits:
+            # Identifiers are re-crunched each time a digit is appended
+            # unless another letter follows, matching BasicLexer.
+            pos = m.start("digits")
+            last = m.end("digits") - 1
+            alpha_follows = suffix == "" and Re.alphabetic.match(chars, last + 1)
+            while pos <= last:
+                s += chars[pos]
+                pos += 1
+                if pos <= last or not alpha_follows:
+                    s = TokenScan.alphabetic(tokens, s)
+                    if s == "":
+                        return pos
+        if suffix:
+            tokens.append(Token.Ident(BasicScanner.idents[suffix](s + suffix)))
+        else:
+            tokens.append(Token.Ident(Ident.Plain(s)))
+        return m.end()
+
+
+def lex(source_line: str, verify: bool = False) -> (int, list[Token]):
+    line_number, source_line = split_line_number(source_line)
+    tokens = BasicScanner.scan(source_line)
+    if verify and tokens != list(BasicLexer(source_line)):
+        raise Error(ErrorCode.InternalError).add_line_number(
+            line_number
+        ).add_message("SCANNER MISMATCH")
+    return (line_number, _normalize(tokens))
+
+
+def lex_tokens(source: str) -> list[Token]:
+    return _normalize(BasicScanner.scan(source))
+
+
+def split_line_number(source_line: str) -> (int | None, str):
     result = Re.line_number.match(source_line)
     if result:
         potential_line_number = int(result.group(1))
@@ -239,90 +400,142 @@ def lex(source_line: str) -> (int, list[Token]):
             potential_line_number >= 0
             and potential_line_number <= lang.line.Line.max_number
         ):
-            line_number = potential_line_number
-            source_line = result.group(2)
-    tokens = list(BasicLexer(source_line))
-    _trim_end(tokens)
-    _collapse_triples(tokens)
-    _collapse_doubles(tokens)
-    _separate_words(tokens)
-    return (line_number, tokens)
-
-
-def _trim_end(tokens: list[Token]):
-    # try code spaces first
-    try:
-        if type(tokens[-1]) == Token.Whitespace:
-            tokens.pop()
-    except IndexError:
-        pass
-    # get spaces in rems too
-    try:
-        if type(tokens[-1]) == Token.Unknown:
-            s = str(tokens.pop()).rstrip()
-            tokens.append(Token.Unknown(s))
-    except IndexError:
-        pass
-
-
-def _collapse_triples(tokens: list[Token]):
-    locs = list()
-    for i in range(len(tokens) - 2):
-        w0, w1, w2 = tokens[i : i + 3]
-        if w0 == Token.Operator(Operator.Less):
-            if type(w1) == Token.Whitespace:
-                if w2 == Token.Operator(Operator.Greater):
-                    locs.append((i, Token.Operator(Operator.NotEqual)))
-                if w2 == Token.Operator(Operator.Equal):
-                    locs.append((i, Token.Operator(Operator.LessEqual)))
-        if w0 == Token.Operator(Operator.Equal):
-            if type(w1) == Token.Whitespace:
-                if w2 == Token.Operator(Operator.Greater):
-                    locs.append((i, Token.Operator(Operator.GreaterEqual)))
-                if w2 == Token.Operator(Operator.Less):
-                    locs.append((i, Token.Operator(Operator.LessEqual)))
-        if w0 == Token.Operator(Operator.Greater):
-            if type(w1) == Token.Whitespace:
-                if w2 == Token.Operator(Operator.Less):
-                    locs.append((i, Token.Operator(Operator.NotEqual)))
-                if w2 == Token.Operator(Operator.Equal):
-                    locs.append((i, Token.Operator(Operator.GreaterEqual)))
-        if str(w0) == "GO":
-            if type(w1) == Token.Whitespace:
-                if w2 == Token.Word(Word.To):
-                    locs.append((i, Token.Word(Word.Goto)))
-                if str(w2) == "SUB":
-                    locs.append((i, Token.Word(Word.Gosub)))
-    for index, token in reversed(locs):
-        tokens[index : index + 3] = [token]
-
-
-def _collapse_doubles(tokens: list[Token]):
-    locs = list()
-    for i in range(len(tokens) - 1):
-        w0, w1 = tokens[i : i + 2]
-        if w0 == Token.Operator(Operator.Equal):
-            if w1 == Token.Operator(Operator.Greater):
-                locs.append((i, Token.Operator(Operator.GreaterEqual)))
-            if w1 == Token.Operator(Operator.Less):
-                locs.append((i, Token.Operator(Operator.LessEqual)))
-        if w1 == Token.Operator(Operator.Equal):
-            if w0 == Token.Operator(Operator.Greater):
-                locs.append((i, Token.Operator(Operator.GreaterEqual)))
-            if w0 == Token.Operator(Operator.Less):
-                locs.append((i, Token.Operator(Operator.LessEqual)))
-        if w0 == Token.Operator(Operator.Less):
-            if w1 == Token.Operator(Operator.Greater):
-                locs.append((i, Token.Operator(Operator.NotEqual)))
-    for index, token in reversed(locs):
-        tokens[index : index + 2] = [token]
-
-
-def _separate_words(tokens: list[Token]):
-    locs = list()
-    for i in range(len(tokens) - 1):
-        window = tokens[i : i + 2]
-        if window[0].is_word() and window[1].is_word():
-            locs.append(i)
-    for loc in reversed(locs):
-        tokens.insert(loc + 1, Token.Whitespace(1))
+            return (potential_line_number, result.group(2))
+    return (None, source_line)
+
+
+def lex_program(
+    source: TextIO | str, chunk_size: int = 65536, cache=None
+) -> Iterator[tuple[int | None, list[Token]]]:
+    if isinstance(source, str):
+        source_lines = _split_lines(source)
+    else:
+        source_lines = _read_lines(source, chunk_size)
+    for source_line in source_lines:
+        source_line = source_line.rstrip("\r")
+        if source_line.strip() != "":
+            if cache is None:
+                yield lex(source_line)
+            else:
+                yield cache.lex(source_line)
+
+
+def _split_lines(source: str) -> Iterator[str]:
+    start = 0
+    while True:
+        stop = source.find("\n", start)
+        if stop < 0:
+            yield source[start:]
+            return
+        yield source[start:stop]
+        start = stop + 1
+
+
+def _read_lines(source: TextIO, chunk_size: int) -> Iterator[str]:
+    # A line can span many chunks, its pieces are joined once it ends
+    pieces = list()
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        lines = chunk.split("\n")
+        pieces.append(lines[0])
+        if len(lines) > 1:
+            yield "".join(pieces)
+            yield from lines[1:-1]
+            pieces = [lines[-1]]
+    yield "".join(pieces)
+
+
+class Collapse:
+    less = {
+        Operator.Greater: Token.Operator(Operator.NotEqual),
+        Operator.Equal: Token.Operator(Operator.LessEqual),
+    }
+    equal = {
+        Operator.Greater: Token.Operator(Operator.GreaterEqual),
+        Operator.Less: Token.Operator(Operator.LessEqual),
+    }
+    triples = {
+        Operator.Less: less,
+        Operator.Equal: equal,
+        Operator.Greater: {
+            Operator.Less: Token.Operator(Operator.NotEqual),
+            Operator.Equal: Token.Operator(Operator.GreaterEqual),
+        },
+    }
+    doubles = {
+        Operator.Less: less,
+        Operator.Equal: equal,
+        Operator.Greater: {
+            Operator.Equal: Token.Operator(Operator.GreaterEqual),
+        },
+    }
+    goto = Token.Word(Word.Goto)
+    gosub = Token.Word(Word.Gosub)
+    space = Token.Whitespace(1)
+
+    def triple(tokens: list[Token], i: int, end: int) -> Token | None:
+        # "< >", "GO TO" and friends with whitespace in the middle
+        if i + 2 >= end or type(tokens[i + 1]) != Token.Whitespace:
+            return None
+        w0 = tokens[i]
+        w2 = tokens[i + 2]
+        if type(w0) == Token.Operator:
+            if type(w2) == Token.Operator:
+                second = Collapse.triples.get(w0.operator)
+                if second is not None:
+                    return second.get(w2.operator)
+        elif type(w0) == Token.Ident and w0.id.text == "GO":
+            if w2 is Token.Word(Word.To):
+                return Collapse.goto
+            if type(w2) == Token.Ident and w2.id.text == "SUB":
+                return Collapse.gosub
+        return None
+
+    def double(w0: Token, w1: Token) -> Token | None:
+        if type(w0) == Token.Operator and type(w1) == Token.Operator:
+            second = Collapse.doubles.get(w0.operator)
+            if second is not None:
+                return second.get(w1.operator)
+        return None
+
+
+def _normalize(tokens: list[Token]) -> list[Token]:
+    # Trims the end, collapses split operators and keywords, then
+    # separates adjacent words, in one pass over the scanned tokens.
+    # Overlapping collapses, such as "<=>", keep the first match and
+    # swallow the rest.
+    end = len(tokens)
+    if end and type(tokens[end - 1]) == Token.Whitespace:
+        end -= 1
+    triple = Collapse.triple
+    double = Collapse.double
+    result = list()
+    i = 0
+    while i < end:
+        token = triple(tokens, i, end)
+        if token is not None:
+            i += 3
+            while triple(tokens, i - 1, end) is not None:
+                i += 2
+        else:
+            token = tokens[i]
+            i += 1
+            if i < end and triple(tokens, i, end) is None:
+                collapsed = double(token, tokens[i])
+                if collapsed is not None:
+                    token = collapsed
+                    i += 1
+                    while (
+                        i < end
+                        and double(tokens[i - 1], tokens[i]) is not None
+                        and triple(tokens, i, end) is None
+                    ):
+                        i += 1
+        if token.is_word() and result and result[-1].is_word():
+            result.append(Collapse.space)
+        result.append(token)
+    if result and type(result[-1]) == Token.Unknown:
+        result[-1] = Token.Unknown(result[-1].text.rstrip())
+    return result
@@ -1,5 +1,6 @@
+import io
 import unittest
-from lang.lex import lex
+from lang.lex import lex, lex_program
 from lang.line import Line
 from lang.tokens import Token, Literal, Word, Ident, Operator
 
@@ -24,6 +25,67 @@ class Test_LexParse(unittest.TestCase):
             ],
         )
 
+    def test_punctuation(self):
+        line = Line(*lex("10 printa(1),b;:x=2"))
+        self.assertEqual(str(line), "10 PRINT A(1),B;:X=2")
+        self.assertIs(line.tokens[3], Token.LParen())
+        self.assertIs(line.tokens[8], Token.Semicolon())
+
+    def test_collapse(self):
+        line = Line(*lex("ifA< >B orC= <D go to 10 go sub 20 ' Comment  "))
+        self.assertEqual(str(line), "IF A<>B OR C<=D GOTO 10 GOSUB 20 ' Comment")
+        line = Line(*lex("A=B=>C<=>D"))
+        self.assertEqual(str(line), "A=B>=C<=D")
+
+    def test_scanner_matches_lexer(self):
+        for source in [
+            "fori=1to99",
+            "10 ifA%> =&hff00go to 10",
+            "A%=&1234 ' Comment ",
+            "X#=1.5D3+2E-4*7!-123456789+32768",
+            'A$="Foo"+B1$+"unterminated',
+            "20 REMHELLO WORLD",
+            "PRINTX1Y2 @~",
+            "A=1EX",
+            "A=2DX+3E",
+            "A=1E!",
+            "A=1E#",
+            "A=1E%",
+            "A=1E.",
+            "IFXTHENY:PRINTXPRINT12",
+            'DATA abc, "x:y" ,1:printd',
+            "DATA:DATA",
+        ]:
+            self.assertEqual(lex(source, verify=True), lex(source))
+
+    def test_data(self):
+        line = Line(*lex('10 data abc, "x:y" ,1:printd'))
+        self.assertEqual(str(line), '10 DATA abc, "x:y" ,1:PRINT D')
+        self.assertEqual(line.tokens[1], Token.Unknown(' abc, "x:y" ,1'))
+
+    def test_token_widths(self):
+        for source in [
+            "10 ifA%> =&hff00go to 10",
+            "X#=1.5D3+2E-4*7!-123456789:PRINTA$;\"HI\",B(1)",
+            "A%=&1234 ' Comment ",
+            "PRINTX1Y2 @~",
+        ]:
+            tokens = lex(source)[1]
+            self.assertEqual([t.width for t in tokens], [len(str(t)) for t in tokens])
+
+    def test_lex_program(self):
+        source = "10 fori=1to99\r\n\n20 nexti\n  \nA$=\"Foo\""
+        expected = [lex("10 fori=1to99"), lex("20 nexti"), lex('A$="Foo"')]
+        self.assertEqual(list(lex_program(source)), expected)
+        for chunk_size in [1, 2, 3, 4, 64]:
+            stream = io.StringIO(source)
+            self.assertEqual(list(lex_program(stream, chunk_size=chunk_size)), expected)
+        source = "10 A=" + "1+" * 5000 + "1\n20 END"
+        stream = io.StringIO(source)
+        self.assertEqual(
+            list(lex_program(stream, chunk_size=3)), list(lex_program(source))
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,8 @@
+from typing import TextIO
 from lang.tokens import Token
 from lang.ast import Statement
 from lang.parse import parse
+import lang.lex
 
 
 class Line:
@@ -8,8 +10,20 @@ class Line:
 
     def __init__(self, number: int | None, tokens: list[Token]):
         self.number = number
+        self.program = None
         self.tokens = tokens
 
+    def get_tokens(self) -> list[Token]:
+        return self._tokens
+
+    def set_tokens(self, tokens: list[Token]):
+        self._tokens = tokens
+        self.statements = None
+        if self.program is not None:
+            self.program.stale(self.number)
+
+    tokens = property(get_tokens, set_tokens)
+
     def __str__(self):
         if self.number == None:
             return "".join([str(x) for x in self.tokens])
@@ -17,4 +31,22 @@ class Line:
             return str(self.number) + " " + "".join([str(x) for x in self.tokens])
 
     def ast(self) -> list[Statement]:
-        return parse(self.number, self.tokens)
+        if self.statements is None:
+            self.statements = parse(self.number, self.tokens)
+        return self.statements
+
+    def is_parsed(self) -> bool:
+        return self.statements is not None
+
+
+def load_lines(
+    source: TextIO | str, tokens_only: bool = False, cache=None
+) -> list[Line]:
+    lines = [
+        Line(number, tokens)
+        for number, tokens in lang.lex.lex_program(source, cache=cache)
+    ]
+    if not tokens_only:
+        for line in lines:
+            line.ast()
+    return lines
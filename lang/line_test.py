@@ -0,0 +1,43 @@
+import unittest
+from lang.lex import lex
+from lang.line import Line, load_lines
+from lang.error import Error
+
+
+class TestLine(unittest.TestCase):
+    def test_ast_memoized(self):
+        line = Line(*lex("10 A=1:PRINT A"))
+        self.assertFalse(line.is_parsed())
+        statements = line.ast()
+        self.assertTrue(line.is_parsed())
+        self.assertIs(line.ast(), statements)
+
+    def test_tokens_invalidate(self):
+        line = Line(*lex("10 A=1"))
+        statements = line.ast()
+        line.tokens = lex("10 B=2:C=3")[1]
+        self.assertFalse(line.is_parsed())
+        self.assertIsNot(line.ast(), statements)
+        self.assertEqual(len(line.ast()), 2)
+
+    def test_errors_not_memoized(self):
+        line = Line(*lex("10 A="))
+        for _ in range(2):
+            with self.assertRaises(Error):
+                line.ast()
+        self.assertFalse(line.is_parsed())
+
+    def test_load_lines(self):
+        source = "10 A=1\n20 GOTO 10\n30 A=\n"
+        lines = load_lines(source, tokens_only=True)
+        self.assertEqual([line.number for line in lines], [10, 20, 30])
+        self.assertFalse(any(line.is_parsed() for line in lines))
+        lines[1].ast()
+        self.assertEqual([line.is_parsed() for line in lines], [False, True, False])
+        with self.assertRaises(Error) as cm:
+            load_lines(source)
+        self.assertEqual(cm.exception.line_number, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
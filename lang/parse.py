@@ -1,55 +1,81 @@
+from typing import Iterable
 from lang.ast import Statement, Variable, Expression
 from lang.tokens import TokenScan, Token, Literal, Word, Ident, Operator
 from lang.error import Error, ErrorCode
+import lang.lex
 import lang.line
 
 
 class BasicParser:
-    def parse(tokens: list[Token]) -> list[Statement]:
-        parse = BasicParser(tokens)
+    def parse(
+        tokens: list[Token],
+        errors: list[Error] | None = None,
+        hashcons=None,
+        spans: dict | None = None,
+    ) -> list[Statement]:
+        parse = BasicParser(tokens, errors, spans)
         match parse.peek():
             case (
                 Token.Literal(Literal.Integer(_))
                 | Token.Literal(Literal.Single(_))
                 | Token.Literal(Literal.Double(_))
             ):
-                raise Error(ErrorCode.UndefinedLine).add_column(parse.col).add_message(
-                    "INVALID LINE NUMBER"
+                parse.recover(
+                    Error(ErrorCode.UndefinedLine)
+                    .add_column(parse.col)
+                    .add_message("INVALID LINE NUMBER")
                 )
+        if hashcons is not None:
+            return hashcons.intern(parse.expect_statements())
         return parse.expect_statements()
 
-    def __init__(self, tokens: list[Token]):
+    def __init__(
+        self,
+        tokens: list[Token],
+        errors: list[Error] | None = None,
+        spans: dict | None = None,
+    ):
+        self.spans = dict() if spans is None else spans
         self.token_stream = iter(tokens)
+        self.errors = errors
+        self.last = None
         self.peeked = None
         self.rem = False
-        self.col = range(0)
+        self.col = self.span(0, 0)
+
+    def span(self, start: int, stop: int) -> range:
+        # Columns are shared through the caller's table, ranges are immutable
+        row = self.spans.get(start)
+        if row is None:
+            row = self.spans[start] = dict()
+        col = row.get(stop)
+        if col is None:
+            col = row[stop] = range(start, stop)
+        return col
 
     def next(self) -> Token:
-        if self.peeked != None:
+        if self.peeked is not None:
             rv = self.peeked
             self.peeked = None
             return rv
         while True:
-            self.col = range(self.col.stop, self.col.stop)
-            token = next(self.token_stream)
-            if token in (Token.Word(Word.Rem1), Token.Word(Word.Rem2)):
+            token = next(self.token_stream, None)
+            if token is None:
+                self.col = self.span(self.col.stop, self.col.stop)
+                return None
+            if token is Token.Word(Word.Rem1) or token is Token.Word(Word.Rem2):
                 self.rem = True
             if self.rem:
+                self.col = self.span(self.col.stop, self.col.stop)
                 continue
-            self.col = range(self.col.start, self.col.stop + len(str(token)))
-            match token:
-                case Token.Whitespace(_):
-                    continue
-                case _:
-                    return token
+            self.col = self.span(self.col.stop, self.col.stop + token.width)
+            if type(token) is not Token.Whitespace:
+                self.last = token
+                return token
 
     def peek(self) -> Token:
-        if self.peeked == None:
-            try:
-                self.peeked = self.next()
-            except StopIteration:
-                self.peeked = None
-            return self.peeked
+        if self.peeked is None:
+            self.peeked = self.next()
         return self.peeked
 
     def expect_statements(self) -> list[Statement]:
@@ -60,18 +86,38 @@ class BasicParser:
             match pk:
                 case None | Token.Word(Word.Else):
                     return statements
-                case Token.Colon:
+                case Token.Colon():
                     expect_colon = False
                     self.next()
                     continue
                 case _:
-                    if expect_colon:
-                        raise Error(ErrorCode.SyntaxError).add_column(
-                            self.col
-                        ).add_message("UNEXPECTED TOKEN")
-                    statements.append(Statement.expect(self))
+                    try:
+                        if expect_colon:
+                            raise Error(ErrorCode.SyntaxError).add_column(
+                                self.col
+                            ).add_message("UNEXPECTED TOKEN")
+                        statements.append(Statement.expect(self))
+                    except Error as e:
+                        self.recover(e)
                     expect_colon = True
 
+    def recover(self, error: Error):
+        # Without an error list the first error ends the parse
+        if self.errors is None:
+            raise error
+        self.errors.append(error)
+        if self.peeked is None:
+            match self.last:
+                case Token.Colon() | Token.Word(Word.Else):
+                    # The error consumed the boundary, put it back
+                    self.peeked = self.last
+                    return
+        while True:
+            match self.peek():
+                case None | Token.Colon() | Token.Word(Word.Else):
+                    return
+            self.next()
+
     def expect_expression(self) -> Expression:
         return self.expect_fn_expression(dict())
 
@@ -87,7 +133,7 @@ class BasicParser:
         expressions = list()
         while True:
             expressions.append(self.expect_fn_expression(var_map))
-            if self.maybe(Token.Comma):
+            if self.maybe(Token.Comma()):
                 continue
             return expressions
 
@@ -96,15 +142,15 @@ class BasicParser:
         linefeed = True
         while True:
             match self.peek():
-                case None | Token.Colon | Token.Word(Word.Else):
-                    column = range(self.col.stop, self.col.stop)
+                case None | Token.Colon() | Token.Word(Word.Else):
+                    column = self.span(self.col.stop, self.col.stop)
                     if linefeed:
-                        expressions.append(Expression.String("\n"))
+                        expressions.append(Expression.String(column, "\n"))
                     return expressions
-                case Token.Semicolon:
+                case Token.Semicolon():
                     linefeed = False
                     self.next()
-                case Token.Comma:
+                case Token.Comma():
                     linefeed = False
                     self.next()
                     expressions.append(
@@ -120,6 +166,44 @@ class BasicParser:
                     linefeed = True
                     expressions.append(self.expect_expression())
 
+    def expect_data_list(self) -> list[Expression]:
+        # The lexer keeps DATA text raw, fields are split on commas outside
+        # quotes and may be empty
+        match self.peek():
+            case Token.Unknown() as token:
+                self.next()
+                text = token.text
+            case _:
+                text = ""
+        fields = list()
+        start = self.col.start
+        pos = 0
+        while True:
+            stop = lang.lex.Re.data_field.match(text, pos).end()
+            fields.append(self.data_item(text[pos:stop], start + pos))
+            if stop == len(text):
+                return fields
+            pos = stop + 1
+
+    def data_item(self, field: str, start: int) -> Expression:
+        item = field.strip()
+        start += len(field) - len(field.lstrip())
+        col = self.span(start, start + len(item))
+        if item.startswith('"'):
+            return Expression.literal(col, Literal.String(item[1:].split('"')[0]))
+        match lang.lex.BasicScanner.scan(item):
+            case [Token.Literal(lit)]:
+                return Expression.literal(col, lit)
+            case [
+                Token.Operator(Operator.Minus | Operator.Plus as sign),
+                Token.Literal(lit),
+            ] if type(lit) is not Literal.String:
+                expr = Expression.literal(self.span(start + 1, col.stop), lit)
+                if sign == Operator.Minus:
+                    expr = Expression.Negation(col, expr)
+                return expr
+        return Expression.String(col, item)
+
     def expect_ident(self) -> (range, Ident):
         match self.next():
             case Token.Ident(ident):
@@ -128,13 +212,13 @@ class BasicParser:
                 raise Error(ErrorCode.SyntaxError).add_column(self.col).add_message(
                     "EXPECTED VARIABLE"
                 )
-        col = range(self.col.start, self.col.stop)
+        col = self.col
         if ident.is_user_function():
             raise Error(ErrorCode.SyntaxError).add_column(col).add_message(
                 "FN RESERVED FOR FUNCTIONS"
             )
         match self.peek():
-            case Token.LParen:
+            case Token.LParen():
                 raise Error(ErrorCode.SyntaxError).add_column(col).add_message(
                     "ARRAY NOT ALLOWED"
                 )
@@ -145,11 +229,11 @@ class BasicParser:
         expecting = False
         while True:
             match self.peek():
-                case None | Token.Colon | Token.Word(Word.Else) if not expecting:
+                case None | Token.Colon() | Token.Word(Word.Else) if not expecting:
                     break
                 case _:
-                    idents.append(self.expect_ident)
-            if self.maybe(Token.Comma):
+                    idents.append(self.expect_ident())
+            if self.maybe(Token.Comma()):
                 expecting = True
             else:
                 break
@@ -163,16 +247,16 @@ class BasicParser:
                 raise Error(ErrorCode.SyntaxError).add_column(self.col).add_message(
                     "EXPECTED VARIABLE"
                 )
-        col = range(self.col.start, self.col.stop)
+        col = self.col
         if ident.is_user_function():
             raise Error(ErrorCode.SyntaxError).add_column(self.col).add_message(
                 "FN RESERVED FOR FUNCTIONS"
             )
         match self.peek():
-            case Token.LParen:
-                self.expect(Token.LParen)
+            case Token.LParen():
+                self.expect(Token.LParen())
                 list_expr = self.expect_expression_list()
-                self.expect(Token.RParen)
+                self.expect(Token.RParen())
                 return Variable.Array(col, ident, list_expr)
         return Variable.Unary(col, ident)
 
@@ -180,23 +264,21 @@ class BasicParser:
         list_var = list()
         while True:
             list_var.append(self.expect_var())
-            if self.maybe(Token.Comma):
+            if self.maybe(Token.Comma()):
                 continue
             break
         return list_var
 
     def maybe_line_number(self) -> int | None:
         match self.peek():
-            case (
-                Token.Literal(Literal.Integer(s))
-                | Token.Literal(Literal.Single(s))
-                | Token.Literal(Literal.Double(s))
+            case Token.Literal(
+                Literal.Integer(_) | Literal.Single(_) | Literal.Double(_) as lit
             ):
                 self.next()
-                # TODO validate parse
-                num = int(s)
-                if num <= lang.line.Line.max_number:
-                    return num
+                num = lit.value
+                if num is not None and num == int(num):
+                    if num >= 0 and num <= lang.line.Line.max_number:
+                        return int(num)
                 raise Error(ErrorCode.UndefinedLine).add_column(self.col).add_message(
                     "INVALID LINE NUMBER"
                 )
@@ -210,28 +292,36 @@ class BasicParser:
             )
         return Expression.Single(self.col, float(line_no))
 
+    def maybe_line_number_expression(self, default: int = 0) -> Expression:
+        line_no = self.maybe_line_number()
+        if line_no == None:
+            return Expression.Single(
+                self.span(self.col.stop, self.col.stop), float(default)
+            )
+        return Expression.Single(self.col, float(line_no))
+
     def expect_line_number_list(self) -> list[Expression]:
         vars = list()
         expecting = False
         while True:
             match self.peek():
-                case None | Token.Colon | Token.Word(Word.Else) if not expecting:
+                case None | Token.Colon() | Token.Word(Word.Else) if not expecting:
                     break
-            vars.append(self.expect_line_number)
-            if self.maybe(Token.Comma):
+            vars.append(self.expect_line_number())
+            if self.maybe(Token.Comma()):
                 expecting = True
             else:
                 break
         return vars
 
     def expect_line_number_range(self) -> (Expression, Expression):
-        col = range(self.col.start, self.col.stop)
+        col = self.col
         match self.maybe_line_number():
             case None:
                 from_num = 0.0
                 to_num = lang.line.Line.max_number
                 from_expr = Expression.Single(
-                    range(self.col.start, self.col.start), from_num
+                    self.span(self.col.start, self.col.start), from_num
                 )
             case num:
                 from_num = num
@@ -242,16 +332,17 @@ class BasicParser:
                 case None:
                     to_num = lang.line.Line.max_number
                     to_expr = Expression.Single(
-                        range(self.col.start, self.col.start), to_num
+                        self.span(self.col.start, self.col.start), to_num
                     )
                 case num:
                     to_num = num
-                    to_expr = Expression.Single(self.col.start, to_num)
+                    to_expr = Expression.Single(self.col, to_num)
         else:
-            to_expr = Expression.Single(range(self.col.start, self.col.start), to_num)
+            start = self.col.start
+            to_expr = Expression.Single(self.span(start, start), to_num)
         if from_num > to_num:
             raise Error(ErrorCode.UndefinedLine).add_column(
-                range(col.start, self.col.stop)
+                self.span(col.start, self.col.stop)
             ).add_message("INVALID RANGE")
         return (from_expr, to_expr)
 
@@ -273,7 +364,7 @@ class BasicParser:
                 raise Error(ErrorCode.SyntaxError).add_column(to_col)
         if from_char > to_char:
             raise Error(ErrorCode.SyntaxError).add_column(
-                range(from_col.start, to_col.stop)
+                self.span(from_col.start, to_col.stop)
             ).add_message("INVALID RANGE")
         from_var = Variable.Unary(from_col, from_ident)
         to_var = Variable.Unary(to_col, to_ident)
@@ -309,23 +400,44 @@ class BasicParser:
                 msg = "EXPECTED OPERATOR"
             case Token.Ident(_):
                 msg = "EXPECTED IDENTIFIER"
-            case Token.LParen:
+            case Token.LParen():
                 msg = "EXPECTED LEFT PARENTHESIS"
-            case Token.RParen:
+            case Token.RParen():
                 msg = "EXPECTED RIGHT PARENTHESIS"
-            case Token.Comma:
+            case Token.Comma():
                 msg = "EXPECTED COMMA"
-            case Token.Colon:
+            case Token.Colon():
                 msg = "EXPECTED COLON"
-            case Token.Semicolon:
+            case Token.Semicolon():
                 msg = "EXPECTED SEMICOLON"
             case _:
                 msg = "EXPECTED THE IMPOSSIBLE"
         raise Error(ErrorCode.SyntaxError).add_column(self.col).add_message(msg)
 
 
-def parse(line_number: int | None, tokens: list[Token]) -> list[Statement]:
+def parse(
+    line_number: int | None,
+    tokens: list[Token],
+    hashcons=None,
+    spans: dict | None = None,
+) -> list[Statement]:
+    if hashcons is not None:
+        hashcons.line_number = line_number
     try:
-        return BasicParser.parse(tokens)
+        return BasicParser.parse(tokens, hashcons=hashcons, spans=spans)
     except Error as e:
         raise e.add_line_number(line_number)
+
+
+def parse_program(
+    lines: Iterable[tuple[int | None, list[Token]]],
+) -> (list[tuple[int | None, list[Statement]]], list[Error]):
+    program = list()
+    errors = list()
+    spans = dict()
+    for line_number, tokens in lines:
+        first = len(errors)
+        program.append((line_number, BasicParser.parse(tokens, errors, spans=spans)))
+        for e in errors[first:]:
+            e.add_line_number(line_number)
+    return (program, errors)
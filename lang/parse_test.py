@@ -1,11 +1,39 @@
 from lang.ast import Statement, Variable, Expression, Ident
 from lang.error import Error, ErrorCode
 from lang.line import Line
-from lang.lex import lex
+from lang.lex import lex, lex_program
+from lang.parse import parse_program
+import lang.tokens
 import unittest
 
 
+def shape(node):
+    # Node names and values without columns, identifiers by their text
+    match node:
+        case list():
+            return [shape(item) for item in node]
+        case Ident.Base(text) | lang.tokens.Ident.Base(text):
+            return text
+        case int() | float() | str():
+            return node
+    fields = [getattr(node, name) for name in type(node).__match_args__]
+    return (type(node).__name__,) + tuple(
+        shape(field) for field in fields if type(field) is not range
+    )
+
+
+def statements(source: str) -> list:
+    return shape(Line(*lex(source)).ast())
+
+
 class Test_TestParse(unittest.TestCase):
+    def assertSyntaxError(self, source: str, col: range, message: str):
+        with self.assertRaises(Error) as cm:
+            Line(*lex(source)).ast()
+        self.assertEqual(cm.exception.code, ErrorCode.SyntaxError)
+        self.assertEqual(cm.exception.column, col)
+        self.assertEqual(cm.exception.message, message)
+
     def test_equality_of_different_objects(self):
         line = Line(*lex("A%=1234 ' Comment "))
         self.assertEqual(
@@ -19,6 +47,333 @@ class Test_TestParse(unittest.TestCase):
             line.ast(),
         )
 
+    def test_operator_precedence(self):
+        match Line(*lex("A=-B+C*2^3 AND NOT D")).ast():
+            case [
+                Statement.Let(
+                    _,
+                    _,
+                    Expression.And(
+                        _,
+                        Expression.Add(
+                            _,
+                            Expression.Negation(_, Expression.Variable()),
+                            Expression.Multiply(
+                                _,
+                                Expression.Variable(),
+                                Expression.Power(
+                                    _, Expression.Integer(_), Expression.Integer(_)
+                                ),
+                            ),
+                        ),
+                        Expression.Not(_, Expression.Variable()),
+                    ),
+                )
+            ]:
+                pass
+            case ast:
+                self.fail(repr(ast))
+
+    def test_statement_dispatch(self):
+        match Line(*lex("ON X GOSUB 10,20:LET Y=1:TRON")).ast():
+            case [Statement.OnGosub(), Statement.Let(), Statement.Tron()]:
+                pass
+            case ast:
+                self.fail(repr(ast))
+        with self.assertRaises(Error) as cm:
+            Line(*lex("10 THEN")).ast()
+        self.assertEqual(str(cm.exception), "?SYNTAX ERROR IN 10:1; EXPECTED STATEMENT")
+
+    def test_bare_statements(self):
+        self.assertEqual(
+            statements("CLEAR:CLS:CONT:END:NEW:RETURN:STOP:TROFF:TRON:WEND"),
+            [
+                ("Clear",),
+                ("Cls",),
+                ("Cont",),
+                ("End",),
+                ("New",),
+                ("Return",),
+                ("Stop",),
+                ("Troff",),
+                ("Tron",),
+                ("Wend",),
+            ],
+        )
+
+    def test_data(self):
+        self.assertEqual(
+            statements('DATA 1,-2.5,"A,B", +3 ,&H10'),
+            [
+                (
+                    "Data",
+                    [
+                        ("Integer", 1),
+                        ("Negation", ("Single", 2.5)),
+                        ("String", "A,B"),
+                        ("Integer", 3),
+                        ("Integer", 16),
+                    ],
+                )
+            ],
+        )
+        # Unquoted fields keep their text, empty fields are empty strings
+        self.assertEqual(
+            statements("DATA ABC, hello world ,FORMAT:PRINT"),
+            [
+                (
+                    "Data",
+                    [
+                        ("String", "ABC"),
+                        ("String", "hello world"),
+                        ("String", "FORMAT"),
+                    ],
+                ),
+                ("Print", [("String", "\n")]),
+            ],
+        )
+        self.assertEqual(
+            statements("DATA 1,,3,"),
+            [
+                (
+                    "Data",
+                    [
+                        ("Integer", 1),
+                        ("String", ""),
+                        ("Integer", 3),
+                        ("String", ""),
+                    ],
+                )
+            ],
+        )
+        self.assertEqual(statements("DATA"), [("Data", [("String", "")])])
+        [data] = Line(*lex("DATA 1, AB C")).ast()
+        self.assertEqual(
+            [expr.col for expr in data.list_expr], [range(5, 6), range(8, 12)]
+        )
+
+    def test_def(self):
+        self.assertEqual(
+            statements("DEF FNA(X,Y)=X+Z:DEF FNB$=\"B\""),
+            [
+                (
+                    "Def",
+                    ("Unary", "FNA"),
+                    [("Unary", "X"), ("Unary", "Y")],
+                    ("Add", ("Variable", ("Unary", "X")), ("Variable", ("Unary", "Z"))),
+                ),
+                ("Def", ("Unary", "FNB$"), [], ("String", "B")),
+            ],
+        )
+        [define] = Line(*lex("DEF FNA(X)=X")).ast()
+        self.assertIs(define.expr.var, define.list_var[0])
+        self.assertSyntaxError("DEF A=1", range(4, 5), "EXPECTED FUNCTION NAME")
+
+    def test_deftypes(self):
+        self.assertEqual(
+            statements("DEFINT A-C:DEFSNG S:DEFDBL D-E:DEFSTR Z"),
+            [
+                ("Defint", ("Unary", "A"), ("Unary", "C")),
+                ("Defsng", ("Unary", "S"), ("Unary", "S")),
+                ("Defdbl", ("Unary", "D"), ("Unary", "E")),
+                ("Defstr", ("Unary", "Z"), ("Unary", "Z")),
+            ],
+        )
+        self.assertSyntaxError("DEFINT Z-A", range(7, 10), "INVALID RANGE")
+
+    def test_line_ranges(self):
+        self.assertEqual(
+            statements("DELETE 10-20:DELETE -20:LIST 30-:LIST 40:LIST"),
+            [
+                ("Delete", ("Single", 10), ("Single", 20)),
+                ("Delete", ("Single", 0), ("Single", 20)),
+                ("List", ("Single", 30), ("Single", 65529)),
+                ("List", ("Single", 40), ("Single", 40)),
+                ("List", ("Single", 0), ("Single", 65529)),
+            ],
+        )
+        with self.assertRaises(Error) as cm:
+            Line(*lex("DELETE 20-10")).ast()
+        self.assertEqual(cm.exception.code, ErrorCode.UndefinedLine)
+
+    def test_arrays(self):
+        self.assertEqual(
+            statements("DIM A(10),B$(2,3):ERASE A,B$"),
+            [
+                (
+                    "Dim",
+                    [
+                        ("Array", "A", [("Integer", 10)]),
+                        ("Array", "B$", [("Integer", 2), ("Integer", 3)]),
+                    ],
+                ),
+                ("Erase", [("Unary", "A"), ("Unary", "B$")]),
+            ],
+        )
+
+    def test_loops(self):
+        self.assertEqual(
+            statements("FOR I=1 TO 9 STEP 2:FOR J=1 TO 3:NEXT:NEXT J,I"),
+            [
+                ("For", ("Unary", "I"), ("Integer", 1), ("Integer", 9), ("Integer", 2)),
+                ("For", ("Unary", "J"), ("Integer", 1), ("Integer", 3), ("Integer", 1)),
+                ("Next", []),
+                ("Next", [("Unary", "J"), ("Unary", "I")]),
+            ],
+        )
+        self.assertEqual(
+            statements("WHILE A:WEND"),
+            [("While", ("Variable", ("Unary", "A"))), ("Wend",)],
+        )
+        self.assertSyntaxError("FOR I=1 STEP 2", range(8, 12), "EXPECTED TO")
+
+    def test_jumps(self):
+        self.assertEqual(
+            statements("GOSUB 100:GOTO 200:ON X GOTO 10,20:ON X GOSUB 30"),
+            [
+                ("Gosub", ("Single", 100)),
+                ("Goto", ("Single", 200)),
+                (
+                    "OnGoto",
+                    ("Variable", ("Unary", "X")),
+                    [("Single", 10), ("Single", 20)],
+                ),
+                ("OnGosub", ("Variable", ("Unary", "X")), [("Single", 30)]),
+            ],
+        )
+        self.assertEqual(
+            statements("IF A THEN 10 ELSE 20"),
+            [
+                (
+                    "If",
+                    ("Variable", ("Unary", "A")),
+                    [("Goto", ("Single", 10))],
+                    [("Goto", ("Single", 20))],
+                )
+            ],
+        )
+        self.assertEqual(
+            statements("IF B GOTO 30"),
+            [("If", ("Variable", ("Unary", "B")), [("Goto", ("Single", 30))], [])],
+        )
+        self.assertSyntaxError("ON X PRINT", range(5, 10), "EXPECTED GOTO OR GOSUB")
+        self.assertSyntaxError("GOTO X", range(5, 6), "EXPECTED LINE NUMBER")
+
+    def test_input(self):
+        self.assertEqual(
+            statements('INPUT "N";N$:INPUT "N",A,B(1):INPUT;C'),
+            [
+                ("Input", ("Integer", 0), ("String", "N? "), [("Unary", "N$")]),
+                (
+                    "Input",
+                    ("Integer", 0),
+                    ("String", "N"),
+                    [("Unary", "A"), ("Array", "B", [("Integer", 1)])],
+                ),
+                ("Input", ("Integer", -1), ("String", "? "), [("Unary", "C")]),
+            ],
+        )
+        [statement] = Line(*lex("INPUT A")).ast()
+        self.assertEqual(statement.expr1.col, range(6, 6))
+
+    def test_assignments(self):
+        self.assertEqual(
+            statements('LET A=1:MID$(A$,2)="X":MID$(A$,2,3)="Y":SWAP A,B(1)'),
+            [
+                ("Let", ("Unary", "A"), ("Integer", 1)),
+                (
+                    "Mid",
+                    ("Unary", "A$"),
+                    ("Integer", 2),
+                    ("Integer", 32767),
+                    ("String", "X"),
+                ),
+                (
+                    "Mid",
+                    ("Unary", "A$"),
+                    ("Integer", 2),
+                    ("Integer", 3),
+                    ("String", "Y"),
+                ),
+                ("Swap", ("Unary", "A"), ("Array", "B", [("Integer", 1)])),
+            ],
+        )
+
+    def test_print_and_read(self):
+        self.assertEqual(
+            statements("PRINT 1,2;:PRINT:READ A,B$(1)"),
+            [
+                (
+                    "Print",
+                    [
+                        ("Integer", 1),
+                        ("Variable", ("Array", "TAB", [("Integer", -14)])),
+                        ("Integer", 2),
+                    ],
+                ),
+                ("Print", [("String", "\n")]),
+                ("Read", [("Unary", "A"), ("Array", "B$", [("Integer", 1)])]),
+            ],
+        )
+
+    def test_program_statements(self):
+        self.assertEqual(
+            statements('RENUM:RENUM 100,,20:RESTORE:RESTORE 30:RUN:RUN 40:RUN "P"'),
+            [
+                ("Renum", ("Single", 10), ("Single", 0), ("Single", 10)),
+                ("Renum", ("Single", 100), ("Single", 0), ("Single", 20)),
+                ("Restore", ("Single", 0)),
+                ("Restore", ("Single", 30)),
+                ("Run", ("Single", 0)),
+                ("Run", ("Single", 40)),
+                ("Run", ("String", "P")),
+            ],
+        )
+        self.assertEqual(
+            statements('LOAD "A":SAVE "B"'),
+            [("Load", ("String", "A")), ("Save", ("String", "B"))],
+        )
+
+    def test_shared_columns(self):
+        program, _ = parse_program(lex_program("10 A=1\n20 A=2"))
+        [(_, [let0]), (_, [let1])] = program
+        self.assertEqual(let0.col, range(0, 1))
+        self.assertIs(let0.col, let1.col)
+        self.assertIs(let0.expr.col, let1.expr.col)
+        # The table lives as long as the program, not the process
+        [let2] = Line(*lex("A=3")).ast()
+        self.assertEqual(let2.col, let0.col)
+        self.assertIsNot(let2.col, let0.col)
+
+    def test_literal_overflow(self):
+        line = Line(*lex("10 A%=&H10000"))
+        with self.assertRaises(Error) as cm:
+            line.ast()
+        self.assertEqual(cm.exception.code, ErrorCode.Overflow)
+        self.assertEqual(str(cm.exception), "?OVERFLOW IN 10:4")
+
+    def test_parse_program_recovers(self):
+        source = "10 A=*:B=2:PRINT C\n20 IF A THEN X=:Y=1 ELSE Z=)\n30 GOTO 10\n"
+        program, errors = parse_program(lex_program(source))
+        self.assertEqual([number for number, _ in program], [10, 20, 30])
+        match program:
+            case [
+                (10, [Statement.Let(), Statement.Print()]),
+                (20, [Statement.If(_, _, [Statement.Let()], [])]),
+                (30, [Statement.Goto()]),
+            ]:
+                pass
+            case _:
+                self.fail(repr(program))
+        self.assertEqual(
+            [(e.code, e.line_number, e.column, e.message) for e in errors],
+            [
+                (ErrorCode.SyntaxError, 10, range(2, 3), "EXPECTED EXPRESSION"),
+                (ErrorCode.SyntaxError, 20, range(12, 13), "EXPECTED EXPRESSION"),
+                (ErrorCode.SyntaxError, 20, range(24, 25), "EXPECTED EXPRESSION"),
+            ],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
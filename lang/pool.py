@@ -0,0 +1,76 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+from lang.buffer import TokenBuffer
+from lang.crunch import crunch, uncrunch
+from lang.error import Error, ErrorCode
+from lang.flat import FlatProgram, dump, load
+from lang.lex import lex_program
+from lang.parse import parse_program
+
+
+def load_parallel(
+    source: str,
+    max_workers: int | None = None,
+    chunk_size: int = 1 << 16,
+    threshold: int = 1 << 18,
+) -> (TokenBuffer, list[tuple], list[Error]):
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if len(source) < threshold or max_workers < 2:
+        return load_serial(source)
+    buffer = TokenBuffer()
+    program = list()
+    errors = list()
+    with ProcessPoolExecutor(max_workers) as executor:
+        chunks = _chunks(source, chunk_size)
+        for data, flat, chunk_errors in executor.map(_load_chunk, chunks):
+            buffer.extend(uncrunch(data))
+            program.extend(load(flat).to_ast())
+            errors.extend(_error(*e) for e in chunk_errors)
+    return (buffer, program, errors)
+
+
+def load_serial(source: str) -> (TokenBuffer, list[tuple], list[Error]):
+    buffer = TokenBuffer()
+    lines = list(lex_program(source))
+    for line_number, tokens in lines:
+        buffer.append(line_number, tokens)
+    program, errors = parse_program(lines)
+    return (buffer, program, errors)
+
+
+def _load_chunk(source: str) -> (bytes, bytes, list[tuple]):
+    # Workers return crunched tokens, flattened statements and flat errors,
+    # all cheap to pickle
+    buffer, program, errors = load_serial(source)
+    return (
+        crunch(buffer),
+        dump(FlatProgram.build(program)),
+        [
+            (e.code, e.line_number, e.column.start, e.column.stop, e.message)
+            for e in errors
+        ],
+    )
+
+
+def _error(
+    code: int, line_number: int | None, start: int, stop: int, message: str
+) -> Error:
+    return (
+        Error(ErrorCode(code))
+        .add_line_number(line_number)
+        .add_column(range(start, stop))
+        .add_message(message)
+    )
+
+
+def _chunks(source: str, chunk_size: int) -> Iterator[str]:
+    start = 0
+    while start < len(source):
+        stop = source.find("\n", start + chunk_size)
+        if stop < 0:
+            yield source[start:]
+            return
+        yield source[start:stop]
+        start = stop + 1
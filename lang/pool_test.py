@@ -0,0 +1,37 @@
+import unittest
+from lang.flat import same
+from lang.pool import load_parallel, load_serial
+
+
+class TestPool(unittest.TestCase):
+    def test_parallel_matches_serial(self):
+        source = "".join(
+            f"{n} A{n % 7}=A{n % 5}+{n}:PRINT A$;\"X{n}\"\n"
+            + ("\r\n" if n % 3 else f"{n + 1} IF A THEN X=\n")
+            for n in range(10, 3000, 10)
+        )
+        serial, serial_program, serial_errors = load_serial(source)
+        parallel, parallel_program, parallel_errors = load_parallel(
+            source, max_workers=2, chunk_size=1000, threshold=0
+        )
+        self.assertEqual(len(parallel), len(serial))
+        for index in range(len(serial)):
+            self.assertEqual(parallel.line_number(index), serial.line_number(index))
+            self.assertEqual(list(parallel.tokens(index)), list(serial.tokens(index)))
+        self.assertEqual(len(parallel.pool), len(serial.pool))
+        self.assertEqual(len(parallel_program), len(serial))
+        self.assertTrue(same(parallel_program, serial_program))
+        self.assertGreater(len(serial_errors), 0)
+        self.assertEqual(
+            [str(e) for e in parallel_errors], [str(e) for e in serial_errors]
+        )
+
+    def test_serial_below_threshold(self):
+        buffer, program, errors = load_parallel("10 A=\n20 B=1\n", max_workers=2)
+        self.assertEqual(len(buffer), 2)
+        self.assertEqual([number for number, _ in program], [10, 20])
+        self.assertEqual([e.line_number for e in errors], [10])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+from array import array
+from typing import Iterable, Iterator
+from lang.error import Error, ErrorCode
+from lang.line import Line
+
+
+class Program:
+    # Lines live in a table indexed by line number. Two Fenwick trees over
+    # that table count stored lines and statements, so rank, select and
+    # statement offsets are all O(log n) and no edit ever shifts an array.
+    # Statements are counted lazily, editing a line never parses it.
+    size = Line.max_number + 1
+
+    def __init__(self, lines: Iterable[Line] = ()):
+        self.table = [None] * Program.size
+        self.line_tree = array("I", bytes(4 * (Program.size + 1)))
+        self.statement_tree = array("I", bytes(4 * (Program.size + 1)))
+        self.statement_counts = array("I", bytes(4 * Program.size))
+        self.uncounted = set()
+        self.count = 0
+        for line in lines:
+            self.insert(line)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, number: int) -> bool:
+        return 0 <= number < Program.size and self.table[number] is not None
+
+    def __getitem__(self, number: int) -> Line:
+        if number not in self:
+            raise Error(ErrorCode.UndefinedLine)
+        return self.table[number]
+
+    def __iter__(self) -> Iterator[Line]:
+        return self.range(0, Line.max_number)
+
+    def add(tree: array, number: int, delta: int):
+        i = number + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(tree: array, number: int) -> int:
+        # Sum over line numbers below number
+        total = 0
+        i = min(number, Program.size)
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def statement_count(line: Line) -> int:
+        # Lines that fail to parse are still stored, they hold no statements
+        try:
+            return len(line.ast())
+        except Error:
+            return 0
+
+    def insert(self, line: Line):
+        number = line.number
+        if number is None:
+            raise Error(ErrorCode.DirectStatementInFile)
+        if self.table[number] is None:
+            Program.add(self.line_tree, number, 1)
+            self.count += 1
+        else:
+            self.table[number].program = None
+        self.table[number] = line
+        line.program = self
+        self.stale(number)
+
+    def delete(self, number: int) -> Line:
+        line = self[number]
+        Program.add(self.line_tree, number, -1)
+        self.stale(number)
+        self.uncounted.discard(number)
+        self.table[number] = None
+        line.program = None
+        self.count -= 1
+        return line
+
+    def stale(self, number: int):
+        # Called when the tokens of a stored line change
+        Program.add(self.statement_tree, number, -self.statement_counts[number])
+        self.statement_counts[number] = 0
+        self.uncounted.add(number)
+
+    def recount(self, number: int):
+        # Counts the statements of uncounted lines below number
+        for i in [i for i in self.uncounted if i < number]:
+            count = Program.statement_count(self.table[i])
+            Program.add(self.statement_tree, i, count)
+            self.statement_counts[i] = count
+            self.uncounted.discard(i)
+
+    def delete_range(self, first: int, last: int) -> list[Line]:
+        return [self.delete(line.number) for line in list(self.range(first, last))]
+
+    def rank(self, number: int) -> int:
+        return Program.prefix(self.line_tree, number)
+
+    def select(self, rank: int) -> Line:
+        # Binary lifting down the Fenwick tree to the rank-th stored line
+        tree = self.line_tree
+        i = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step > 0:
+            if i + step < len(tree) and tree[i + step] <= rank:
+                i += step
+                rank -= tree[i]
+            step >>= 1
+        return self.table[i]
+
+    def range(self, first: int, last: int) -> Iterator[Line]:
+        first = max(int(first), 0)
+        last = min(int(last), Line.max_number)
+        rank = self.rank(first)
+        stop = self.rank(last + 1)
+        while rank < stop:
+            yield self.select(rank)
+            rank += 1
+
+    def next_line(self, number: int) -> Line | None:
+        rank = self.rank(number + 1)
+        return self.select(rank) if rank < self.count else None
+
+    def statement_index(self, number: int) -> int:
+        if number not in self:
+            raise Error(ErrorCode.UndefinedLine)
+        self.recount(number)
+        return Program.prefix(self.statement_tree, number)
+
+    def statement_total(self) -> int:
+        self.recount(Program.size)
+        return Program.prefix(self.statement_tree, Program.size)
@@ -0,0 +1,90 @@
+import unittest
+from lang.error import Error, ErrorCode
+from lang.lex import lex
+from lang.line import Line, load_lines
+from lang.program import Program
+
+source = """10 A=1:B=2
+20 PRINT A
+30 IF A THEN PRINT 1:PRINT 2 ELSE 10
+40 A=
+50 GOTO 10
+"""
+
+
+class TestProgram(unittest.TestCase):
+    def test_ordered(self):
+        lines = load_lines(source, tokens_only=True)
+        program = Program(reversed(lines))
+        self.assertEqual(len(program), 5)
+        self.assertEqual([line.number for line in program], [10, 20, 30, 40, 50])
+        self.assertIs(program[30], lines[2])
+        self.assertIn(20, program)
+        self.assertNotIn(25, program)
+        self.assertNotIn(70000, program)
+
+    def test_insert_replace_delete(self):
+        program = Program(load_lines(source, tokens_only=True))
+        program.insert(Line(*lex("25 END")))
+        program.insert(Line(*lex("20 PRINT B")))
+        self.assertEqual(str(program[20]), "20 PRINT B")
+        self.assertEqual(program.delete(10).number, 10)
+        self.assertEqual([line.number for line in program], [20, 25, 30, 40, 50])
+        with self.assertRaises(Error) as e:
+            program.delete(10)
+        self.assertEqual(e.exception.code, ErrorCode.UndefinedLine)
+        with self.assertRaises(Error) as e:
+            program.insert(Line(*lex("PRINT 1")))
+        self.assertEqual(e.exception.code, ErrorCode.DirectStatementInFile)
+
+    def test_range(self):
+        program = Program(load_lines(source, tokens_only=True))
+        self.assertEqual([line.number for line in program.range(15, 40)], [20, 30, 40])
+        self.assertEqual([line.number for line in program.range(30, 30)], [30])
+        self.assertEqual([line.number for line in program.range(31, 39)], [])
+        self.assertEqual(len(list(program.range(0.0, Line.max_number))), 5)
+        self.assertEqual(program.next_line(30).number, 40)
+        self.assertIsNone(program.next_line(50))
+        deleted = program.delete_range(20, 40)
+        self.assertEqual([line.number for line in deleted], [20, 30, 40])
+        self.assertEqual([line.number for line in program], [10, 50])
+
+    def test_statement_index(self):
+        program = Program(load_lines(source, tokens_only=True))
+        self.assertEqual(
+            [program.statement_index(n) for n in [10, 20, 30, 40, 50]],
+            [0, 2, 3, 4, 4],
+        )
+        self.assertEqual(program.statement_total(), 5)
+        program.insert(Line(*lex("15 A=3:B=4:C=5")))
+        program.delete(20)
+        self.assertEqual(program.statement_index(30), 5)
+        self.assertEqual(program.statement_total(), 7)
+        with self.assertRaises(Error):
+            program.statement_index(20)
+
+    def test_statements_counted_lazily(self):
+        lines = load_lines(source, tokens_only=True)
+        program = Program(lines)
+        program.insert(Line(*lex("60 END")))
+        self.assertFalse(any(line.is_parsed() for line in program))
+        self.assertEqual(program.statement_index(20), 2)
+        self.assertEqual([line.is_parsed() for line in program], [True] + [False] * 5)
+        lines[0].tokens = lex("10 A=1")[1]
+        self.assertEqual(program.statement_index(30), 2)
+        self.assertEqual(program.statement_total(), 5)
+        deleted = program.delete(60)
+        deleted.tokens = lex("60 A=1:B=2")[1]
+        self.assertEqual(program.statement_total(), 4)
+
+    def test_edges(self):
+        program = Program()
+        self.assertEqual(list(program), [])
+        program.insert(Line(*lex(f"{Line.max_number} END")))
+        program.insert(Line(*lex("0 END")))
+        self.assertEqual([line.number for line in program], [0, Line.max_number])
+        self.assertEqual(program.statement_index(Line.max_number), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+from enum import IntEnum, verify, UNIQUE
+from typing import Iterable
+from lang.arith import Type
+from lang.ast import Statement, Variable, Expression, Traverse
+from lang.builtins import Builtin
+from lang.error import Error
+from lang.fold import fold
+from lang.line import Line
+from lang.tokens import Ident
+
+
+@verify(UNIQUE)
+class Kind(IntEnum):
+    Scalar = 0
+    Array = 1
+    Function = 2
+
+
+class Symbols:
+    # Slots of each kind are dense and grouped by type in Type order, so a
+    # runtime can preallocate one flat run of storage per type. References
+    # are looked up by node, lines hold fresh copies with one node per site.
+    def __init__(self, lines: list):
+        self.lines = lines
+        self.scalars = list()
+        self.arrays = list()
+        self.functions = list()
+        self.params = set()
+        self.refs = dict()
+
+    def slot(self, var: Variable.Base) -> int:
+        return self.refs[id(var)][0]
+
+    def type(self, var: Variable.Base) -> Type:
+        return self.refs[id(var)][1]
+
+    def counts(self) -> dict[Kind, dict[Type, int]]:
+        counts = dict()
+        for kind, keys in zip(Kind, [self.scalars, self.arrays, self.functions]):
+            counts[kind] = {t: 0 for t in Type}
+            for _, t in keys:
+                counts[kind][t] += 1
+        return counts
+
+    def offsets(self, kind: Kind) -> dict[Type, int]:
+        offsets = dict()
+        start = 0
+        for t, count in self.counts()[kind].items():
+            offsets[t] = start
+            start += count
+        return offsets
+
+
+class Resolver:
+    # Types follow DEFxxx statements in program order, a reference is
+    # resolved once its whole statement is seen since DEF FN, ERASE and
+    # PRINT decide what their variables refer to.
+    suffixes = {
+        Ident.String: Type.String,
+        Ident.Integer: Type.Integer,
+        Ident.Single: Type.Single,
+        Ident.Double: Type.Double,
+    }
+    letters = [chr(c) for c in range(ord("A"), ord("Z") + 1)]
+    deftypes = {
+        Statement.Defint: Type.Integer,
+        Statement.Defsng: Type.Single,
+        Statement.Defdbl: Type.Double,
+        Statement.Defstr: Type.String,
+    }
+
+    def __init__(self):
+        self.letter_types = {letter: Type.Single for letter in Resolver.letters}
+        self.slots = (dict(), dict(), dict())
+        self.keys = (list(), list(), list())
+        self.refs = dict()
+        self.roles = dict()
+        self.pending = list()
+        self.defs = 0
+
+    def ident_type(self, ident: Ident.Base) -> Type:
+        t = Resolver.suffixes.get(type(ident))
+        return self.letter_types[ident.text[0]] if t is None else t
+
+    def key(self, ident: Ident.Base) -> tuple[str, Type]:
+        t = self.ident_type(ident)
+        name = ident.text if type(ident) is Ident.Plain else ident.text[:-1]
+        return (name, t)
+
+    def kind(var: Variable.Base) -> Kind | None:
+        match var:
+            case Variable.Unary(_, ident):
+                return None if ident.text == "RND" else Kind.Scalar
+            case Variable.Array(_, ident, _) if ident.is_user_function():
+                return Kind.Function
+            case Variable.Array(_, ident, _) if ident.text in Builtin.functions:
+                return None
+        return Kind.Array
+
+    def line(self, statements: list[Statement.Base]):
+        for statement in statements:
+            statement.accept(self)
+            self.flush()
+
+    def flush(self):
+        for var, key in self.pending:
+            kind, key = self.roles.get(id(var), (Resolver.kind(var), key))
+            if kind is None:
+                continue
+            slots = self.slots[kind]
+            slot = slots.get(key)
+            if slot is None:
+                slot = len(self.keys[kind])
+                self.keys[kind].append(key)
+                slots[key] = slot
+            self.refs[id(var)] = (kind, slot)
+        self.pending.clear()
+        self.roles.clear()
+
+    def visit_variable(self, var: Variable.Base):
+        self.pending.append((var, self.key(var.ident)))
+
+    def visit_expression(self, expr: Expression.Base):
+        pass
+
+    def visit_statement(self, statement: Statement.Base):
+        match statement:
+            case Statement.Def(_, var, list_var, expr):
+                # Parameters are private to each DEF, its body names them
+                self.roles[id(var)] = (Kind.Function, self.key(var.ident))
+                params = dict()
+                for i, param in enumerate(list_var):
+                    key = self.key(param.ident)
+                    params[key] = (Kind.Scalar, key + (self.defs, i))
+                    self.roles[id(param)] = params[key]
+                for node in Traverse.postorder([expr]):
+                    if type(node) is Variable.Unary:
+                        role = params.get(self.key(node.ident))
+                        if role is not None:
+                            self.roles[id(node)] = role
+                self.defs += 1
+            case Statement.Erase(_, list_var):
+                for var in list_var:
+                    self.roles[id(var)] = (Kind.Array, self.key(var.ident))
+            case Statement.Print(_, list_expr):
+                for expr in list_expr:
+                    match expr:
+                        case Expression.Variable(
+                            Variable.Array(_, Ident.Base(text)) as var
+                        ) if text in ("TAB", "SPC"):
+                            self.roles[id(var)] = (None, None)
+            case (
+                Statement.Defint(_, var0, var1)
+                | Statement.Defsng(_, var0, var1)
+                | Statement.Defdbl(_, var0, var1)
+                | Statement.Defstr(_, var0, var1)
+            ):
+                t = Resolver.deftypes[type(statement)]
+                for c in range(ord(var0.ident.text), ord(var1.ident.text) + 1):
+                    self.letter_types[chr(c)] = t
+                self.roles[id(var0)] = (None, None)
+                self.roles[id(var1)] = (None, None)
+
+    def symbols(self, lines: list) -> Symbols:
+        symbols = Symbols(lines)
+        tables = (symbols.scalars, symbols.arrays, symbols.functions)
+        moved = list()
+        for keys, table in zip(self.keys, tables):
+            order = sorted(range(len(keys)), key=lambda i: (keys[i][1], i))
+            slots = [0] * len(keys)
+            for slot, i in enumerate(order):
+                slots[i] = slot
+                table.append(keys[i][:2])
+                if len(keys[i]) > 2:
+                    symbols.params.add(slot)
+            moved.append(slots)
+        for ref, (kind, slot) in self.refs.items():
+            key = self.keys[kind][slot]
+            symbols.refs[ref] = (moved[kind][slot], key[1])
+        return symbols
+
+
+def resolve_program(lines: Iterable[Line]) -> Symbols:
+    resolver = Resolver()
+    program = list()
+    for line in lines:
+        try:
+            statements = fold(line.ast(), fresh=True)
+        except Error as e:
+            program.append((line.number, e))
+            continue
+        resolver.line(statements)
+        program.append((line.number, statements))
+    return resolver.symbols(program)
@@ -0,0 +1,125 @@
+import io
+import unittest
+from lang.arith import Type
+from lang.ast import Statement
+from lang.bytecode import compile_program
+from lang.cache import LineCache
+from lang.error import Error, ErrorCode
+from lang.hashcons import HashCons
+from lang.line import load_lines
+from lang.parse import parse
+from lang.resolve import Kind, resolve_program
+from lang.runtime import Runtime
+from lang.vm import VM
+
+
+def resolve(source: str):
+    return resolve_program(load_lines(source, tokens_only=True))
+
+
+class TestResolve(unittest.TestCase):
+    def test_slots(self):
+        symbols = resolve("10 A=1:B$=A$:A%=A\n20 A=A+B$")
+        self.assertEqual(
+            symbols.scalars,
+            [
+                ("A", Type.Integer),
+                ("A", Type.Single),
+                ("B", Type.String),
+                ("A", Type.String),
+            ],
+        )
+        [let0, let1, let2] = symbols.lines[0][1]
+        self.assertEqual(symbols.slot(let0.var), 1)
+        self.assertEqual(symbols.slot(let1.var), 2)
+        self.assertEqual(symbols.slot(let1.expr.var), 3)
+        self.assertEqual(symbols.slot(let2.var), 0)
+        self.assertEqual(symbols.type(let2.var), Type.Integer)
+        [let] = symbols.lines[1][1]
+        self.assertEqual(symbols.slot(let.var), 1)
+
+    def test_letter_types(self):
+        symbols = resolve("10 I=1:DEFINT I-K:I=2:J#=3\n20 DEFSTR S:S=K")
+        [before, _, after, double] = symbols.lines[0][1]
+        self.assertEqual(symbols.type(before.var), Type.Single)
+        self.assertEqual(symbols.type(after.var), Type.Integer)
+        self.assertNotEqual(symbols.slot(before.var), symbols.slot(after.var))
+        self.assertEqual(symbols.type(double.var), Type.Double)
+        [_, let] = symbols.lines[1][1]
+        self.assertEqual(symbols.type(let.var), Type.String)
+        self.assertEqual(symbols.type(let.expr.var), Type.Integer)
+
+    def test_kinds(self):
+        source = """10 DIM A(3):A=A(1)+LEN("X")+RND
+20 ERASE A:PRINT TAB(2);FNF(A)
+30 DEF FNF(A)=A+B
+"""
+        symbols = resolve(source)
+        self.assertEqual(
+            symbols.scalars,
+            [("A", Type.Single), ("A", Type.Single), ("B", Type.Single)],
+        )
+        self.assertEqual(symbols.arrays, [("A", Type.Single)])
+        self.assertEqual(symbols.functions, [("FNF", Type.Single)])
+        self.assertEqual(symbols.params, {1})
+        [erase, _] = symbols.lines[1][1]
+        self.assertEqual(symbols.slot(erase.list_var[0]), 0)
+        [define] = symbols.lines[2][1]
+        match define:
+            case Statement.Def(_, var, [param], body):
+                self.assertEqual(symbols.slot(var), 0)
+                self.assertEqual(symbols.slot(param), 1)
+                self.assertEqual(symbols.slot(body.expr0.var), 1)
+            case _:
+                self.fail(repr(define))
+
+    def test_counts(self):
+        symbols = resolve('10 A%=1:B=2:C$="":D%=4:DIM E#(2):DEF FNX$(N)=C$')
+        counts = symbols.counts()
+        self.assertEqual(
+            counts[Kind.Scalar],
+            {Type.Integer: 2, Type.Single: 2, Type.Double: 0, Type.String: 1},
+        )
+        self.assertEqual(counts[Kind.Array][Type.Double], 1)
+        self.assertEqual(counts[Kind.Function][Type.String], 1)
+        self.assertEqual(
+            symbols.offsets(Kind.Scalar),
+            {Type.Integer: 0, Type.Single: 2, Type.Double: 4, Type.String: 4},
+        )
+        for slot, (_, t) in enumerate(symbols.scalars):
+            start = symbols.offsets(Kind.Scalar)[t]
+            self.assertTrue(start <= slot < start + counts[Kind.Scalar][t])
+
+    def test_shared_nodes(self):
+        # Identical lines may share nodes, DEFINT still splits their slots
+        source = "10 A=1.5:PRINT A\n20 DEFINT A\n30 A=1.5:PRINT A"
+        cache = LineCache()
+        cached = load_lines(source, tokens_only=True, cache=cache)
+        for line, text in zip(cached, source.split("\n")):
+            line.statements = list(cache.parse(text)[1])
+        self.assertIs(cached[0].ast()[0], cached[2].ast()[0])
+        hashcons = HashCons()
+        consed = load_lines(source, tokens_only=True)
+        for line in consed:
+            line.statements = parse(line.number, line.tokens, hashcons=hashcons)
+        for lines in [cached, consed]:
+            symbols = resolve_program(lines)
+            [let10, _] = symbols.lines[0][1]
+            [let30, _] = symbols.lines[2][1]
+            self.assertEqual(symbols.type(let10.var), Type.Single)
+            self.assertEqual(symbols.type(let30.var), Type.Integer)
+            output = io.StringIO()
+            VM(compile_program(lines), Runtime(output)).run()
+            self.assertEqual(output.getvalue(), " 1.5 \n 2 \n")
+
+    def test_errors(self):
+        symbols = resolve("10 A=\n20 A=1")
+        number, error = symbols.lines[0]
+        self.assertEqual(number, 10)
+        self.assertIsInstance(error, Error)
+        self.assertEqual(error.code, ErrorCode.SyntaxError)
+        self.assertEqual(symbols.scalars, [("A", Type.Single)])
+
+
+if __name__ == "__main__":
+    unittest.main()
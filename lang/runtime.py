@@ -0,0 +1,153 @@
+import random
+import sys
+from typing import TextIO
+from lang.arith import Arith, Type
+from lang.error import Error, ErrorCode
+from lang.tokens import Literal
+
+
+class Runtime:
+    # State shared by every execution backend: the console and RND
+    zone_width = 14
+    number_chars = set("0123456789.+-ED!#%")
+
+    def __init__(self, output: TextIO = sys.stdout, input: TextIO = sys.stdin):
+        self.output = output
+        self.input = input
+        self.column = 0
+        self.random = random.Random(0)
+        self.last_random = self.random.random()
+
+    # Output
+
+    def write(self, text: str):
+        self.output.write(text)
+        newline = text.rfind("\n")
+        if newline < 0:
+            self.column += len(text)
+        else:
+            self.column = len(text) - newline - 1
+
+    def print_number(self, t: Type, value: int | float):
+        self.write(Runtime.format_number(t, value) + " ")
+
+    def tab(self, n: int):
+        n = Arith.integer(n)
+        if n == -Runtime.zone_width:
+            self.write(" " * (Runtime.zone_width - self.column % Runtime.zone_width))
+            return
+        if n < 1 or n > 255:
+            raise Error(ErrorCode.IllegalFunctionCall)
+        if n - 1 < self.column:
+            self.write("\n")
+        self.write(" " * (n - 1 - self.column))
+
+    def spc(self, n: int):
+        n = Arith.integer(n)
+        if n < 0 or n > 255:
+            raise Error(ErrorCode.IllegalFunctionCall)
+        self.write(" " * n)
+
+    def format_number(t: Type, value: int | float) -> str:
+        if type(value) is int:
+            text = str(value)
+        else:
+            text = Runtime.format_float(value, 16 if t == Type.Double else 7, t)
+        return text if text[0] == "-" else " " + text
+
+    def format_float(value: float, digits: int, t: Type) -> str:
+        magnitude = abs(value)
+        if value == int(value) and magnitude < 10**digits:
+            return str(int(value))
+        if magnitude >= 10**digits or magnitude < 0.01:
+            mantissa, exponent = f"{value:.{digits - 1}e}".split("e")
+            if "." in mantissa:
+                mantissa = mantissa.rstrip("0").rstrip(".")
+            letter = "D" if t == Type.Double else "E"
+            sign = exponent[0]
+            return f"{mantissa}{letter}{sign}{abs(int(exponent)):02}"
+        text = f"{value:.{digits}g}"
+        if "." in text:
+            text = text.rstrip("0").rstrip(".")
+        return text.replace("0.", ".", 1) if magnitude < 1 else text
+
+    # Input
+
+    def read_values(self, prompt: str, types: list[Type]) -> list:
+        while True:
+            self.write(prompt)
+            text = self.input.readline()
+            if text == "":
+                raise Error(ErrorCode.Break)
+            self.column = 0
+            values = Runtime.parse_input(text.rstrip("\r\n"), types)
+            if values is not None:
+                return values
+            self.write("?Redo from start\n")
+
+    def parse_input(text: str, types: list[Type]) -> list | None:
+        fields = Runtime.split_fields(text)
+        if len(fields) != len(types):
+            return None
+        values = list()
+        for field, t in zip(fields, types):
+            if t == Type.String:
+                values.append(field)
+                continue
+            number = Runtime.parse_number(field.strip())
+            if number is None:
+                return None
+            try:
+                values.append(Arith.convert(t, number))
+            except Error:
+                return None
+        return values
+
+    def split_fields(text: str) -> list[str]:
+        fields = list()
+        field = str()
+        quoted = False
+        for c in text:
+            if c == '"':
+                quoted = not quoted
+            elif c == "," and not quoted:
+                fields.append(field.strip())
+                field = str()
+            else:
+                field += c
+        fields.append(field if quoted else field.strip())
+        return fields
+
+    def parse_number(text: str) -> int | float | None:
+        upper = text.upper()
+        try:
+            if upper.startswith("&H"):
+                return Literal.parse_radix(upper[2:], 16)
+            if upper.startswith("&O"):
+                return Literal.parse_radix(upper[2:], 8)
+            if upper.startswith("&"):
+                return Literal.parse_radix(upper[1:], 8)
+        except ValueError:
+            return None
+        if upper == "" or not set(upper) <= Runtime.number_chars:
+            return None
+        return Literal.parse_float(upper)
+
+    def leading_number(text: str) -> float:
+        # VAL reads the longest numeric prefix, ignoring blanks
+        text = text.replace(" ", "")
+        for stop in range(len(text), 0, -1):
+            number = Runtime.parse_number(text[:stop])
+            if number is not None:
+                return float(number)
+        return 0.0
+
+    # Random numbers
+
+    def rnd(self, x: int | float = 1) -> float:
+        if x < 0:
+            self.random.seed(x)
+            self.last_random = self.random.random()
+        elif x > 0:
+            self.last_random = self.random.random()
+        return Arith.single(self.last_random)
@@ -1,5 +1,7 @@
 from enum import Enum, auto
 from collections import deque
+import math
+import struct
 
 
 class Word(Enum):
@@ -72,10 +74,15 @@ class Operator(Enum):
 
 class Literal:
     class Base:
+        __slots__ = ("text", "value")
         __match_args__ = ("text", None)
 
         def __init__(self, text: str):
             self.text = text
+            self.value = self.decode()
+
+        def decode(self):
+            return self.text
 
         def __eq__(self, other):
             if not isinstance(other, type(self)):
@@ -86,18 +93,57 @@ class Literal:
             return self.text
 
     class Single(Base):
+        __slots__ = ()
+
+        def decode(self) -> float | None:
+            f64 = Literal.parse_float(self.text)
+            if f64 is None:
+                return None
+            try:
+                f32 = struct.unpack("f", struct.pack("f", f64))[0]
+            except OverflowError:
+                return None
+            if f32 in (float("inf"), float("-inf")):
+                return None
+            return f32
+
         def __repr__(self):
             return f"Literal.Single({repr(self.text)})"
 
     class Double(Base):
+        __slots__ = ()
+
+        def decode(self) -> float | None:
+            return Literal.parse_float(self.text)
+
         def __repr__(self):
             return f"Literal.Double({repr(self.text)})"
 
     class Integer(Base):
+        __slots__ = ()
+
+        def decode(self) -> int | None:
+            if self.text.isdigit():
+                i16 = int(self.text)
+            else:
+                f64 = Literal.parse_float(self.text)
+                if f64 is None:
+                    return None
+                # Same rule as CINT, halves round away from zero
+                i16 = int(math.copysign(math.floor(abs(f64) + 0.5), f64))
+            if i16 < -32768 or i16 > 32767:
+                return None
+            return i16
+
         def __repr__(self):
             return f"Literal.Integer({repr(self.text)})"
 
     class Hex(Base):
+        __slots__ = ()
+
+        def decode(self) -> int | None:
+            return Literal.parse_radix(self.text, 16)
+
         def __repr__(self):
             return f"Literal.Hex({repr(self.text)})"
 
@@ -105,6 +151,11 @@ class Literal:
             return f"&H{self.text}"
 
     class Octal(Base):
+        __slots__ = ()
+
+        def decode(self) -> int | None:
+            return Literal.parse_radix(self.text, 8)
+
         def __repr__(self):
             return f"Literal.Octal({repr(self.text)})"
 
@@ -112,15 +163,42 @@ class Literal:
             return f"&{self.text}"
 
     class String(Base):
+        __slots__ = ()
+
         def __repr__(self):
             return f"Literal.String({repr(self.text)})"
 
         def __str__(self):
             return f'"{self.text}"'
 
+    def parse_float(s: str) -> float | None:
+        if s[-1] in ["!", "#", "%"]:
+            s = s[:-1]
+        try:
+            f64 = float(s.replace("D", "E"))
+        except ValueError:
+            return None
+        if f64 in (float("inf"), float("-inf")):
+            return None
+        return f64
+
+    def parse_radix(s: str, radix: int) -> int | None:
+        # Radix literals are 16-bit two's complement
+        if s == "":
+            return None
+        i = int(s, radix)
+        if i > 0xFFFF:
+            return None
+        if i > 0x7FFF:
+            i -= 0x10000
+        return i
+
 
 class Ident:
     class Base:
+        __slots__ = ("text",)
+        __match_args__ = ("text", None)
+
         def __init__(self, text: str):
             self.text = text
 
@@ -139,34 +217,49 @@ class Ident:
             return self.text[0:2] == "FN"
 
     class Plain(Base):
+        __slots__ = ()
+
         def __repr__(self):
             return f"Ident.Plain({repr(self.text)})"
 
     class String(Base):
+        __slots__ = ()
+
         def __repr__(self):
             return f"Ident.String({repr(self.text)})"
 
     class Single(Base):
+        __slots__ = ()
+
         def __repr__(self):
             return f"Ident.Single({repr(self.text)})"
 
     class Double(Base):
+        __slots__ = ()
+
         def __repr__(self):
             return f"Ident.Double({repr(self.text)})"
 
     class Integer(Base):
+        __slots__ = ()
+
         def __repr__(self):
             return f"Ident.Integer({repr(self.text)})"
 
 
 class Token:
     class Base:
+        __slots__ = ("width",)
+
         def is_word(self):
             return False
 
     class Unknown(Base):
+        __slots__ = ("text",)
+
         def __init__(self, text: str):
             self.text = text
+            self.width = len(text)
 
         def __eq__(self, other):
             if not isinstance(other, type(self)):
@@ -180,12 +273,28 @@ class Token:
             return self.text
 
     class Whitespace(Base):
+        __slots__ = ("length",)
         __match_args__ = ("length", None)
-
-        def __init__(self, length: int):
-            self.length = length
+        interned = dict()
+
+        def __new__(cls, length: int):
+            try:
+                return cls.interned[length]
+            except KeyError:
+                pass
+            token = super().__new__(cls)
+            token.length = length
+            token.width = length
+            if length <= 16:
+                cls.interned[length] = token
+            return token
+
+        def __reduce__(self):
+            return (Token.Whitespace, (self.length,))
 
         def __eq__(self, other):
+            if self is other:
+                return True
             if not isinstance(other, type(self)):
                 return False
             return self.length == other.length
@@ -197,10 +306,12 @@ class Token:
             return self.length * " "
 
     class Literal(Base):
+        __slots__ = ("literal",)
         __match_args__ = ("literal", None)
 
         def __init__(self, literal: Literal):
             self.literal = literal
+            self.width = len(str(literal))
 
         def __eq__(self, other):
             if not isinstance(other, type(self)):
@@ -217,10 +328,12 @@ class Token:
             return True
 
     class Ident(Base):
+        __slots__ = ("id",)
         __match_args__ = ("id", None)
 
         def __init__(self, ident: Ident):
             self.id = ident
+            self.width = len(ident.text)
 
         def __eq__(self, other):
             if not isinstance(other, type(self)):
@@ -237,15 +350,22 @@ class Token:
             return True
 
     class Word(Base):
+        __slots__ = ("word",)
         __match_args__ = ("word", None)
+        interned = dict()
 
-        def __init__(self, word: Word):
-            self.word = word
+        def __new__(cls, word: Word):
+            try:
+                return cls.interned[word]
+            except KeyError:
+                pass
+            token = super().__new__(cls)
+            token.word = word
+            token.width = len(str(token))
+            return cls.interned.setdefault(word, token)
 
-        def __eq__(self, other):
-            if not isinstance(other, type(self)):
-                return False
-            return self.word == other.word
+        def __reduce__(self):
+            return (Token.Word, (self.word,))
 
         def __repr__(self):
             return f"Token.Word({self.word})"
@@ -343,15 +463,22 @@ class Token:
             return True
 
     class Operator(Base):
+        __slots__ = ("operator",)
         __match_args__ = ("operator", None)
+        interned = dict()
 
-        def __init__(self, operator: Operator):
-            self.operator = operator
+        def __new__(cls, operator: Operator):
+            try:
+                return cls.interned[operator]
+            except KeyError:
+                pass
+            token = super().__new__(cls)
+            token.operator = operator
+            token.width = len(str(token))
+            return cls.interned.setdefault(operator, token)
 
-        def __eq__(self, other):
-            if not isinstance(other, type(self)):
-                return False
-            return self.operator == other.operator
+        def __reduce__(self):
+            return (Token.Operator, (self.operator,))
 
         def __repr__(self):
             return f"Token.Operator({self.operator})"
@@ -409,8 +536,17 @@ class Token:
             )
 
     class LParen(Base):
-        def __eq__(self, other):
-            return isinstance(other, type(self))
+        __slots__ = ()
+        interned = None
+
+        def __new__(cls):
+            if cls.interned is None:
+                cls.interned = super().__new__(cls)
+                cls.interned.width = 1
+            return cls.interned
+
+        def __reduce__(self):
+            return (Token.LParen, ())
 
         def __repr__(self):
             return f"Token.LParen()"
@@ -419,8 +555,17 @@ class Token:
             return "("
 
     class RParen(Base):
-        def __eq__(self, other):
-            return isinstance(other, type(self))
+        __slots__ = ()
+        interned = None
+
+        def __new__(cls):
+            if cls.interned is None:
+                cls.interned = super().__new__(cls)
+                cls.interned.width = 1
+            return cls.interned
+
+        def __reduce__(self):
+            return (Token.RParen, ())
 
         def __repr__(self):
             return f"Token.RParen()"
@@ -429,8 +574,17 @@ class Token:
             return ")"
 
     class Comma(Base):
-        def __eq__(self, other):
-            return isinstance(other, type(self))
+        __slots__ = ()
+        interned = None
+
+        def __new__(cls):
+            if cls.interned is None:
+                cls.interned = super().__new__(cls)
+                cls.interned.width = 1
+            return cls.interned
+
+        def __reduce__(self):
+            return (Token.Comma, ())
 
         def __repr__(self):
             return f"Token.Comma()"
@@ -439,8 +593,17 @@ class Token:
             return ","
 
     class Colon(Base):
-        def __eq__(self, other):
-            return isinstance(other, type(self))
+        __slots__ = ()
+        interned = None
+
+        def __new__(cls):
+            if cls.interned is None:
+                cls.interned = super().__new__(cls)
+                cls.interned.width = 1
+            return cls.interned
+
+        def __reduce__(self):
+            return (Token.Colon, ())
 
         def __repr__(self):
             return f"Token.Colon()"
@@ -449,8 +612,17 @@ class Token:
             return ":"
 
     class Semicolon(Base):
-        def __eq__(self, other):
-            return isinstance(other, type(self))
+        __slots__ = ()
+        interned = None
+
+        def __new__(cls):
+            if cls.interned is None:
+                cls.interned = super().__new__(cls)
+                cls.interned.width = 1
+            return cls.interned
+
+        def __reduce__(self):
+            return (Token.Semicolon, ())
 
         def __repr__(self):
             return f"Token.Semicolon()"
@@ -513,8 +685,25 @@ class TokenScan:
         ("TO", Token.Word(Word.To)),
     ]
 
+    def build_index(words: list[tuple[str, Token]]) -> dict:
+        # Words by their first two letters, keeping their rank in the table
+        index = dict()
+        for rank, (word, token) in enumerate(words):
+            index.setdefault(word[:2], list()).append((rank, word, token))
+        return index
+
+    index = build_index(words)
+
     def alphabetic(v: deque[Token], s: str) -> str:
-        for word, token in TokenScan.words:
+        # Each word in table order is split out at its first occurrence.
+        # Words whose first two letters are not in the run cannot occur in
+        # it, so only the others are tried.
+        index = TokenScan.index
+        candidates = list()
+        for pair in {s[i : i + 2] for i in range(len(s) - 1)}:
+            candidates += index.get(pair, ())
+        candidates.sort()
+        for _, word, token in candidates:
             idx = s.find(word)
             if idx == 0:
                 v.append(token)
@@ -526,11 +715,11 @@ class TokenScan:
         return s
 
     minutia = {
-        "(": Token.LParen,
-        ")": Token.RParen,
-        ",": Token.Comma,
-        ":": Token.Colon,
-        ";": Token.Semicolon,
+        "(": Token.LParen(),
+        ")": Token.RParen(),
+        ",": Token.Comma(),
+        ":": Token.Colon(),
+        ";": Token.Semicolon(),
         "?": Token.Word(Word.Print),
         "'": Token.Word(Word.Rem2),
         "^": Token.Operator(Operator.Caret),
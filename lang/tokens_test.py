@@ -1,4 +1,5 @@
-from lang.tokens import Token, Word, Operator, Ident, Literal
+from lang.tokens import Token, Word, Operator, Ident, Literal, TokenScan
+import pickle
 import unittest  # The test framework
 
 
@@ -13,6 +14,54 @@ class Test_TestToken(unittest.TestCase):
         self.assertEqual(f"{Token.Ident(Ident.Single("V1"))}", f"{Token.Ident(Ident.Single("V1"))}")
         self.assertEqual(f"{Token.Literal(Literal.Hex("1A3F"))}", f"{Token.Literal(Literal.Hex("1A3F"))}")
 
+    def test_interned(self):
+        self.assertIs(Token.Word(Word.Print), Token.Word(Word.Print))
+        self.assertIs(Token.Operator(Operator.And), Token.Operator(Operator.And))
+        self.assertIs(Token.Colon(), Token.Colon())
+        self.assertIs(Token.Whitespace(1), Token.Whitespace(1))
+        self.assertEqual(Token.Whitespace(99), Token.Whitespace(99))
+        self.assertIs(pickle.loads(pickle.dumps(Token.Comma())), Token.Comma())
+        self.assertIs(
+            pickle.loads(pickle.dumps(Token.Word(Word.Goto))), Token.Word(Word.Goto)
+        )
+        with self.assertRaises(AttributeError):
+            Token.Literal(Literal.Integer("1")).col = 0
+
+    def test_literal_values(self):
+        self.assertEqual(Literal.Integer("123").value, 123)
+        self.assertEqual(Literal.Integer("1.6%").value, 2)
+        self.assertEqual(Literal.Integer("2.5%").value, 3)
+        self.assertEqual(Literal.Integer("0.5%").value, 1)
+        self.assertEqual(Literal.Integer("40000%").value, None)
+        self.assertEqual(Literal.Single("1.5E3").value, 1500.0)
+        self.assertEqual(Literal.Single("0.1").value, 0.10000000149011612)
+        self.assertEqual(Literal.Single("1E39").value, None)
+        self.assertEqual(Literal.Double("1D2").value, 100.0)
+        self.assertEqual(Literal.Double("0.1#").value, 0.1)
+        self.assertEqual(Literal.Hex("FFFF").value, -1)
+        self.assertEqual(Literal.Hex("10000").value, None)
+        self.assertEqual(Literal.Octal("17").value, 15)
+        self.assertEqual(Literal.String("A").value, "A")
+
+    def test_alphabetic_crunching(self):
+        v = list()
+        # Words are split out in table order, THEN before IF
+        self.assertEqual(TokenScan.alphabetic(v, "IFXTHENY"), "Y")
+        self.assertEqual(v, [Token.Ident(Ident.Plain("IFX")), Token.Word(Word.Then)])
+        v = list()
+        self.assertEqual(TokenScan.alphabetic(v, "PRINTXPRINT"), "XPRINT")
+        self.assertEqual(v, [Token.Word(Word.Print)])
+        v = list()
+        self.assertEqual(TokenScan.alphabetic(v, "DEFINTAXOR"), "")
+        self.assertEqual(
+            v,
+            [
+                Token.Word(Word.Defint),
+                Token.Ident(Ident.Plain("A")),
+                Token.Operator(Operator.Xor),
+            ],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
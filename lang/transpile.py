@@ -0,0 +1,1083 @@
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import CodeType
+from typing import Callable, Iterable
+from lang.arith import Arith, Type
+from lang.ast import Statement, Variable, Expression
+from lang.builtins import Builtin
+from lang.bytecode import Code, Compiler
+from lang.error import Error, ErrorCode
+from lang.line import Line
+from lang.resolve import Symbols, resolve_program
+from lang.runtime import Runtime
+from lang.tokens import Ident, Operator
+
+
+class Target:
+    # A jump destination, either a BASIC line resolved once every line is
+    # translated or a statement index known while translating
+    __slots__ = ("line_number", "index")
+
+    def __init__(self, line_number: int | None = None, index: int | None = None):
+        self.line_number = line_number
+        self.index = index
+
+
+class Item:
+    # One flattened statement. Lines are (indent, text, position), text is
+    # either source or a callable rendering [(indent, source)] once every
+    # target is resolved. Loop items also carry their native form.
+    __slots__ = ("lines", "targets", "transfers", "opens", "closes", "native")
+
+    def __init__(self, lines: list, targets: list[Target], transfers: bool):
+        self.lines = lines
+        self.targets = targets
+        self.transfers = transfers
+        self.opens = None
+        self.closes = None
+        self.native = None
+
+
+class Transpiler:
+    # Flattened statements are grouped into basic blocks dispatched from a
+    # single loop, "if block <= n" tests fall through from one block into
+    # the next. FOR and WHILE loops nobody jumps into or out of become
+    # native while loops. Scalars are Python locals named after their slot.
+    filename = "<basic>"
+    chunk = 16
+    comparisons = {
+        Operator.Equal: "==",
+        Operator.NotEqual: "!=",
+        Operator.Less: "<",
+        Operator.LessEqual: "<=",
+        Operator.Greater: ">",
+        Operator.GreaterEqual: ">=",
+    }
+    arithmetic = {Operator.Plus: "+", Operator.Minus: "-", Operator.Multiply: "*"}
+    narrowers = ["integer", "single", "double", "string"]
+    types = ["Type.Integer", "Type.Single", "Type.Double", "Type.String"]
+
+    def __init__(self):
+        self.line_number = None
+        self.col = range(0)
+        self.symbols = None
+        self.items = list()
+        self.line_starts = dict()
+        self.targets = list()
+        self.open_fors = list()
+        self.open_whiles = list()
+        self.resume = None
+        self.data = list()
+        self.data_lines = list()
+        self.builtins = list()
+        self.ops = dict()
+        self.defs = 0
+        self.exprs = list()
+        self.vars = list()
+        self.unwidened = dict()
+        self.native_loops = set()
+
+    # Symbols
+
+    def scalar(self, var: Variable.Unary) -> str:
+        return f"v{self.symbols.slot(var)}"
+
+    def function(self, var: Variable.Base) -> str:
+        return f"f{self.symbols.slot(var)}"
+
+    def op(self, source: str) -> str:
+        name = self.ops.get(source)
+        if name is None:
+            name = f"o{len(self.ops)}"
+            self.ops[source] = name
+        return name
+
+    # Emission
+
+    def add(self, lines: list, targets: list = [], transfers: bool = False) -> Item:
+        position = (self.line_number, self.col)
+        lines = [(indent, text, position) for indent, text in lines]
+        item = Item(lines, list(targets), transfers)
+        self.items.append(item)
+        return item
+
+    def here(self) -> int:
+        return len(self.items)
+
+    def add_error(self, error: Error):
+        col = error.column if error.column != range(0) else self.col
+        source = f"raise Error(ErrorCode.{error.code.name})"
+        if error.message:
+            source += f".add_message({error.message!r})"
+        self.items.append(Item([(0, source, (self.line_number, col))], [], False))
+
+    def target(self, expr: Expression.Base) -> Target:
+        target = Target(line_number=int(expr.f32))
+        self.targets.append(target)
+        return target
+
+    def jump(self, target: Target) -> Callable:
+        def render() -> list:
+            if target.index is None:
+                return [(0, "raise Error(ErrorCode.UndefinedLine)")]
+            return [(0, f"block = {target.index}"), (0, "continue")]
+
+        return render
+
+    # Program
+
+    def program(self, symbols: Symbols):
+        self.symbols = symbols
+        for number, statements in symbols.lines:
+            self.line_number = number
+            self.line_starts[number] = self.here()
+            self.col = range(0)
+            if isinstance(statements, Error):
+                self.add_error(statements)
+                continue
+            self.statements(statements)
+        self.line_number = None
+        self.col = range(0)
+        self.add([(0, "return")])
+        for target in self.targets:
+            target.index = self.line_starts.get(target.line_number)
+
+    def statements(self, statements: list[Statement.Base]):
+        for statement in statements:
+            self.col = statement.col
+            self.exprs.clear()
+            self.vars.clear()
+            try:
+                self.visit_statement(statement)
+            except Error as e:
+                self.add_error(e)
+
+    # Statements are visited explicitly in program order, their operands
+    # through accept() in post-order
+
+    def visit_statement(self, statement: Statement.Base):
+        match statement:
+            case Statement.Let(_, var, expr):
+                value = self.expression_as(expr, self.symbols.type(var))
+                self.add(self.store(var, value))
+            case Statement.Print(_, list_expr):
+                self.add(self.print(list_expr))
+            case Statement.If(_, expr, then_statements, else_statements):
+                self.if_(self.condition(expr), then_statements, else_statements)
+            case Statement.For(_, var, start, stop, step):
+                self.for_(var, start, stop, step)
+            case Statement.Next(_, list_var):
+                self.next(list_var)
+            case Statement.While(_, expr):
+                self.while_(self.condition(expr))
+            case Statement.Wend():
+                if not self.open_whiles:
+                    raise Error(ErrorCode.WendWithoutWhile)
+                index, top = self.open_whiles.pop()
+                item = self.add([(0, self.jump(top))], [top], True)
+                item.closes = index
+                item.native = []
+                self.items[index].native[1].index = self.here()
+            case Statement.Goto(_, expr):
+                target = self.target(expr)
+                self.add([(0, self.jump(target))], [target], True)
+            case Statement.Gosub(_, expr):
+                target = self.target(expr)
+                resume = self.resume or Target(index=self.here() + 1)
+                lines = [(0, self.resumable(resume)), (0, self.jump(target))]
+                self.add(lines, [target, resume], True)
+            case Statement.Return():
+                lines = [(0, "block = return_()"), (0, "continue")]
+                self.add(lines, [], True)
+            case Statement.OnGoto(_, expr, list_expr) | Statement.OnGosub(
+                _, expr, list_expr
+            ):
+                self.on(statement, expr, list_expr)
+            case Statement.Def(_, var, list_var, expr):
+                self.def_(var, list_var, expr)
+            case Statement.Dim(_, list_var):
+                for var in list_var:
+                    match var:
+                        case Variable.Array(col, _, list_expr):
+                            bounds = [self.numeric(expr) for expr in list_expr]
+                            slot = self.symbols.slot(var)
+                            args = ", ".join([str(slot)] + bounds)
+                            self.col = col
+                            self.add([(0, f"dim({args})")])
+            case Statement.Erase(_, list_var):
+                for var in list_var:
+                    self.col = var.col
+                    self.add([(0, f"erase({self.symbols.slot(var)})")])
+            case Statement.Data(_, list_expr):
+                self.data_lines.append((self.line_number, len(self.data)))
+                for expr in list_expr:
+                    _, value = Compiler.literal(expr)
+                    self.data.append(value)
+            case Statement.Read(_, list_var):
+                for var in list_var:
+                    t = self.symbols.type(var)
+                    self.col = var.col
+                    self.add(self.store(var, f"read({Transpiler.types[t]})"))
+            case Statement.Restore(_, expr):
+                self.add([(0, self.restore(int(expr.f32)))])
+            case Statement.Input(_, _, prompt, list_var):
+                _, text = Compiler.literal(prompt)
+                types = [Transpiler.types[self.symbols.type(v)] for v in list_var]
+                lines = [(0, f"values = read_values({text!r}, [{', '.join(types)}])")]
+                for i, var in enumerate(list_var):
+                    lines.extend(self.store(var, f"values[{i}]"))
+                self.add(lines)
+            case Statement.Swap(_, var0, var1):
+                t, value0 = self.variable(var0)
+                if self.symbols.type(var1) != t:
+                    raise Error(ErrorCode.TypeMismatch)
+                _, value1 = self.variable(var1)
+                lines = [(0, f"swap = {value0}")]
+                lines.extend(self.store(var0, value1))
+                lines.extend(self.store(var1, "swap"))
+                self.add(lines)
+            case Statement.Mid(_, var, start, length, expr):
+                if self.symbols.type(var) != Type.String:
+                    raise Error(ErrorCode.TypeMismatch).add_column(var.col)
+                _, value = self.variable(var)
+                args = [value, self.numeric(start), self.numeric(length)]
+                args.append(self.expression_as(expr, Type.String))
+                self.add(self.store(var, f"mid_assign({', '.join(args)})"))
+            case (
+                Statement.Defint(_, var0, var1)
+                | Statement.Defsng(_, var0, var1)
+                | Statement.Defdbl(_, var0, var1)
+                | Statement.Defstr(_, var0, var1)
+            ):
+                # Types are fixed at compile time, in program order
+                pass
+            case Statement.Clear():
+                self.add([(0, self.clear)])
+            case Statement.Run(_, Expression.Single(_, f32) as expr):
+                target = Target(index=0) if f32 == 0 else self.target(expr)
+                lines = [(0, self.clear), (0, "restart()"), (0, self.jump(target))]
+                self.add(lines, [target], True)
+            case Statement.End():
+                self.add([(0, "return")])
+            case Statement.Stop():
+                self.add([(0, "raise Error(ErrorCode.Break)")])
+            case Statement.Cls() | Statement.Tron() | Statement.Troff():
+                pass
+            case _:
+                raise Error(ErrorCode.IllegalFunctionCall).add_message(
+                    "NOT SUPPORTED IN PROGRAMS"
+                )
+
+    def restore(self, number: int) -> Callable:
+        def render() -> list:
+            starts = [i for n, i in self.data_lines if n >= number]
+            pointer = starts[0] if starts else len(self.data)
+            return [(0, f"machine.data_pointer = {pointer}")]
+
+        return render
+
+    def resumable(self, resume: Target) -> Callable:
+        # GOSUBs closing an IF branch resume after the IF, which is only
+        # placed once both branches are translated
+        def render() -> list:
+            return [(0, f"gosubs.append({resume.index})")]
+
+        return render
+
+    def print(self, list_expr: list[Expression.Base]) -> list:
+        lines = list()
+        for expr in list_expr:
+            match expr:
+                case Expression.Variable(
+                    Variable.Array(_, Ident.Base(text), [arg])
+                ) if text in ("TAB", "SPC"):
+                    lines.append((0, f"{text.lower()}({self.numeric(arg)})"))
+                case _:
+                    t, value = self.expression(expr)
+                    if t == Type.String:
+                        lines.append((0, f"write({value})"))
+                    else:
+                        t = Transpiler.types[t]
+                        lines.append((0, f"print_number({t}, {value})"))
+        return lines or [(0, "pass")]
+
+    def if_(self, condition: str, then_statements: list, else_statements: list):
+        if Transpiler.structured(then_statements, True) and Transpiler.structured(
+            else_statements, True
+        ):
+            position = (self.line_number, self.col)
+            resume = self.resume or Target(index=self.here() + 1)
+            item = Item([(0, f"if {condition}:", position)], [], False)
+            self.branch(item, then_statements, resume)
+            if else_statements:
+                item.lines.append((0, "else:", position))
+                self.branch(item, else_statements, resume)
+            self.items.append(item)
+            return
+        # Branches holding loops or GOSUBs with a return point inside the
+        # branch are flattened into conditional jumps
+        otherwise = Target()
+        lines = [(0, f"if not ({condition}):"), (1, self.jump(otherwise))]
+        self.add(lines, [otherwise], True)
+        self.statements(then_statements)
+        if else_statements:
+            end = Target()
+            self.add([(0, self.jump(end))], [end], True)
+            otherwise.index = self.here()
+            self.statements(else_statements)
+            end.index = self.here()
+        else:
+            otherwise.index = self.here()
+
+    def structured(statements: list[Statement.Base], last: bool) -> bool:
+        for i, statement in enumerate(statements):
+            is_last = last and i == len(statements) - 1
+            match statement:
+                case (
+                    Statement.For()
+                    | Statement.Next()
+                    | Statement.While()
+                    | Statement.Wend()
+                ):
+                    return False
+                case Statement.Gosub() | Statement.OnGosub() if not is_last:
+                    return False
+                case Statement.If(_, _, then_statements, else_statements):
+                    if not (
+                        Transpiler.structured(then_statements, is_last)
+                        and Transpiler.structured(else_statements, is_last)
+                    ):
+                        return False
+        return True
+
+    def branch(self, item: Item, statements: list[Statement.Base], resume: Target):
+        # Appends the nested statements to the IF item, one level deeper
+        items, self.items = self.items, list()
+        outer, self.resume = self.resume, resume
+        col = self.col
+        try:
+            self.statements(statements)
+            nested = self.items
+        finally:
+            self.items, self.resume, self.col = items, outer, col
+        if not nested:
+            item.lines.append((1, "pass", item.lines[0][2]))
+        for statement in nested:
+            item.lines.extend((i + 1, text, p) for i, text, p in statement.lines)
+            item.targets.extend(statement.targets)
+            item.transfers = item.transfers or statement.transfers
+
+    def on(self, statement: Statement.Base, expr, list_expr: list):
+        selector = self.numeric(expr)
+        targets = [self.target(line_expr) for line_expr in list_expr]
+        # Selectors out of range fall through with block set to -1
+        lines = [(0, self.table(selector, targets)), (0, "if block >= 0:")]
+        if type(statement) is Statement.OnGosub:
+            resume = self.resume or Target(index=self.here() + 1)
+            lines.append((1, self.resumable(resume)))
+            targets = targets + [resume]
+        lines.append((1, "continue"))
+        self.add(lines, targets, True)
+
+    def table(self, selector: str, targets: list[Target]) -> Callable:
+        def render() -> list:
+            table = ", ".join(str(-1 if t.index is None else t.index) for t in targets)
+            return [(0, f"block = on({selector}, ({table},))")]
+
+        return render
+
+    def def_(self, var: Variable.Unary, list_var: list[Variable.Unary], expr):
+        function = self.function(var)
+        params = list()
+        converts = list()
+        for param in list_var:
+            t = self.symbols.type(param)
+            name = self.scalar(param)
+            params.append(name)
+            converts.append((1, f"{name} = convert({Transpiler.types[t]}, {name})"))
+        body = self.expression_as(expr, self.symbols.type(var))
+        name = f"d{self.defs}"
+        self.defs += 1
+        lines = [(0, f"def {name}(*args):")]
+        if params:
+            lines.append((1, f"{', '.join(params)}, = args"))
+        lines += converts
+        lines += [(1, f"return {body}"), (0, f"{function} = {name}")]
+        item = self.add(lines)
+        # The arity check has no position, its error is the caller's
+        check = [
+            (1, f"if len(args) != {len(params)}:", None),
+            (2, "raise Error(ErrorCode.SyntaxError)", None),
+        ]
+        item.lines[1:1] = check
+
+    # Loops
+
+    def for_(self, var: Variable.Unary, start, stop, step):
+        t = self.symbols.type(var)
+        if t == Type.String:
+            raise Error(ErrorCode.TypeMismatch).add_column(var.col)
+        name = self.scalar(var)
+        start = self.expression_as(start, t)
+        stop = self.expression_as(stop, t)
+        step_value = self.constant(step)
+        step = self.expression_as(step, t)
+        index = self.here()
+        skip = Target()
+
+        def render() -> list:
+            if skip.index is None:
+                exit = [(1, "raise Error(ErrorCode.ForWithoutNext)")]
+            else:
+                exit = [(1, f"block = {skip.index}"), (1, "continue")]
+            call = f"for_({name[1:]}, {name}, {stop}, {step}, {index + 1})"
+            return [(0, f"if not {call}:")] + exit
+
+        item = self.add([(0, f"{name} = {start}"), (0, render)], [skip], True)
+        limit, increment = f"l{index}", f"s{index}"
+        if step_value is None:
+            header = [(0, f"{increment} = {step}")]
+            test = f"{name} <= {limit} if {increment} >= 0 else {name} >= {limit}"
+        else:
+            header = list()
+            increment = step
+            test = f"{name} {'<=' if step_value >= 0 else '>='} {limit}"
+        item.opens = (name, t)
+        # A frame for the variable may be live, from a FOR that led here
+        # through GOSUB, entering the loop ends it as Machine.for_ does
+        unwind = [(0, f"if fors: unwind({name[1:]})")]
+        item.native = (
+            [(0, f"{name} = {start}"), (0, f"{limit} = {stop}")] + header + unwind,
+            skip,
+            f"while {test}:",
+            f"{name} = {Transpiler.narrowers[t]}({name} + {increment})",
+        )
+        self.open_fors.append((name, index))
+
+    def next(self, list_var: list[Variable.Unary]):
+        if not list_var:
+            item = self.add([(0, self.next_any)], [], True)
+            if self.open_fors:
+                _, index = self.open_fors.pop()
+                self.close_for(item, index)
+            return
+        for var in list_var:
+            name = self.scalar(var)
+            t = self.symbols.type(var)
+            narrow = Transpiler.narrowers[t]
+            self.col = var.col
+            lines = [
+                (0, f"slot, limit, step, body = next_({name[1:]})"),
+                (0, f"{name} = {narrow}({name} + step)"),
+                (0, f"if {name} <= limit if step >= 0 else {name} >= limit:"),
+                (1, "block = body"),
+                (1, "continue"),
+                (0, "fors.pop()"),
+            ]
+            item = self.add(lines, [], True)
+            while self.open_fors:
+                open_name, index = self.open_fors.pop()
+                if open_name == name:
+                    self.close_for(item, index)
+                    break
+
+    def close_for(self, item: Item, index: int):
+        opener = self.items[index]
+        opener.native[1].index = self.here()
+        item.closes = index
+
+    def next_any(self) -> list:
+        # NEXT without a variable increments whichever loop is innermost
+        lines = [(0, "slot, limit, step, body = next_(-1)")]
+        keyword = "if"
+        for i in self.dispatched_fors():
+            name, t = self.items[i].opens
+            narrow = Transpiler.narrowers[t]
+            lines.append((0, f"{keyword} slot == {name[1:]}:"))
+            lines.append((1, f"{name} = value = {narrow}({name} + step)"))
+            keyword = "elif"
+        lines += [
+            (0, "if value <= limit if step >= 0 else value >= limit:"),
+            (1, "block = body"),
+            (1, "continue"),
+            (0, "fors.pop()"),
+        ]
+        return lines
+
+    def while_(self, condition: str):
+        index = self.here()
+        exit = Target()
+
+        def render() -> list:
+            if exit.index is None:
+                return [(1, "raise Error(ErrorCode.WhileWithoutWend)")]
+            return [(1, f"block = {exit.index}"), (1, "continue")]
+
+        item = self.add([(0, f"if not ({condition}):"), (0, render)], [exit], True)
+        item.opens = ("while", None)
+        item.native = ([], exit, f"while {condition}:", None)
+        self.open_whiles.append((index, Target(index=index)))
+
+    # Variables
+
+    def store(self, var: Variable.Base, value: str) -> list:
+        match var:
+            case Variable.Unary():
+                return [(0, f"{self.scalar(var)} = {value}")]
+            case Variable.Array(_, _, list_expr):
+                subscripts = [self.numeric(expr) for expr in list_expr]
+                args = ", ".join([str(self.symbols.slot(var)), value] + subscripts)
+                return [(0, f"put({args})")]
+
+    def variable(self, var: Variable.Base) -> tuple[Type, str]:
+        var.accept(self)
+        return self.vars.pop()
+
+    def visit_variable(self, var: Variable.Base):
+        match var:
+            case Variable.Unary(col, ident):
+                if ident.text == "RND":
+                    self.vars.append(self.call(col, ident.text, []))
+                else:
+                    self.vars.append((self.symbols.type(var), self.scalar(var)))
+                return
+        args = self.exprs[len(self.exprs) - len(var.list_expr) :]
+        del self.exprs[len(self.exprs) - len(var.list_expr) :]
+        match var:
+            case Variable.Array(col, ident, _) if ident.is_user_function():
+                sources = ", ".join(source for _, source, _ in args)
+                source = f"{self.function(var)}({sources})"
+                self.vars.append((self.symbols.type(var), source))
+            case Variable.Array(col, ident, _) if ident.text in Builtin.functions:
+                self.vars.append(self.call(col, ident.text, args))
+            case Variable.Array(col, ident, _):
+                for t, _, _ in args:
+                    if t == Type.String:
+                        raise Error(ErrorCode.TypeMismatch)
+                sources = [source for _, source, _ in args]
+                slot = str(self.symbols.slot(var))
+                source = f"get({', '.join([slot] + sources)})"
+                self.vars.append((self.symbols.type(var), source))
+
+    def call(self, col: range, name: str, args: list) -> tuple[Type, str]:
+        types = [t for t, _, _ in args]
+        try:
+            t = Builtin.result_type(name, types)
+        except Error as e:
+            raise e.add_column(col)
+        self.builtins.append((name, types))
+        sources = ", ".join(source for _, source, _ in args)
+        return (t, f"b{len(self.builtins) - 1}({sources})")
+
+    # Expressions
+
+    def expression(self, expr: Expression.Base) -> tuple[Type, str]:
+        expr.accept(self)
+        t, source, _ = self.exprs.pop()
+        return (t, source)
+
+    def numeric(self, expr: Expression.Base) -> str:
+        t, source = self.expression(expr)
+        if t == Type.String:
+            raise Error(ErrorCode.TypeMismatch)
+        return source
+
+    def condition(self, expr: Expression.Base) -> str:
+        expr.accept(self)
+        t, source, condition = self.exprs.pop()
+        if t == Type.String:
+            raise Error(ErrorCode.TypeMismatch)
+        return source if condition is None else condition
+
+    def constant(self, expr: Expression.Base) -> int | float | None:
+        match expr:
+            case Expression.Integer(_, value) | Expression.Single(_, value):
+                return value
+            case Expression.Double(_, value):
+                return value
+        return None
+
+    def expression_as(self, expr: Expression.Base, t: Type) -> str:
+        source_type, source = self.expression(expr)
+        if (source_type == Type.String) != (t == Type.String):
+            raise Error(ErrorCode.TypeMismatch)
+        if type(expr) in Transpiler.literals:
+            # Literals are converted once, while translating
+            _, value = Compiler.literal(expr)
+            return repr(Arith.convert(t, value))
+        if t == Type.Integer:
+            # Integer operators may have widened, literals and loads never do
+            if source_type == Type.Integer and type(expr) in Transpiler.exact:
+                return source
+            # Widening only to narrow back to an integer again is skipped
+            source = self.unwidened.get(source, source)
+        elif source_type == t or t == Type.String:
+            return source
+        elif source_type == Type.Single and t == Type.Double:
+            return source
+        return f"{Transpiler.narrowers[t]}({source})"
+
+    exact = (Expression.Integer, Expression.Variable)
+    literals = (
+        Expression.Integer,
+        Expression.Single,
+        Expression.Double,
+        Expression.String,
+    )
+
+    def visit_expression(self, expr: Expression.Base):
+        # Entries are (type, source, condition source or None)
+        match expr:
+            case (
+                Expression.Integer(_, _)
+                | Expression.Single(_, _)
+                | Expression.Double(_, _)
+                | Expression.String(_, _)
+            ):
+                t, value = Compiler.literal(expr)
+                self.exprs.append((t, repr(value), None))
+            case Expression.Variable(_):
+                t, source = self.vars.pop()
+                self.exprs.append((t, source, None))
+            case Expression._ColExprExpr(col, _, _):
+                t1, rhs, c1 = self.exprs.pop()
+                t0, lhs, c0 = self.exprs.pop()
+                op = Compiler.binary_ops[type(expr)]
+                try:
+                    t, _ = Arith.specialize_binary(op, t0, t1)
+                except Error as e:
+                    raise e.add_column(col)
+                self.exprs.append(self.binary(op, t0, t1, t, lhs, rhs, c0, c1))
+            case Expression._ColExpr(col, _):
+                t0, operand, c0 = self.exprs.pop()
+                op = Compiler.unary_ops[type(expr)]
+                try:
+                    t, _ = Arith.specialize_unary(op, t0)
+                except Error as e:
+                    raise e.add_column(col)
+                if op == Operator.Minus and t == Type.Integer:
+                    self.exprs.append((t, f"widen(-{operand})", None))
+                elif op == Operator.Minus:
+                    self.exprs.append((t, f"(-{operand})", None))
+                else:
+                    condition = None if c0 is None else f"(not {c0})"
+                    self.exprs.append((t, f"(~integer({operand}))", condition))
+
+    def binary(self, op, t0, t1, t, lhs: str, rhs: str, c0, c1) -> tuple:
+        comparison = Transpiler.comparisons.get(op)
+        if comparison is not None:
+            condition = f"({lhs} {comparison} {rhs})"
+            return (t, f"(-1 if {lhs} {comparison} {rhs} else 0)", condition)
+        symbol = Transpiler.arithmetic.get(op)
+        if symbol is not None and t0 == t1 == Type.Integer:
+            source = f"(r if -32768 <= (r := {lhs} {symbol} {rhs}) <= 32767"
+            source = f"{source} else single(r))"
+            self.unwidened[source] = f"{lhs} {symbol} {rhs}"
+            return (t, source, None)
+        if symbol is not None:
+            return (t, f"{Transpiler.narrowers[t]}({lhs} {symbol} {rhs})", None)
+        # AND and OR of conditions stay boolean, both sides are evaluated
+        condition = None
+        if op in (Operator.And, Operator.Or) and c0 is not None and c1 is not None:
+            condition = f"({c0} {'&' if op == Operator.And else '|'} {c1})"
+        args = f"Operator.{op.name}, {Transpiler.types[t0]}, {Transpiler.types[t1]}"
+        fn = self.op(f"Arith.specialize_binary({args})[1]")
+        return (t, f"{fn}({lhs}, {rhs})", condition)
+
+    # Rendering
+
+    def clear(self) -> list:
+        names = {t: list() for t in Type}
+        for slot, (_, t) in enumerate(self.symbols.scalars):
+            if slot not in self.symbols.params:
+                names[t].append(f"v{slot}")
+        statements = [
+            f"{' = '.join(names[t])} = {Code.defaults[t]!r}" for t in Type if names[t]
+        ]
+        functions = [f"f{i}" for i in range(len(self.symbols.functions))]
+        if functions:
+            statements.append(f"{' = '.join(functions)} = undefined_function")
+        statements.append("machine.clear()")
+        return [(0, "; ".join(statements))]
+
+    def render(self) -> tuple[str, list]:
+        natives = self.natives()
+        leaders = {0}
+        for i, item in enumerate(self.items):
+            if i in natives or item.closes in natives:
+                continue
+            leaders.update(t.index for t in item.targets if t.index is not None)
+        for i, item in enumerate(self.items):
+            if item.opens is not None and i not in natives:
+                leaders.add(i if item.opens[0] == "while" else i + 1)
+                if item.native[1].index is not None:
+                    leaders.add(item.native[1].index)
+        leaders = sorted(leader for leader in leaders if leader < len(self.items))
+        body = list()
+        chunks = [
+            leaders[i : i + Transpiler.chunk]
+            for i in range(0, len(leaders), Transpiler.chunk)
+        ]
+        for chunk in chunks:
+            indent = 2
+            if len(chunks) > 1:
+                stop = chunk[-1]
+                body.append((2, f"if block <= {stop}:", None))
+                indent = 3
+            for leader in chunk:
+                i = leaders.index(leader)
+                stop = leaders[i + 1] if i + 1 < len(leaders) else len(self.items)
+                body.append((indent, f"if block <= {leader}:", None))
+                self.emit(leader, stop, indent + 1, natives, body)
+        source = self.preamble() + body + [(2, "return", None)]
+        lines = list()
+        positions = list()
+        for indent, text, position in source:
+            lines.append("    " * indent + text)
+            line_number, col = (None, range(0)) if position is None else position
+            positions.append((line_number, col.start, col.stop))
+        return ("\n".join(lines) + "\n", positions)
+
+    def emit(self, start: int, stop: int, indent: int, natives: set, body: list):
+        i = start
+        while i < stop:
+            item = self.items[i]
+            if i in natives:
+                header, skip, test, step = item.native
+                position = item.lines[0][2]
+                for offset, text in header:
+                    body.append((indent + offset, text, position))
+                body.append((indent, test, position))
+                closer = skip.index - 1
+                before = len(body)
+                self.emit(i + 1, closer, indent + 1, natives, body)
+                if step is not None:
+                    position = self.items[closer].lines[0][2]
+                    body.append((indent + 1, step, position))
+                elif len(body) == before:
+                    body.append((indent + 1, "pass", position))
+                i = skip.index
+                continue
+            for offset, text, position in item.lines:
+                if callable(text):
+                    for extra, line in text():
+                        body.append((indent + offset + extra, line, position))
+                else:
+                    body.append((indent + offset, text, position))
+            i += 1
+
+    def natives(self) -> set[int]:
+        # Innermost loops first, a loop is native when nothing jumps into
+        # its body and its body only transfers control inside native loops
+        entries = set()
+        for item in self.items:
+            entries.update(t.index for t in item.targets if t.index is not None)
+        loops = [
+            (item.native[1].index - 1, i)
+            for i, item in enumerate(self.items)
+            if item.opens is not None and item.native[1].index is not None
+        ]
+        natives = set()
+        inside = set()
+        for closer, opener in sorted(loops, key=lambda loop: loop[0] - loop[1]):
+            if self.items[closer].closes != opener:
+                continue
+            if self.reopens(opener, loops):
+                continue
+            body = range(opener + 1, closer + 1)
+            if any(i in entries for i in body):
+                continue
+            if any(
+                self.items[i].transfers and i not in inside
+                for i in range(opener + 1, closer)
+            ):
+                continue
+            natives.add(opener)
+            inside.update(range(opener, closer + 1))
+        self.native_loops = natives
+        return natives
+
+    def reopens(self, opener: int, loops: list[tuple[int, int]]) -> bool:
+        # FOR on the variable of an enclosing loop ends that loop at run time
+        name = self.items[opener].opens[0]
+        if name == "while":
+            return False
+        return any(
+            self.items[i].opens[0] == name and i < opener <= closer
+            for closer, i in loops
+        )
+
+    def dispatched_fors(self) -> list[int]:
+        return [
+            i
+            for i, item in enumerate(self.items)
+            if item.opens is not None
+            and item.opens[0] != "while"
+            and i not in self.native_loops
+        ]
+
+    def preamble(self) -> list:
+        types = ", ".join(Transpiler.types[t] for _, t in self.symbols.arrays)
+        lines = [
+            f"data = {self.data!r}",
+            f"array_types = [{types}]",
+            "",
+            "",
+            "def program(machine):",
+        ]
+        for name, value in Transpiler.locals.items():
+            lines.append(f"    {name} = {value}")
+        for i, (name, types) in enumerate(self.builtins):
+            types = ", ".join(Transpiler.types[t] for t in types)
+            lines.append(f"    b{i} = Builtin.bind({name!r}, [{types}], runtime)")
+        for source, name in self.ops.items():
+            lines.append(f"    {name} = {source}")
+        lines.append("    " + self.clear()[0][1])
+        lines += ["    block = 0", "    while True:"]
+        return [(0, line, None) for line in lines]
+
+    # Helpers bound to locals of the generated function
+    locals = {
+        "runtime": "machine.runtime",
+        "integer": "Arith.integer",
+        "single": "Arith.single",
+        "double": "Arith.double",
+        "string": "Arith.string",
+        "widen": "Arith.widen",
+        "convert": "Arith.convert",
+        "write": "runtime.write",
+        "print_number": "runtime.print_number",
+        "tab": "runtime.tab",
+        "spc": "runtime.spc",
+        "read_values": "runtime.read_values",
+        "get": "machine.get",
+        "put": "machine.put",
+        "dim": "machine.dim",
+        "erase": "machine.erase",
+        "read": "machine.read",
+        "restart": "machine.restart",
+        "on": "machine.on",
+        "for_": "machine.for_",
+        "next_": "machine.next_",
+        "unwind": "machine.unwind",
+        "return_": "machine.return_",
+        "gosubs": "machine.gosubs",
+        "fors": "machine.fors",
+        "mid_assign": "Builtin.mid_assign",
+        "undefined_function": "Machine.undefined_function",
+    }
+
+    def translate(self, lines: Iterable[Line]) -> tuple[str, list]:
+        self.program(resolve_program(lines))
+        return self.render()
+
+
+class Module:
+    # A translated program, code objects are cached per Python version
+    version = 4
+
+    def __init__(self, code: CodeType, positions: list[tuple]):
+        self.code = code
+        self.positions = positions
+
+    def key(lines: list[Line]) -> str:
+        text = "\n".join(str(line) for line in lines)
+        header = f"{Module.version} {sys.implementation.cache_tag}\n"
+        return hashlib.sha256((header + text).encode()).hexdigest()
+
+    def build(lines: list[Line]) -> "Module":
+        source, positions = Transpiler().translate(lines)
+        return Module(compile(source, Transpiler.filename, "exec"), positions)
+
+    def load(lines: Iterable[Line], cache_dir: Path | None = None) -> "Module":
+        lines = list(lines)
+        if cache_dir is None:
+            return Module.build(lines)
+        path = Path(cache_dir) / f"{Module.key(lines)}.marshal"
+        try:
+            return Module(*marshal.loads(path.read_bytes()))
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+        module = Module.build(lines)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed so readers never see a partial file
+        fd, temp = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as f:
+            f.write(marshal.dumps((module.code, module.positions)))
+        os.replace(temp, path)
+        return module
+
+
+class Machine:
+    # State shared by the generated code, scalars live in its locals
+    def __init__(self, module: Module, runtime: Runtime):
+        namespace = {
+            "Arith": Arith,
+            "Builtin": Builtin,
+            "Error": Error,
+            "ErrorCode": ErrorCode,
+            "Machine": Machine,
+            "Operator": Operator,
+            "Type": Type,
+        }
+        exec(module.code, namespace)
+        self.program = namespace["program"]
+        self.data = namespace["data"]
+        self.array_types = namespace["array_types"]
+        self.positions = module.positions
+        self.runtime = runtime
+        self.arrays = [None] * len(self.array_types)
+        self.gosubs = list()
+        self.fors = list()
+        self.data_pointer = 0
+
+    def run(self):
+        try:
+            self.program(self)
+        except Error as e:
+            raise self.locate(e, e.__traceback__)
+        except RecursionError as e:
+            # DEF FN calling itself
+            error = Error(ErrorCode.OutOfMemory)
+            raise self.locate(error, e.__traceback__) from None
+
+    def locate(self, error: Error, tb) -> Error:
+        line = None
+        while tb is not None:
+            if tb.tb_frame.f_code.co_filename == Transpiler.filename:
+                if self.positions[tb.tb_lineno - 1][0] is not None:
+                    line = tb.tb_lineno
+            tb = tb.tb_next
+        if line is None:
+            return error
+        line_number, start, stop = self.positions[line - 1]
+        if error.line_number is None:
+            error.add_line_number(line_number)
+        if error.column == range(0):
+            error.add_column(range(start, stop))
+        return error
+
+    def clear(self):
+        self.arrays[:] = [None] * len(self.array_types)
+        self.data_pointer = 0
+
+    def restart(self):
+        self.gosubs.clear()
+        self.fors.clear()
+
+    def undefined_function(*args):
+        raise Error(ErrorCode.UndefinedUserFunction)
+
+    # Arrays
+
+    def element(self, slot: int, subscripts: tuple) -> tuple[list, int]:
+        array = self.arrays[slot]
+        if array is None:
+            array = self.dimension(slot, [10] * len(subscripts))
+        bounds, values = array
+        if len(bounds) != len(subscripts):
+            raise Error(ErrorCode.SubscriptOutOfRange)
+        index = 0
+        for subscript, bound in zip(subscripts, bounds):
+            if type(subscript) is not int:
+                subscript = Arith.integer(subscript)
+            if subscript < 0 or subscript > bound:
+                raise Error(ErrorCode.SubscriptOutOfRange)
+            index = index * (bound + 1) + subscript
+        return (values, index)
+
+    def dimension(self, slot: int, bounds: list[int]) -> tuple:
+        size = 1
+        for bound in bounds:
+            size *= bound + 1
+        default = Code.defaults[self.array_types[slot]]
+        array = (tuple(bounds), [default] * size)
+        self.arrays[slot] = array
+        return array
+
+    def get(self, slot: int, *subscripts):
+        values, index = self.element(slot, subscripts)
+        return values[index]
+
+    def put(self, slot: int, value, *subscripts):
+        values, index = self.element(slot, subscripts)
+        values[index] = value
+
+    def dim(self, slot: int, *bounds):
+        bounds = [Arith.integer(bound) for bound in bounds]
+        if self.arrays[slot] is not None:
+            raise Error(ErrorCode.RedimensionedArray)
+        if any(bound < 0 for bound in bounds):
+            raise Error(ErrorCode.IllegalFunctionCall)
+        self.dimension(slot, bounds)
+
+    def erase(self, slot: int):
+        if self.arrays[slot] is None:
+            raise Error(ErrorCode.IllegalFunctionCall)
+        self.arrays[slot] = None
+
+    # Control
+
+    def on(self, n: int | float, table: tuple[int, ...]) -> int:
+        n = Arith.integer(n)
+        if n < 0 or n > 255:
+            raise Error(ErrorCode.IllegalFunctionCall)
+        if n == 0 or n > len(table):
+            return -1
+        if table[n - 1] < 0:
+            raise Error(ErrorCode.UndefinedLine)
+        return table[n - 1]
+
+    def return_(self) -> int:
+        if not self.gosubs:
+            raise Error(ErrorCode.ReturnWithoutGosub)
+        return self.gosubs.pop()
+
+    def unwind(self, slot: int):
+        fors = self.fors
+        for i, frame in enumerate(fors):
+            if frame[0] == slot:
+                del fors[i:]
+                break
+
+    def for_(self, slot: int, value, limit, step, body: int) -> bool:
+        self.unwind(slot)
+        fors = self.fors
+        if value > limit if step >= 0 else value < limit:
+            return False
+        fors.append((slot, limit, step, body))
+        return True
+
+    def next_(self, slot: int) -> tuple:
+        fors = self.fors
+        if slot >= 0:
+            while fors and fors[-1][0] != slot:
+                fors.pop()
+        if not fors:
+            raise Error(ErrorCode.NextWithoutFor)
+        return fors[-1]
+
+    def read(self, t: Type):
+        if self.data_pointer >= len(self.data):
+            raise Error(ErrorCode.OutOfData)
+        value = self.data[self.data_pointer]
+        self.data_pointer += 1
+        return Arith.datum(t, value)
+
+
+def translate(lines: Iterable[Line]) -> str:
+    source, _ = Transpiler().translate(lines)
+    return source
+
+
+def run(
+    lines: Iterable[Line], runtime: Runtime | None = None, cache_dir: Path | None = None
+) -> Machine:
+    module = Module.load(lines, cache_dir)
+    machine = Machine(module, Runtime() if runtime is None else runtime)
+    machine.run()
+    return machine
@@ -0,0 +1,167 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from lang.bytecode import compile_program
+from lang.error import Error, ErrorCode
+from lang.line import load_lines
+from lang.runtime import Runtime
+from lang.transpile import Machine, Module, translate
+from lang.vm import VM
+
+
+def execute(source: str, input: str = "") -> str:
+    output = io.StringIO()
+    runtime = Runtime(output, io.StringIO(input))
+    Machine(Module.load(load_lines(source, tokens_only=True)), runtime).run()
+    return output.getvalue()
+
+
+def execute_vm(source: str, input: str = "") -> str:
+    output = io.StringIO()
+    runtime = Runtime(output, io.StringIO(input))
+    VM(compile_program(load_lines(source, tokens_only=True)), runtime).run()
+    return output.getvalue()
+
+
+class TestTranspile(unittest.TestCase):
+    def assertSame(self, source: str, input: str = ""):
+        # Same output as the VM, errors are reported on the same line
+        try:
+            expected = execute_vm(source, input)
+        except Error as e:
+            with self.assertRaises(Error) as error:
+                execute(source, input)
+            self.assertEqual(error.exception.code, e.code, source)
+            self.assertEqual(error.exception.line_number, e.line_number, source)
+        else:
+            self.assertEqual(execute(source, input), expected, source)
+
+    def test_expressions(self):
+        self.assertEqual(execute("10 A%=200:PRINT A%*A%;A%+A%"), " 40000  400 \n")
+        self.assertSame("10 PRINT 1/3;2/3#;32767+1;-32768-1;1E20;0.001")
+        self.assertSame('10 A%=2.5:B=A%/4:C#=1/3#:D$="X"+"Y":PRINT A%;B;C#;D$')
+        self.assertSame("10 A%=7:PRINT A% MOD 3;A%\\2;A% AND 3;NOT A%;-A%;2^10")
+        self.assertSame('10 PRINT "A"<"B";1=1#;2>=3;"X"+"Y"="XY"')
+        self.assertSame('10 PRINT "A","B";:PRINT "C":PRINT TAB(4);"X";SPC(2);"Y"')
+
+    def test_control_flow(self):
+        self.assertSame(
+            """10 FOR I=1 TO 3:FOR J=I TO 2
+20 PRINT I*10+J;
+30 NEXT J,I:PRINT
+40 I=0:WHILE I<3:I=I+1:GOSUB 100:WEND
+50 ON I-1 GOTO 60,70
+60 PRINT "SIXTY"
+70 IF I=3 THEN PRINT "DONE" ELSE PRINT "NOT"
+80 END
+100 PRINT I;:RETURN
+"""
+        )
+        self.assertSame("10 FOR I=5 TO 1:PRINT I:NEXT I:PRINT I")
+        self.assertSame("10 FOR I=1 TO 2:FOR J=1 TO 2:PRINT I;J:NEXT:NEXT")
+        self.assertSame("10 FOR I=1 TO 3:IF I=2 THEN NEXT ELSE PRINT I:NEXT")
+        self.assertSame("10 ON 2 GOSUB 30,40:END\n30 PRINT 30\n40 PRINT 40:RETURN")
+        self.assertSame("10 ON 3 GOTO 30:PRINT 10\n30 PRINT 30")
+        self.assertSame("10 IF 1 THEN GOSUB 30:PRINT 10\n20 END\n30 PRINT 30:RETURN")
+        self.assertSame("10 I=1:WHILE I<50:I=I*2:IF I>10 THEN 30\n20 WEND\n30 PRINT I")
+
+    def test_native_loops(self):
+        # Loops nobody jumps into become Python while loops
+        source = translate(load_lines("10 FOR I=1 TO 3:PRINT I:NEXT I"))
+        self.assertIn("while v0 <= l0:", source)
+        self.assertNotIn("for_(", source)
+        source = translate(load_lines("10 FOR I=1 TO 3\n20 PRINT I:NEXT\n30 GOTO 20"))
+        self.assertIn("for_(", source)
+        # FOR on the variable of an enclosing loop ends that loop
+        source = "10 FOR I=1 TO 2:FOR I=1 TO 2:PRINT I;:NEXT:NEXT"
+        self.assertIn("for_(", translate(load_lines(source)))
+        self.assertSame(source)
+        self.assertSame("10 FOR I=1 TO 2:FOR I=1 TO 3:PRINT I;:NEXT:PRINT")
+        # Native loops reached through GOSUB end a live loop on their variable
+        self.assertSame(
+            '10 FOR I=1 TO 3:GOSUB 100:PRINT I;:NEXT:END\n'
+            '100 FOR I=1 TO 2:PRINT "S";:NEXT:RETURN'
+        )
+        self.assertSame(
+            "10 FOR I=1 TO 3\n20 GOSUB 100\n30 NEXT I\n"
+            "100 FOR I=7 TO 8:NEXT I:PRINT I:RETURN"
+        )
+
+    def test_arrays_and_functions(self):
+        self.assertSame(
+            """10 DIM A(2,3):A(2,3)=5:B(10)=1
+20 PRINT A(2,3);A(1,1);B(10)
+30 DEF FNA(X)=X*X+Y:Y=1
+40 DEF FNB$(S$,N)=LEFT$(S$,N)+"!"
+50 PRINT FNA(3);FNB$("HELLO",2);LEN("ABC");MID$("ABCDEF",2,3);INT(-2.5)
+60 A$="HELLO":MID$(A$,2)="EY":SWAP A$,B$:PRINT A$;B$
+"""
+        )
+
+    def test_data_and_input(self):
+        self.assertSame(
+            """10 READ A,B$:PRINT A;B$
+20 RESTORE 40:READ C:PRINT C
+30 DATA 1,"ONE"
+40 DATA -2
+"""
+        )
+        self.assertSame("10 READ A$,B$,C,D,E$:PRINT A$;B$;C;D;E$;\n20 DATA ABC,DEF,1,,")
+        self.assertSame('10 INPUT "VALUES";A,B$:PRINT A*2;B$', "X,Y\n4,HI\n")
+        self.assertEqual(
+            execute("10 A=1:PRINT A;:RUN 30\n20 PRINT 2\n30 PRINT A"), " 1  0 \n"
+        )
+
+    def test_errors(self):
+        for source in [
+            "10 DIM A(2):A(3)=1",
+            "10 A(1)=1:DIM A(5)",
+            "10 PRINT FNX(1)",
+            "10 DEF FNA(X)=X:PRINT FNA(1,2)",
+            "10 DEF FNA(X)=X:PRINT FNA(1):DEF FNA(X,Y)=X:PRINT FNA(1)",
+            "10 DEF FNA(X)=FNA(X)+1:PRINT FNA(1)",
+            "10 READ A",
+            "10 A=1:B=A/0",
+            "10 A%=32767:A%=A%+1",
+            "10 RETURN",
+            "10 NEXT",
+            "10 STOP",
+            '10 PRINT "A";:GOTO 30\n20 A=1+"X"\n30 PRINT "B":GOTO 50',
+            '10 A=1+"X"',
+            "10 A=",
+            "10 WEND",
+            "10 WHILE 0",
+            "10 FOR I=1 TO 0",
+        ]:
+            self.assertSame(source)
+
+    def test_error_columns(self):
+        with self.assertRaises(Error) as e:
+            execute("10 PRINT 1\n20 A=1:B=A/0")
+        self.assertEqual(e.exception.code, ErrorCode.DivisionByZero)
+        self.assertEqual(e.exception.line_number, 20)
+        self.assertEqual(e.exception.column, range(4, 5))
+        # A call with the wrong arity is reported where it is called
+        with self.assertRaises(Error) as e:
+            execute("10 DEF FNA(X)=X\n20 PRINT 1+FNA(1,2)")
+        self.assertEqual(e.exception.code, ErrorCode.SyntaxError)
+        self.assertEqual(e.exception.line_number, 20)
+        self.assertEqual(e.exception.column, range(0, 5))
+
+    def test_cache(self):
+        lines = load_lines("10 PRINT 42")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            Module.load(lines, Path(cache_dir))
+            [path] = Path(cache_dir).iterdir()
+            module = Module.load(lines, Path(cache_dir))
+            self.assertEqual(module.positions[-1], (None, 0, 0))
+            path.write_bytes(b"corrupt")
+            output = io.StringIO()
+            Machine(Module.load(lines, Path(cache_dir)), Runtime(output)).run()
+            self.assertEqual(output.getvalue(), " 42 \n")
+            self.assertNotEqual(Module.key(load_lines("10 PRINT 43")), path.stem)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,376 @@
+from typing import Iterable
+from lang.arith import Arith, Type
+from lang.builtins import Builtin
+from lang.bytecode import Code, Op, compile_program
+from lang.error import Error, ErrorCode
+from lang.line import Line
+from lang.runtime import Runtime
+
+
+class VM:
+    converters = [Arith.integer, Arith.single, Arith.double, Arith.string]
+    narrowers = [Arith.integer, Arith.single, Arith.double]
+    types = list(Type)
+    # Nested FN calls allowed before Out of memory, DEF FN can only recurse
+    # forever
+    depth = 1000
+
+    def __init__(self, code: Code, runtime: Runtime):
+        self.code = code
+        self.runtime = runtime
+        self.calls = [
+            (Builtin.bind(name, types, runtime), len(types))
+            for name, types in code.builtins
+        ]
+        self.vars = list()
+        self.arrays = list()
+        self.stack = list()
+        self.gosubs = list()
+        self.fors = list()
+        self.returns = list()
+        self.pending = list()
+        self.reset()
+
+    def clear(self):
+        code = self.code
+        self.vars[:] = code.scalars
+        self.arrays[:] = [None] * len(code.arrays)
+        self.defined = [None] * len(code.functions)
+        self.data_pointer = 0
+
+    def reset(self):
+        self.clear()
+        self.stack.clear()
+        self.gosubs.clear()
+        self.fors.clear()
+        self.returns.clear()
+        self.pending.clear()
+
+    def run(self, pc: int = 0):
+        # The most frequent instructions are dispatched inline, the rest go
+        # through the handler table and return the next pc.
+        ops = self.code.ops.tolist()
+        args = self.code.args.tolist()
+        consts = self.code.consts
+        binary = self.code.binary
+        vars = self.vars
+        stack = self.stack
+        push = stack.append
+        pop = stack.pop
+        handlers = VM.handlers
+        op_load = Op.Load.value
+        op_const = Op.Const.value
+        op_store = Op.Store.value
+        op_binary = Op.Binary.value
+        op_jump_false = Op.JumpFalse.value
+        op_jump = Op.Jump.value
+        op_end = Op.End.value
+        try:
+            while True:
+                op = ops[pc]
+                arg = args[pc]
+                pc += 1
+                if op == op_load:
+                    push(vars[arg])
+                elif op == op_const:
+                    push(consts[arg])
+                elif op == op_binary:
+                    rhs = pop()
+                    stack[-1] = binary[arg](stack[-1], rhs)
+                elif op == op_store:
+                    vars[arg] = pop()
+                elif op == op_jump_false:
+                    if not pop():
+                        pc = arg
+                elif op == op_jump:
+                    pc = arg
+                elif op == op_end:
+                    return
+                else:
+                    pc = handlers[op](self, arg, pc)
+        except Error as e:
+            line_number, col = self.code.position(pc - 1)
+            if e.line_number is None:
+                e.add_line_number(line_number)
+            if e.column == range(0):
+                e.add_column(col)
+            raise e
+
+    # Arrays
+
+    def element(self, arg: int) -> tuple[list, int]:
+        slot = arg >> 8
+        rank = arg & 255
+        stack = self.stack
+        subscripts = stack[len(stack) - rank :]
+        del stack[len(stack) - rank :]
+        array = self.arrays[slot]
+        if array is None:
+            array = self.dimension(slot, [10] * rank)
+        bounds, values = array
+        if len(bounds) != rank:
+            raise Error(ErrorCode.SubscriptOutOfRange)
+        index = 0
+        for subscript, bound in zip(subscripts, bounds):
+            if type(subscript) is not int:
+                subscript = Arith.integer(subscript)
+            if subscript < 0 or subscript > bound:
+                raise Error(ErrorCode.SubscriptOutOfRange)
+            index = index * (bound + 1) + subscript
+        return (values, index)
+
+    def dimension(self, slot: int, bounds: list[int]) -> tuple:
+        size = 1
+        for bound in bounds:
+            size *= bound + 1
+        default = Code.defaults[self.code.arrays[slot]]
+        array = (tuple(bounds), [default] * size)
+        self.arrays[slot] = array
+        return array
+
+    # Handlers
+
+    def load_element(vm, arg: int, pc: int) -> int:
+        values, index = vm.element(arg)
+        vm.stack.append(values[index])
+        return pc
+
+    def store_element(vm, arg: int, pc: int) -> int:
+        value = vm.stack.pop()
+        values, index = vm.element(arg)
+        values[index] = value
+        return pc
+
+    def unary(vm, arg: int, pc: int) -> int:
+        vm.stack[-1] = vm.code.unary[arg](vm.stack[-1])
+        return pc
+
+    def convert(vm, arg: int, pc: int) -> int:
+        vm.stack[-1] = VM.converters[arg](vm.stack[-1])
+        return pc
+
+    def gosub(vm, arg: int, pc: int) -> int:
+        vm.gosubs.append(pc)
+        return arg
+
+    def return_(vm, arg: int, pc: int) -> int:
+        if not vm.gosubs:
+            raise Error(ErrorCode.ReturnWithoutGosub)
+        return vm.gosubs.pop()
+
+    def on_goto(vm, arg: int, pc: int) -> int:
+        table = vm.code.branches[arg]
+        n = Arith.integer(vm.stack.pop())
+        if n < 0 or n > 255:
+            raise Error(ErrorCode.IllegalFunctionCall)
+        if n == 0 or n > len(table):
+            return pc
+        if table[n - 1] < 0:
+            raise Error(ErrorCode.UndefinedLine)
+        return table[n - 1]
+
+    def on_gosub(vm, arg: int, pc: int) -> int:
+        target = VM.on_goto(vm, arg, pc)
+        if target != pc:
+            vm.gosubs.append(pc)
+        return target
+
+    def for_(vm, arg: int, pc: int) -> int:
+        slot, t, skip = vm.code.fors[arg]
+        step = vm.stack.pop()
+        stop = vm.stack.pop()
+        fors = vm.fors
+        for i, frame in enumerate(fors):
+            if frame[0] == slot:
+                del fors[i:]
+                break
+        value = vm.vars[slot]
+        if value > stop if step >= 0 else value < stop:
+            if skip < 0:
+                raise Error(ErrorCode.ForWithoutNext)
+            return skip
+        fors.append((slot, stop, step, pc, VM.narrowers[t]))
+        return pc
+
+    def next_(vm, arg: int, pc: int) -> int:
+        fors = vm.fors
+        if arg >= 0:
+            while fors and fors[-1][0] != arg:
+                fors.pop()
+        if not fors:
+            raise Error(ErrorCode.NextWithoutFor)
+        slot, stop, step, body, narrow = fors[-1]
+        value = narrow(vm.vars[slot] + step)
+        vm.vars[slot] = value
+        if value <= stop if step >= 0 else value >= stop:
+            return body
+        fors.pop()
+        return pc
+
+    def while_(vm, arg: int, pc: int) -> int:
+        if vm.stack.pop():
+            return pc
+        target = vm.code.whiles[arg]
+        if target < 0:
+            raise Error(ErrorCode.WhileWithoutWend)
+        return target
+
+    def call(vm, arg: int, pc: int) -> int:
+        fn, count = vm.calls[arg]
+        stack = vm.stack
+        if count == 0:
+            stack.append(fn())
+        else:
+            values = stack[len(stack) - count :]
+            del stack[len(stack) - count :]
+            stack.append(fn(*values))
+        return pc
+
+    def call_fn(vm, arg: int, pc: int) -> int:
+        index = vm.defined[arg >> 8]
+        if index is None:
+            raise Error(ErrorCode.UndefinedUserFunction)
+        _, entry, slots, types = vm.code.defs[index]
+        count = arg & 255
+        if count != len(slots):
+            raise Error(ErrorCode.SyntaxError)
+        if len(vm.returns) >= VM.depth:
+            raise Error(ErrorCode.OutOfMemory)
+        stack = vm.stack
+        values = stack[len(stack) - count :]
+        del stack[len(stack) - count :]
+        for slot, t, value in zip(slots, types, values):
+            vm.vars[slot] = Arith.convert(t, value)
+        vm.returns.append(pc)
+        return entry
+
+    def return_fn(vm, arg: int, pc: int) -> int:
+        return vm.returns.pop()
+
+    def def_(vm, arg: int, pc: int) -> int:
+        function, _, _, _ = vm.code.defs[arg]
+        vm.defined[function] = arg
+        return pc
+
+    def dim(vm, arg: int, pc: int) -> int:
+        slot = arg >> 8
+        rank = arg & 255
+        stack = vm.stack
+        bounds = [Arith.integer(bound) for bound in stack[len(stack) - rank :]]
+        del stack[len(stack) - rank :]
+        if vm.arrays[slot] is not None:
+            raise Error(ErrorCode.RedimensionedArray)
+        if any(bound < 0 for bound in bounds):
+            raise Error(ErrorCode.IllegalFunctionCall)
+        vm.dimension(slot, bounds)
+        return pc
+
+    def erase(vm, arg: int, pc: int) -> int:
+        if vm.arrays[arg] is None:
+            raise Error(ErrorCode.IllegalFunctionCall)
+        vm.arrays[arg] = None
+        return pc
+
+    def print_number(vm, arg: int, pc: int) -> int:
+        vm.runtime.print_number(VM.types[arg], vm.stack.pop())
+        return pc
+
+    def print_string(vm, arg: int, pc: int) -> int:
+        vm.runtime.write(vm.stack.pop())
+        return pc
+
+    def tab(vm, arg: int, pc: int) -> int:
+        vm.runtime.tab(vm.stack.pop())
+        return pc
+
+    def spc(vm, arg: int, pc: int) -> int:
+        vm.runtime.spc(vm.stack.pop())
+        return pc
+
+    def input_(vm, arg: int, pc: int) -> int:
+        prompt, types = vm.code.inputs[arg]
+        vm.pending[:] = reversed(vm.runtime.read_values(prompt, types))
+        return pc
+
+    def input_item(vm, arg: int, pc: int) -> int:
+        vm.stack.append(vm.pending.pop())
+        return pc
+
+    def read(vm, arg: int, pc: int) -> int:
+        if vm.data_pointer >= len(vm.code.data):
+            raise Error(ErrorCode.OutOfData)
+        value = vm.code.data[vm.data_pointer]
+        vm.data_pointer += 1
+        vm.stack.append(Arith.datum(VM.types[arg], value))
+        return pc
+
+    def restore(vm, arg: int, pc: int) -> int:
+        vm.data_pointer = arg
+        return pc
+
+    def mid_assign(vm, arg: int, pc: int) -> int:
+        stack = vm.stack
+        value = stack.pop()
+        length = stack.pop()
+        start = stack.pop()
+        stack[-1] = Builtin.mid_assign(stack[-1], start, length, value)
+        return pc
+
+    def clear_(vm, arg: int, pc: int) -> int:
+        vm.clear()
+        return pc
+
+    def restart(vm, arg: int, pc: int) -> int:
+        vm.reset()
+        return arg
+
+    def stop(vm, arg: int, pc: int) -> int:
+        raise Error(ErrorCode.Break)
+
+    def raise_(vm, arg: int, pc: int) -> int:
+        code, message = vm.code.errors[arg]
+        raise Error(code).add_message(message)
+
+    def build_handlers() -> list:
+        handlers = {
+            Op.LoadElement: VM.load_element,
+            Op.StoreElement: VM.store_element,
+            Op.Unary: VM.unary,
+            Op.Convert: VM.convert,
+            Op.Gosub: VM.gosub,
+            Op.Return: VM.return_,
+            Op.OnGoto: VM.on_goto,
+            Op.OnGosub: VM.on_gosub,
+            Op.For: VM.for_,
+            Op.Next: VM.next_,
+            Op.While: VM.while_,
+            Op.Call: VM.call,
+            Op.CallFn: VM.call_fn,
+            Op.ReturnFn: VM.return_fn,
+            Op.Def: VM.def_,
+            Op.Dim: VM.dim,
+            Op.Erase: VM.erase,
+            Op.PrintNumber: VM.print_number,
+            Op.PrintString: VM.print_string,
+            Op.Tab: VM.tab,
+            Op.Spc: VM.spc,
+            Op.Input: VM.input_,
+            Op.InputItem: VM.input_item,
+            Op.Read: VM.read,
+            Op.Restore: VM.restore,
+            Op.MidAssign: VM.mid_assign,
+            Op.Clear: VM.clear_,
+            Op.Run: VM.restart,
+            Op.Stop: VM.stop,
+            Op.Raise: VM.raise_,
+        }
+        return [handlers.get(op) for op in Op]
+
+
+VM.handlers = VM.build_handlers()
+
+
+def run(lines: Iterable[Line], runtime: Runtime | None = None) -> VM:
+    vm = VM(compile_program(lines), Runtime() if runtime is None else runtime)
+    vm.run()
+    return vm
@@ -0,0 +1,141 @@
+import io
+import unittest
+from lang.bytecode import Op, compile_program
+from lang.error import Error, ErrorCode
+from lang.line import load_lines
+from lang.runtime import Runtime
+from lang.vm import VM
+
+
+def execute(source: str, input: str = "") -> str:
+    output = io.StringIO()
+    runtime = Runtime(output, io.StringIO(input))
+    VM(compile_program(load_lines(source, tokens_only=True)), runtime).run()
+    return output.getvalue()
+
+
+class TestVM(unittest.TestCase):
+    def assertError(self, source: str, code: ErrorCode, line: int, col: range):
+        with self.assertRaises(Error) as e:
+            execute(source)
+        self.assertEqual(e.exception.code, code)
+        self.assertEqual(e.exception.line_number, line)
+        self.assertEqual(e.exception.column, col)
+
+    def test_print(self):
+        self.assertEqual(execute('10 PRINT 1;-2;"A"'), " 1 -2 A\n")
+        self.assertEqual(
+            execute("10 PRINT 1/3;2/3#"), " .3333333  .6666666666666666 \n"
+        )
+        self.assertEqual(
+            execute("10 PRINT 32767+1;1E20;0.001"), " 32768  1E+20  1E-03 \n"
+        )
+        self.assertEqual(execute('10 PRINT "A","B";:PRINT "C"'), "A             BC\n")
+        self.assertEqual(execute('10 PRINT TAB(4);"X";SPC(2);"Y"'), "   X  Y\n")
+
+    def test_variables(self):
+        source = """10 A%=2.5:B=A%/4:C#=1/3#:D$="X"+"Y"
+20 DEFINT I:I=7.6:J=7.6
+30 PRINT A%;B;C#;D$;I;J
+"""
+        self.assertEqual(execute(source), " 3  .75  .3333333333333333 XY 8  7.6 \n")
+
+    def test_control_flow(self):
+        source = """10 FOR I=1 TO 3:FOR J=I TO 2
+20 PRINT I*10+J;
+30 NEXT J,I:PRINT
+40 I=0:WHILE I<3:I=I+1:GOSUB 100:WEND
+50 ON I-1 GOTO 60,70
+60 PRINT "SIXTY"
+70 IF I=3 THEN PRINT "DONE" ELSE PRINT "NOT"
+80 END
+100 PRINT I;:RETURN
+"""
+        self.assertEqual(execute(source), " 11  12  22 \n 1  2  3 DONE\n")
+
+    def test_for_skips_body(self):
+        self.assertEqual(execute("10 FOR I=5 TO 1:PRINT I:NEXT I:PRINT I"), " 5 \n")
+
+    def test_arrays(self):
+        source = """10 DIM A(2,3):A(2,3)=5:B(10)=1
+20 PRINT A(2,3);A(1,1);B(10)
+"""
+        self.assertEqual(execute(source), " 5  0  1 \n")
+        self.assertError(
+            "10 DIM A(2):A(3)=1", ErrorCode.SubscriptOutOfRange, 10, range(9, 10)
+        )
+        self.assertError(
+            "10 A(1)=1:DIM A(5)", ErrorCode.RedimensionedArray, 10, range(11, 12)
+        )
+
+    def test_functions(self):
+        source = """10 DEF FNA(X)=X*X+Y:Y=1
+20 DEF FNB$(S$,N)=LEFT$(S$,N)+"!"
+30 PRINT FNA(3);FNB$("HELLO",2);LEN("ABC");MID$("ABCDEF",2,3);INT(-2.5)
+40 A$="HELLO":MID$(A$,2)="EY":PRINT A$
+"""
+        self.assertEqual(execute(source), " 10 HE! 3 BCD-3 \nHEYLO\n")
+        self.assertError(
+            "10 PRINT FNX(1)", ErrorCode.UndefinedUserFunction, 10, range(6, 12)
+        )
+
+    def test_data(self):
+        source = """10 READ A,B$:PRINT A;B$
+20 RESTORE 40:READ C:PRINT C
+30 DATA 1,"ONE"
+40 DATA -2
+"""
+        self.assertEqual(execute(source), " 1 ONE\n-2 \n")
+        source = "10 READ A$,B$,C,D,E$:PRINT A$;B$;C;D;E$\n20 DATA ABC, d e ,1,,"
+        self.assertEqual(execute(source), "ABCd e 1  0 \n")
+        self.assertError("10 READ A", ErrorCode.OutOfData, 10, range(5, 6))
+
+    def test_input(self):
+        source = '10 INPUT "VALUES";A,B$:PRINT A*2;B$'
+        self.assertEqual(
+            execute(source, "X,Y\n4,HI\n"), "VALUES? ?Redo from start\nVALUES?  8 HI\n"
+        )
+
+    def test_runtime_errors(self):
+        self.assertError("10 A=1:B=A/0", ErrorCode.DivisionByZero, 10, range(7, 8))
+        self.assertError("10 A%=32767:A%=A%+1", ErrorCode.Overflow, 10, range(9, 11))
+        self.assertError("10 RETURN", ErrorCode.ReturnWithoutGosub, 10, range(0, 6))
+        self.assertError("10 NEXT", ErrorCode.NextWithoutFor, 10, range(0, 4))
+        self.assertError("10 STOP", ErrorCode.Break, 10, range(0, 4))
+
+    def test_deferred_errors(self):
+        # Errors found while compiling are raised when the statement runs
+        source = '10 PRINT "A";:GOTO 30\n20 A=1+"X"\n30 PRINT "B":GOTO 50'
+        self.assertError(source, ErrorCode.UndefinedLine, 30, range(10, 14))
+        self.assertEqual(execute('10 PRINT "OK":END\n20 A=1+"X"'), "OK\n")
+        self.assertError('10 A=1+"X"', ErrorCode.TypeMismatch, 10, range(3, 4))
+        self.assertError("10 A=", ErrorCode.SyntaxError, 10, range(2, 2))
+        self.assertError("10 WEND", ErrorCode.WendWithoutWhile, 10, range(0, 4))
+
+    def test_deferred_statements(self):
+        # A statement that fails to compile runs none of its parts
+        source = '10 PRINT "A";:PRINT "B";LEN(1)'
+        code = compile_program(load_lines(source, tokens_only=True))
+        output = io.StringIO()
+        with self.assertRaises(Error) as e:
+            VM(code, Runtime(output)).run()
+        self.assertEqual(e.exception.code, ErrorCode.TypeMismatch)
+        self.assertEqual(e.exception.column, range(21, 27))
+        self.assertEqual(output.getvalue(), "A")
+        source = "10 DEF FNA$(X)=X:PRINT FNA$(1)"
+        self.assertError(source, ErrorCode.TypeMismatch, 10, range(0, 3))
+        source = "10 DEF FNA(X)=X:DEF FNB$(X)=X:PRINT FNA(2)"
+        self.assertError(source, ErrorCode.TypeMismatch, 10, range(13, 16))
+
+    def test_code(self):
+        code = compile_program(load_lines("10 A=A+1:GOTO 10", tokens_only=True))
+        self.assertEqual(
+            list(code.ops),
+            [Op.Load, Op.Const, Op.Binary, Op.Store, Op.Jump, Op.End],
+        )
+        self.assertEqual(code.args[4], 0)
+        self.assertEqual(code.position(4), (10, range(6, 10)))
+
+
+if __name__ == "__main__":
+    unittest.main()